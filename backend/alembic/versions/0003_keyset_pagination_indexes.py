@@ -0,0 +1,38 @@
+"""composite indexes for keyset (cursor) pagination
+
+Revision ID: 0003_keyset_pagination_indexes
+Revises: 0002_verification_codes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_keyset_pagination_indexes"
+down_revision = "0002_verification_codes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_assets_published_keyset",
+        "assets",
+        [sa.text("published_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("visibility = 'published'"),
+    )
+    op.create_index("ix_posts_keyset", "posts", [sa.text("created_at DESC"), sa.text("id DESC")])
+    op.create_index(
+        "ix_notifications_user_keyset", "notifications", ["user_id", sa.text("created_at DESC"), sa.text("id DESC")]
+    )
+    op.create_index("ix_ai_jobs_user_keyset", "ai_jobs", ["user_id", sa.text("created_at DESC"), sa.text("id DESC")])
+    op.create_index("ix_scan_jobs_user_keyset", "scan_jobs", ["user_id", sa.text("created_at DESC"), sa.text("id DESC")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scan_jobs_user_keyset", table_name="scan_jobs")
+    op.drop_index("ix_ai_jobs_user_keyset", table_name="ai_jobs")
+    op.drop_index("ix_notifications_user_keyset", table_name="notifications")
+    op.drop_index("ix_posts_keyset", table_name="posts")
+    op.drop_index("ix_assets_published_keyset", table_name="assets")
@@ -0,0 +1,44 @@
+"""full-text and trigram search over assets
+
+Revision ID: 0004_asset_search
+Revises: 0003_keyset_pagination_indexes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0004_asset_search"
+down_revision = "0003_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(jsonb_to_tsvector('english', tags, '[\"string\"]'), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "assets",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index("ix_assets_search_vector", "assets", ["search_vector"], postgresql_using="gin")
+    op.create_index(
+        "ix_assets_title_trgm", "assets", ["title"], postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+    )
+    op.create_index(
+        "ix_assets_tags", "assets", ["tags"], postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assets_tags", table_name="assets")
+    op.drop_index("ix_assets_title_trgm", table_name="assets")
+    op.drop_index("ix_assets_search_vector", table_name="assets")
+    op.drop_column("assets", "search_vector")
@@ -0,0 +1,38 @@
+"""denormalized like/save/download/view counters on assets
+
+Revision ID: 0005_asset_counters
+Revises: 0004_asset_search
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_asset_counters"
+down_revision = "0004_asset_search"
+branch_labels = None
+depends_on = None
+
+COUNTERS = ("like_count", "save_count", "download_count", "view_count")
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column("assets", sa.Column(name, sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        UPDATE assets SET
+            like_count = (SELECT count(*) FROM likes WHERE likes.asset_id = assets.id),
+            save_count = (SELECT count(*) FROM saves WHERE saves.asset_id = assets.id),
+            download_count = (SELECT count(*) FROM downloads WHERE downloads.asset_id = assets.id),
+            view_count = (SELECT count(*) FROM recently_viewed WHERE recently_viewed.asset_id = assets.id),
+            metadata = metadata - 'likes'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE assets SET metadata = metadata || jsonb_build_object('likes', like_count)")
+    for name in reversed(COUNTERS):
+        op.drop_column("assets", name)
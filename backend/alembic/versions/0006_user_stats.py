@@ -0,0 +1,42 @@
+"""user_stats table for profile counters
+
+Revision ID: 0006_user_stats
+Revises: 0005_asset_counters
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0006_user_stats"
+down_revision = "0005_asset_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("followers", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("following", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("assets", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("published_assets", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO user_stats (user_id, followers, following, assets, published_assets)
+        SELECT users.id,
+               (SELECT count(*) FROM follows WHERE follows.following_id = users.id),
+               (SELECT count(*) FROM follows WHERE follows.follower_id = users.id),
+               (SELECT count(*) FROM assets WHERE assets.creator_id = users.id),
+               (SELECT count(*) FROM assets WHERE assets.creator_id = users.id AND assets.visibility = 'published')
+        FROM users
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
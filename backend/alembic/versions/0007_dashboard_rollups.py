@@ -0,0 +1,61 @@
+"""dashboard rollups: per-user job/download counters and hourly asset stats
+
+Revision ID: 0007_dashboard_rollups
+Revises: 0006_user_stats
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0007_dashboard_rollups"
+down_revision = "0006_user_stats"
+branch_labels = None
+depends_on = None
+
+USER_COUNTERS = ("downloads", "ai_jobs", "scan_jobs")
+
+
+def upgrade() -> None:
+    for name in USER_COUNTERS:
+        op.add_column("user_stats", sa.Column(name, sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        INSERT INTO user_stats (user_id, downloads, ai_jobs, scan_jobs)
+        SELECT users.id,
+               (SELECT count(*) FROM downloads WHERE downloads.user_id = users.id),
+               (SELECT count(*) FROM ai_jobs WHERE ai_jobs.user_id = users.id),
+               (SELECT count(*) FROM scan_jobs WHERE scan_jobs.user_id = users.id)
+        FROM users
+        ON CONFLICT (user_id) DO UPDATE SET
+            downloads = excluded.downloads, ai_jobs = excluded.ai_jobs, scan_jobs = excluded.scan_jobs
+        """
+    )
+
+    op.create_table(
+        "asset_stats_hourly",
+        sa.Column("asset_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("downloads", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("likes", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO asset_stats_hourly (asset_id, bucket, downloads, likes)
+        SELECT asset_id, bucket, sum(downloads), sum(likes)
+        FROM (
+            SELECT asset_id, date_trunc('hour', created_at, 'UTC') AS bucket, 1 AS downloads, 0 AS likes FROM downloads
+            UNION ALL
+            SELECT asset_id, date_trunc('hour', created_at, 'UTC'), 0, 1 FROM likes WHERE asset_id IS NOT NULL
+        ) AS events
+        GROUP BY asset_id, bucket
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("asset_stats_hourly")
+    for name in reversed(USER_COUNTERS):
+        op.drop_column("user_stats", name)
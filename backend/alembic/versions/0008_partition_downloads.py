@@ -0,0 +1,78 @@
+"""partition downloads by month
+
+Revision ID: 0008_partition_downloads
+Revises: 0007_dashboard_rollups
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0008_partition_downloads"
+down_revision = "0007_dashboard_rollups"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, asset_id, created_at, ip, user_agent"
+
+# Monthly partitions from the oldest existing row through three months ahead; later months are
+# created by the maintain_download_partitions task.
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    m date;
+    last date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC')::date INTO m FROM downloads_legacy;
+    last := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date;
+    WHILE m <= last LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF downloads FOR VALUES FROM (%L) TO (%L)',
+            'downloads_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+            m::timestamp AT TIME ZONE 'UTC',
+            (m + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("asset_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("assets.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ip", sa.String(length=64), nullable=True),
+        sa.Column("user_agent", sa.Text(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.rename_table("downloads", "downloads_legacy")
+    op.execute("ALTER INDEX downloads_pkey RENAME TO downloads_legacy_pkey")
+    op.create_table(
+        "downloads",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index("ix_downloads_user_created", "downloads", ["user_id", "created_at"])
+    op.create_index("ix_downloads_asset_created", "downloads", ["asset_id", "created_at"])
+    op.execute(CREATE_PARTITIONS)
+    op.execute(f"INSERT INTO downloads ({COLUMNS}) SELECT {COLUMNS} FROM downloads_legacy")
+    op.drop_table("downloads_legacy")
+
+
+def downgrade() -> None:
+    op.rename_table("downloads", "downloads_partitioned")
+    op.execute("ALTER INDEX downloads_pkey RENAME TO downloads_partitioned_pkey")
+    op.create_table("downloads", *_columns(), sa.PrimaryKeyConstraint("id"))
+    op.create_index("ix_downloads_user_id", "downloads", ["user_id"])
+    op.create_index("ix_downloads_asset_id", "downloads", ["asset_id"])
+    op.create_index("ix_downloads_created_at", "downloads", ["created_at"])
+    op.execute(f"INSERT INTO downloads ({COLUMNS}) SELECT {COLUMNS} FROM downloads_partitioned")
+    op.drop_table("downloads_partitioned")
@@ -0,0 +1,55 @@
+"""scan_job_inputs table replacing scan_jobs.input_keys
+
+Revision ID: 0009_scan_job_inputs
+Revises: 0008_partition_downloads
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0009_scan_job_inputs"
+down_revision = "0008_partition_downloads"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scan_job_inputs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("scan_jobs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("object_key", sa.Text(), nullable=False),
+        sa.Column("content_type", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_scan_job_inputs_job_id", "scan_job_inputs", ["job_id"])
+    # Keep the array order through created_at (job creation time plus a microsecond per element).
+    op.execute(
+        """
+        INSERT INTO scan_job_inputs (id, job_id, object_key, created_at)
+        SELECT gen_random_uuid(), scan_jobs.id, k.key, scan_jobs.created_at + k.n * interval '1 microsecond'
+        FROM scan_jobs, jsonb_array_elements_text(scan_jobs.input_keys) WITH ORDINALITY AS k(key, n)
+        """
+    )
+    op.drop_column("scan_jobs", "input_keys")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "scan_jobs",
+        sa.Column("input_keys", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'[]'::jsonb")),
+    )
+    op.execute(
+        """
+        UPDATE scan_jobs SET input_keys = i.keys
+        FROM (
+            SELECT job_id, jsonb_agg(object_key ORDER BY created_at, id) AS keys
+            FROM scan_job_inputs GROUP BY job_id
+        ) AS i
+        WHERE scan_jobs.id = i.job_id
+        """
+    )
+    op.drop_table("scan_job_inputs")
@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import Generator
+import dataclasses
+from typing import Any, AsyncGenerator, Dict, Generator
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from app.core.errors import unauthorized, forbidden
-from app.core.security import decode_token
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal, read_session
 from app.db.models.user import User
+from app.services.principal_cache import (
+    Principal, aget_cached_principal, astore_principal, decode_access_claims, get_cached_principal, store_principal,
+)
 
 bearer = HTTPBearer(auto_error=False)
 
@@ -17,27 +22,86 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Possibly-lagging replica session: only for read-only handlers that tolerate a few seconds of staleness."""
+    async with await read_session() as db:
+        yield db
+
+def _access_claims(creds: HTTPAuthorizationCredentials | None) -> Dict[str, Any]:
     if not creds:
         unauthorized("Missing bearer token")
     try:
-        payload = decode_token(creds.credentials)
+        payload = decode_access_claims(creds.credentials)
     except Exception:
         unauthorized("Invalid token")
     if payload.get("type") != "access":
         unauthorized("Invalid token type")
-    user_id = payload.get("sub")
-    user = db.get(User, user_id)
+    if not payload.get("sub"):
+        unauthorized("Invalid token")
+    return payload
+
+def _check_user(user: User | None, payload: Dict[str, Any]) -> User:
     if not user or not user.is_active:
         unauthorized("User inactive")
     user._jwt_role = payload.get("role")  # type: ignore[attr-defined]
     return user
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
-    role = getattr(user, "_jwt_role", user.role)
-    if role != "admin":
+def _check_principal(p: Principal | None, payload: Dict[str, Any]) -> Principal:
+    if not p or not p.is_active:
+        unauthorized("User inactive")
+    return dataclasses.replace(p, jwt_role=payload.get("role"))
+
+def _user_with_profile(user_id):
+    return select(User).options(joinedload(User.profile)).where(User.id == user_id)
+
+def get_current_user(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: Session = Depends(get_db),
+) -> User:
+    """ORM user for handlers that modify the account; read paths should use the principal."""
+    payload = _access_claims(creds)
+    return _check_user(db.get(User, payload.get("sub")), payload)
+
+async def get_async_current_user(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    payload = _access_claims(creds)
+    return _check_user(await db.get(User, payload.get("sub")), payload)
+
+def get_current_principal(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: Session = Depends(get_db),
+) -> Principal:
+    payload = _access_claims(creds)
+    user_id = str(payload.get("sub"))
+    p = get_cached_principal(user_id)
+    if p is None:
+        user = db.execute(_user_with_profile(user_id)).scalar_one_or_none()
+        if user:
+            p = Principal.from_user(user)
+            store_principal(p)
+    return _check_principal(p, payload)
+
+async def get_async_principal(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    payload = _access_claims(creds)
+    user_id = str(payload.get("sub"))
+    p = await aget_cached_principal(user_id)
+    if p is None:
+        user = (await db.execute(_user_with_profile(user_id))).scalar_one_or_none()
+        if user:
+            p = Principal.from_user(user)
+            await astore_principal(p)
+    return _check_principal(p, payload)
+
+def require_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if principal.jwt_role != "admin":
         forbidden("Admin only")
-    return user
+    return principal
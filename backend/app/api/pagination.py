@@ -0,0 +1,38 @@
+from __future__ import annotations
+import base64
+import datetime as dt
+import uuid
+from typing import Any, Sequence
+import orjson
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from app.core.errors import bad_request
+
+# List endpoints keep returning a JSON array; the opaque cursor for the next page rides in this
+# header (absent on the last page). Pass it back as ?cursor= to continue the scroll.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(ts: dt.datetime, row_id: uuid.UUID) -> str:
+    raw = orjson.dumps([ts.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        return dt.datetime.fromisoformat(ts), uuid.UUID(row_id)
+    except Exception:
+        bad_request("Invalid cursor")
+
+def paginate(stmt: Select, ts_col: Any, id_col: Any, *, limit: int, offset: int, cursor: str | None) -> Select:
+    """Newest-first ordering on ``(ts_col, id_col)``; keyset seek when a cursor is given, else offset."""
+    stmt = stmt.order_by(ts_col.desc(), id_col.desc()).limit(limit)
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        return stmt.where(tuple_(ts_col, id_col) < tuple_(ts, row_id))
+    return stmt.offset(offset)
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int, ts_attr: str) -> None:
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, ts_attr), last.id)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routers import auth, me, ai_jobs, scan_jobs, marketplace, assets_download, social, dashboard, notifications, billing, stripe_webhook
+from app.api.routers import admin, auth, me, ai_jobs, scan_jobs, marketplace, assets_download, social, dashboard, notifications, billing, stripe_webhook, uploads
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -11,5 +11,7 @@ api_router.include_router(assets_download.router, tags=["downloads"])
 api_router.include_router(social.router, prefix="/social", tags=["social"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 api_router.include_router(billing.router, prefix="/billing", tags=["billing"])
 api_router.include_router(stripe_webhook.router, prefix="/stripe", tags=["stripe"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
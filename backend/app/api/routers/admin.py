@@ -0,0 +1,32 @@
+from __future__ import annotations
+import datetime as dt
+from uuid import UUID
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.api.deps import get_db, require_admin
+from app.core.errors import not_found
+from app.db.models.user import User, RefreshToken
+from app.services.principal_cache import invalidate_principal
+
+router = APIRouter()
+
+@router.post("/users/{user_id}/deactivate")
+def deactivate_user(user_id: UUID, db: Session = Depends(get_db), admin = Depends(require_admin)):
+    user = db.get(User, user_id)
+    if not user: not_found("User not found")
+    user.is_active = False
+    db.query(RefreshToken).filter(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None)).update(
+        {RefreshToken.revoked_at: dt.datetime.now(dt.timezone.utc)}, synchronize_session=False
+    )
+    db.commit()
+    invalidate_principal(user.id)
+    return {"detail": "ok"}
+
+@router.post("/users/{user_id}/activate")
+def activate_user(user_id: UUID, db: Session = Depends(get_db), admin = Depends(require_admin)):
+    user = db.get(User, user_id)
+    if not user: not_found("User not found")
+    user.is_active = True
+    db.commit()
+    invalidate_principal(user.id)
+    return {"detail": "ok"}
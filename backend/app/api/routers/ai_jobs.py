@@ -1,13 +1,18 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
-from app.api.deps import get_db, get_current_user
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.api.deps import get_async_db, get_async_principal
+from app.api.pagination import paginate, set_next_cursor
 from app.api.schemas.jobs import AIJobCreateIn, JobOut, DownloadOut
 from app.core.errors import not_found, forbidden
 from app.db.models.jobs import AIJob
-from app.workers.tasks import ai_generate_task
+from app.workers.queue import enqueue
+from app.services import job_events
 from app.services.s3 import s3
+from app.services.user_stats import abump_stats, ainvalidate_dashboard
 from app.core.config import settings
 
 router = APIRouter()
@@ -22,28 +27,52 @@ def to_job_out(j: AIJob) -> JobOut:
     )
 
 @router.post("/jobs", response_model=JobOut)
-def create_job(payload: AIJobCreateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def create_job(payload: AIJobCreateIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     job = AIJob(user_id=user.id, prompt=payload.prompt, settings_json=payload.settings, status="queued", progress=0)
-    db.add(job); db.commit(); db.refresh(job)
-    ai_generate_task.delay(str(job.id))
+    db.add(job)
+    await abump_stats(db, user.id, ai_jobs=1)
+    await db.commit(); await db.refresh(job)
+    await ainvalidate_dashboard(user.id)
+    await run_in_threadpool(enqueue, "ai_generate_task", str(job.id))
     return to_job_out(job)
 
 @router.get("/jobs", response_model=list[JobOut])
-def list_jobs(limit: int = 20, offset: int = 0, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    q = select(AIJob).where(AIJob.user_id == user.id).order_by(desc(AIJob.created_at)).limit(limit).offset(offset)
-    items = db.execute(q).scalars().all()
+async def list_jobs(response: Response, limit: int = 20, offset: int = 0, cursor: str | None = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    q = paginate(select(AIJob).where(AIJob.user_id == user.id), AIJob.created_at, AIJob.id, limit=limit, offset=offset, cursor=cursor)
+    items = (await db.execute(q)).scalars().all()
+    set_next_cursor(response, items, limit, "created_at")
     return [to_job_out(j) for j in items]
 
+@router.get("/jobs/{job_id}/events")
+async def job_events_stream(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Server-sent ``progress`` events for the job until it succeeds or fails (replaces polling)."""
+    q = await job_events.hub.subscribe(job_events.channel("ai", job_id))
+    try:
+        j = await db.get(AIJob, job_id)
+        if not j: not_found()
+        if j.user_id != user.id: forbidden()
+        current = {"id": str(j.id), "kind": "ai", "status": j.status, "progress": j.progress, "stage": None, "error": j.error}
+    except BaseException:
+        await job_events.hub.unsubscribe(job_events.channel("ai", job_id), q)
+        raise
+    # Don't hold a pooled connection for the lifetime of the stream.
+    await db.close()
+    return StreamingResponse(
+        job_events.stream("ai", job_id, q, current),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/jobs/{job_id}", response_model=JobOut)
-def get_job(job_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(AIJob, job_id)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(AIJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
     return to_job_out(j)
 
 @router.get("/jobs/{job_id}/download/glb", response_model=DownloadOut)
-def download_glb(job_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(AIJob, job_id)
+async def download_glb(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(AIJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
     if not j.output_glb_key: not_found("No GLB yet")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_principal
 from app.api.schemas.billing import CheckoutIn, CheckoutOut, SubscriptionCheckoutOut
 from app.core.errors import not_found, bad_request, forbidden
 from app.db.models.marketplace import Asset, Purchase
@@ -11,7 +11,7 @@ from app.services.entitlements import is_entitled_to_asset
 router = APIRouter()
 
 @router.post("/checkout/asset", response_model=CheckoutOut)
-def checkout_asset(payload: CheckoutIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def checkout_asset(payload: CheckoutIn, db: Session = Depends(get_db), user = Depends(get_current_principal)):
     a = db.get(Asset, payload.asset_id)
     if not a: not_found()
     if not a.is_paid or a.price <= 0:
@@ -26,6 +26,6 @@ def checkout_asset(payload: CheckoutIn, db: Session = Depends(get_db), user = De
     return CheckoutOut(checkout_url=url)
 
 @router.post("/checkout/subscription", response_model=SubscriptionCheckoutOut)
-def checkout_subscription(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def checkout_subscription(db: Session = Depends(get_db), user = Depends(get_current_principal)):
     url = create_subscription_checkout_session(user_id=str(user.id))
     return SubscriptionCheckoutOut(checkout_url=url)
@@ -1,17 +1,48 @@
 from __future__ import annotations
+import datetime as dt
+from uuid import UUID
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from app.api.deps import get_db, get_current_user
-from app.db.models.marketplace import Asset, Download
-from app.db.models.jobs import AIJob, ScanJob
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.api.deps import get_async_db, get_async_principal, get_async_read_db
+from app.api.schemas.dashboard import AssetTimeSeriesOut, DashboardOut, TimeSeriesPoint
+from app.core.errors import not_found, forbidden
+from app.db.models.marketplace import Asset, AssetStatsHourly
+from app.db.models.user import UserStats
+from app.services.counters import hour_bucket
+from app.services.user_stats import DASHBOARD_COLUMNS, aget_dashboard, astore_dashboard
 
 router = APIRouter()
 
-@router.get("/me")
-def my_dashboard(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    assets = db.execute(select(func.count()).select_from(Asset).where(Asset.creator_id == user.id)).scalar_one()
-    downloads = db.execute(select(func.count()).select_from(Download).where(Download.user_id == user.id)).scalar_one()
-    ai_jobs = db.execute(select(func.count()).select_from(AIJob).where(AIJob.user_id == user.id)).scalar_one()
-    scan_jobs = db.execute(select(func.count()).select_from(ScanJob).where(ScanJob.user_id == user.id)).scalar_one()
-    return {"assets": assets, "downloads": downloads, "ai_jobs": ai_jobs, "scan_jobs": scan_jobs}
+MAX_SERIES_HOURS = 24 * 90
+
+@router.get("/me", response_model=DashboardOut)
+async def my_dashboard(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    data = await aget_dashboard(user.id)
+    if data is None:
+        row = (await db.execute(
+            select(*(getattr(UserStats, c) for c in DASHBOARD_COLUMNS)).where(UserStats.user_id == user.id)
+        )).one_or_none()
+        data = dict(row._mapping) if row else {c: 0 for c in DASHBOARD_COLUMNS}
+        await astore_dashboard(user.id, data)
+    return data
+
+@router.get("/assets/{asset_id}/timeseries", response_model=AssetTimeSeriesOut)
+async def asset_timeseries(asset_id: UUID, hours: int = 168, db: AsyncSession = Depends(get_async_read_db), user = Depends(get_async_principal)):
+    creator_id = (await db.execute(select(Asset.creator_id).where(Asset.id == asset_id))).scalar_one_or_none()
+    if not creator_id: not_found()
+    if creator_id != user.id: forbidden()
+    hours = max(1, min(hours, MAX_SERIES_HOURS))
+    end = hour_bucket()
+    start = end - dt.timedelta(hours=hours - 1)
+    rows = (await db.execute(
+        select(AssetStatsHourly.bucket, AssetStatsHourly.downloads, AssetStatsHourly.likes)
+        .where(AssetStatsHourly.asset_id == asset_id, AssetStatsHourly.bucket >= start)
+    )).all()
+    by_bucket = {r.bucket: r for r in rows}
+    points = []
+    for i in range(hours):
+        t = start + dt.timedelta(hours=i)
+        r = by_bucket.get(t)
+        points.append(TimeSeriesPoint(t=t.isoformat(), downloads=r.downloads if r else 0, likes=r.likes if r else 0))
+    return AssetTimeSeriesOut(asset_id=str(asset_id), points=points)
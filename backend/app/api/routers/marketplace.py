@@ -1,21 +1,34 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc, or_, func
-from app.api.deps import get_db, get_current_user
-from app.api.schemas.marketplace import AssetOut, AssetCreateIn, AssetUpdateIn, EntitlementOut, AssetPresignIn, AssetPresignOut
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, or_
+from app.api.deps import get_async_db, get_async_principal
+from app.api.pagination import NEXT_CURSOR_HEADER, paginate, set_next_cursor
+from app.api.schemas.marketplace import AssetOut, AssetCreateIn, AssetUpdateIn, EntitlementBatchIn, EntitlementOut, AssetMultipartPresignIn, AssetPresignIn, AssetPresignOut
+from app.api.schemas.common import MultipartUploadOut, PartURL
+from app.core.logging import get_logger
 from app.core.errors import not_found, forbidden, bad_request, conflict
 from app.db.models.marketplace import Asset, RecentlyViewed
 from app.db.models.social import Like, Save
 from app.db.models.user import UserProfile
-from app.services.entitlements import is_entitled_to_asset
+from app.services.counters import abump
+from app.services.entitlements import aentitlement_snapshot, ais_entitled_to_asset, resolve
+from app.services import response_cache, uploads
+from app.services.notifications import anotify
+from app.services.recently_viewed import recent_asset_ids, record_view, warm_recent
+from app.services.search import asset_search, with_tags
+from app.services.user_stats import abump_stats, ainvalidate_dashboard, ainvalidate_profile
 from app.services.s3 import s3
+from app.services.s3_async import s3_async
 from app.core.config import settings
 from uuid import UUID
 import datetime as dt
+import asyncio
 import uuid
+import orjson
 
 router = APIRouter()
+log = get_logger(__name__)
 
 def _thumb_url(a: Asset) -> str | None:
     if not a.thumb_object_key:
@@ -28,17 +41,11 @@ def _preview_url(a: Asset) -> str | None:
     key = a.preview_object_keys[0]
     return s3.presign_get(settings.s3_bucket_marketplace_models, key, expires=900)
 
-def _set_like_count(a: Asset, db: Session) -> None:
-    count = db.execute(select(func.count()).select_from(Like).where(Like.asset_id == a.id)).scalar_one()
-    meta = dict(a.meta_json or {})
-    meta["likes"] = count
-    a.meta_json = meta
-
 def to_out(a: Asset, creator_username: str | None = None) -> AssetOut:
     meta = dict(a.meta_json or {})
     if creator_username:
         meta.setdefault("creator_username", creator_username)
-    meta.setdefault("likes", meta.get("likes", 0))
+    meta.update(likes=a.like_count or 0, saves=a.save_count or 0, downloads=a.download_count or 0, views=a.view_count or 0)
     return AssetOut(
         id=str(a.id), title=a.title, description=a.description, tags=a.tags or [], category=a.category, style=a.style,
         creator_id=str(a.creator_id), is_paid=a.is_paid, price=a.price, currency=a.currency,
@@ -49,36 +56,63 @@ def to_out(a: Asset, creator_username: str | None = None) -> AssetOut:
     )
 
 @router.get("/assets", response_model=list[AssetOut])
-def list_assets(q: str | None = None, category: str | None = None, style: str | None = None,
-               limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+async def list_assets(q: str | None = None, category: str | None = None, style: str | None = None,
+               tags: list[str] | None = Query(default=None), limit: int = 20, offset: int = 0, cursor: str | None = None,
+               if_none_match: str | None = Header(default=None),
+               db: AsyncSession = Depends(get_async_db)):
+    # Public and identical for every caller: served from the response cache, revalidated by ETag.
+    # Misses read the primary: a lagging replica would store pre-invalidation rows under the new version.
+    q = q.strip() if q else None
+    key = response_cache.cache_key(
+        "assets", q=q, category=category, style=style, tags=tags, limit=limit, offset=offset, cursor=cursor,
+    )
+    entry, version = await response_cache.aget("assets", key)
+    if entry is None:
+        response = Response()
+        items = await _list_assets(response, q, category, style, tags, limit, offset, cursor, db)
+        body = orjson.dumps([a.model_dump(mode="json") for a in items])
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        entry = response_cache.CachedResponse.build(body, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+        await response_cache.astore(key, version, entry)
+    return entry.to_response(if_none_match)
+
+async def _list_assets(response: Response, q, category, style, tags, limit, offset, cursor, db: AsyncSession) -> list[AssetOut]:
     stmt = select(Asset).where(Asset.visibility == "published")
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(or_(Asset.title.ilike(like), Asset.description.ilike(like)))
     if category:
         stmt = stmt.where(Asset.category == category)
     if style:
         stmt = stmt.where(Asset.style == style)
-    stmt = stmt.order_by(desc(Asset.published_at)).limit(limit).offset(offset)
-    items = db.execute(stmt).scalars().all()
+    if tags:
+        stmt = with_tags(stmt, tags)
+    if q:
+        # Ranked results have no stable keyset; search pages by offset only.
+        if cursor:
+            bad_request("cursor is not supported with q")
+        stmt, score = asset_search(stmt, q)
+        stmt = stmt.order_by(desc(score), desc(Asset.published_at), desc(Asset.id)).limit(limit).offset(offset)
+        items = (await db.execute(stmt)).scalars().all()
+    else:
+        stmt = paginate(stmt, Asset.published_at, Asset.id, limit=limit, offset=offset, cursor=cursor)
+        items = (await db.execute(stmt)).scalars().all()
+        set_next_cursor(response, items, limit, "published_at")
     creator_ids = {a.creator_id for a in items}
     profiles = {}
     if creator_ids:
-        rows = db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids))).scalars().all()
+        rows = (await db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids)))).scalars().all()
         profiles = {p.user_id: p.username for p in rows}
     return [to_out(a, profiles.get(a.creator_id)) for a in items]
 
 @router.get("/assets/me", response_model=list[AssetOut])
-def list_my_assets(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    items = db.execute(
+async def list_my_assets(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    items = (await db.execute(
         select(Asset).where(Asset.creator_id == user.id).order_by(desc(Asset.created_at))
-    ).scalars().all()
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == user.id)).scalar_one_or_none()
+    )).scalars().all()
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == user.id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return [to_out(a, creator_name) for a in items]
 
 @router.get("/assets/saved", response_model=list[AssetOut])
-def list_saved_assets(db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def list_saved_assets(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     stmt = (
         select(Asset)
         .join(Save, Save.asset_id == Asset.id)
@@ -86,16 +120,16 @@ def list_saved_assets(db: Session = Depends(get_db), user = Depends(get_current_
         .where(or_(Asset.visibility == "published", Asset.creator_id == user.id))
         .order_by(desc(Save.created_at))
     )
-    items = db.execute(stmt).scalars().all()
+    items = (await db.execute(stmt)).scalars().all()
     creator_ids = {a.creator_id for a in items}
     profiles = {}
     if creator_ids:
-        rows = db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids))).scalars().all()
+        rows = (await db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids)))).scalars().all()
         profiles = {p.user_id: p.username for p in rows}
     return [to_out(a, profiles.get(a.creator_id)) for a in items]
 
 @router.get("/assets/liked", response_model=list[AssetOut])
-def list_liked_assets(db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def list_liked_assets(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     stmt = (
         select(Asset)
         .join(Like, Like.asset_id == Asset.id)
@@ -103,29 +137,81 @@ def list_liked_assets(db: Session = Depends(get_db), user = Depends(get_current_
         .where(or_(Asset.visibility == "published", Asset.creator_id == user.id))
         .order_by(desc(Like.created_at))
     )
-    items = db.execute(stmt).scalars().all()
+    items = (await db.execute(stmt)).scalars().all()
+    creator_ids = {a.creator_id for a in items}
+    profiles = {}
+    if creator_ids:
+        rows = (await db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids)))).scalars().all()
+        profiles = {p.user_id: p.username for p in rows}
+    return [to_out(a, profiles.get(a.creator_id)) for a in items]
+
+@router.get("/assets/recent", response_model=list[AssetOut])
+async def list_recently_viewed(limit: int = 20, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    limit = max(1, min(limit, settings.recently_viewed_limit))
+    ids = await recent_asset_ids(user.id, limit)
+    if ids is None:
+        rows = (await db.execute(
+            select(RecentlyViewed.asset_id, RecentlyViewed.last_viewed_at)
+            .where(RecentlyViewed.user_id == user.id)
+            .order_by(desc(RecentlyViewed.last_viewed_at))
+            .limit(settings.recently_viewed_limit)
+        )).all()
+        await warm_recent(user.id, [(r.asset_id, r.last_viewed_at) for r in rows])
+        ids = [r.asset_id for r in rows[:limit]]
+    if not ids:
+        return []
+    found = (await db.execute(
+        select(Asset).where(Asset.id.in_(ids)).where(or_(Asset.visibility == "published", Asset.creator_id == user.id))
+    )).scalars().all()
+    by_id = {a.id: a for a in found}
+    items = [by_id[i] for i in ids if i in by_id]
+    creator_ids = {a.creator_id for a in items}
+    rows = (await db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids)))).scalars().all()
+    profiles = {p.user_id: p.username for p in rows}
+    return [to_out(a, profiles.get(a.creator_id)) for a in items]
+
+@router.get("/assets:batch", response_model=list[AssetOut])
+async def get_assets_batch(ids: list[str] = Query(), db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Hydrate a collection in one query, in the order given; ``ids`` repeats or is comma-separated.
+
+    Same visibility rule as ``get_asset``; hidden and unknown ids are skipped. Unlike ``get_asset``
+    this does not record views.
+    """
+    try:
+        wanted = list(dict.fromkeys(UUID(i.strip()) for raw in ids for i in raw.split(",") if i.strip()))
+    except ValueError:
+        bad_request("ids must be UUIDs")
+    if len(wanted) > settings.asset_batch_max:
+        bad_request(f"At most {settings.asset_batch_max} ids per request")
+    if not wanted:
+        return []
+    found = (await db.execute(
+        select(Asset).where(Asset.id.in_(wanted)).where(or_(Asset.visibility == "published", Asset.creator_id == user.id))
+    )).scalars().all()
+    by_id = {a.id: a for a in found}
+    items = [by_id[i] for i in wanted if i in by_id]
     creator_ids = {a.creator_id for a in items}
     profiles = {}
     if creator_ids:
-        rows = db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids))).scalars().all()
+        rows = (await db.execute(select(UserProfile).where(UserProfile.user_id.in_(creator_ids)))).scalars().all()
         profiles = {p.user_id: p.username for p in rows}
     return [to_out(a, profiles.get(a.creator_id)) for a in items]
 
 @router.get("/assets/user/{user_id}", response_model=list[AssetOut])
-def list_user_assets(user_id: UUID, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def list_user_assets(user_id: UUID, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     stmt = (
         select(Asset)
         .where(Asset.creator_id == user_id)
         .where(or_(Asset.visibility == "published", Asset.creator_id == user.id))
         .order_by(desc(Asset.created_at))
     )
-    items = db.execute(stmt).scalars().all()
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == user_id)).scalar_one_or_none()
+    items = (await db.execute(stmt)).scalars().all()
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == user_id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return [to_out(a, creator_name) for a in items]
 
 @router.post("/assets/presign", response_model=AssetPresignOut)
-def presign_asset(payload: AssetPresignIn, user = Depends(get_current_user)):
+async def presign_asset(payload: AssetPresignIn, user = Depends(get_async_principal)):
     kind = payload.kind.lower()
     if kind not in {"model", "thumb"}:
         bad_request("kind must be model|thumb")
@@ -140,8 +226,26 @@ def presign_asset(payload: AssetPresignIn, user = Depends(get_current_user)):
     )
     return AssetPresignOut(url=url, key=key)
 
+@router.post("/assets/presign:multipart", response_model=MultipartUploadOut)
+async def presign_asset_multipart(payload: AssetMultipartPresignIn, user = Depends(get_async_principal)):
+    """Start a multipart upload for a large model; parts go through /uploads/multipart."""
+    kind = payload.kind.lower()
+    if kind not in {"model", "thumb"}:
+        bad_request("kind must be model|thumb")
+    if payload.size > settings.max_upload_bytes:
+        bad_request("File too large")
+    bucket = settings.s3_bucket_marketplace_models if kind == "model" else settings.s3_bucket_marketplace_thumbs
+    key = f"{user.id}/marketplace/{kind}/{uuid.uuid4()}_{payload.filename}"
+    content_type = payload.content_type if kind == "thumb" else None
+    upload_id, part_size, part_count = await uploads.start(bucket, key, payload.size, content_type)
+    urls = uploads.presign_parts(bucket, key, upload_id, range(1, part_count + 1))
+    return MultipartUploadOut(
+        key=key, upload_id=upload_id, part_size=part_size, part_count=part_count,
+        parts=[PartURL(part_number=n, url=url) for n, url in urls],
+    )
+
 @router.post("/assets", response_model=AssetOut)
-def create_asset(payload: AssetCreateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def create_asset(payload: AssetCreateIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     a = Asset(
         creator_id=user.id,
         title=payload.title,
@@ -159,32 +263,31 @@ def create_asset(payload: AssetCreateIn, db: Session = Depends(get_db), user = D
         preview_object_keys=payload.preview_object_keys,
         meta_json=payload.metadata,
     )
-    db.add(a); db.commit(); db.refresh(a)
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == user.id)).scalar_one_or_none()
+    db.add(a)
+    await abump_stats(db, user.id, assets=1)
+    await db.commit(); await db.refresh(a)
+    await ainvalidate_profile(user.id)
+    await ainvalidate_dashboard(user.id)
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == user.id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return to_out(a, creator_name)
 
 @router.get("/assets/{asset_id}", response_model=AssetOut)
-def get_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def get_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
     # viewing allowed if published or owner
     if a.visibility != "published" and a.creator_id != user.id:
         forbidden()
-    # track recently viewed
-    rv = db.execute(select(RecentlyViewed).where(RecentlyViewed.user_id == user.id, RecentlyViewed.asset_id == a.id)).scalar_one_or_none()
-    if rv:
-        rv.last_viewed_at = dt.datetime.now(dt.timezone.utc)
-    else:
-        db.add(RecentlyViewed(user_id=user.id, asset_id=a.id))
-    db.commit()
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == a.creator_id)).scalar_one_or_none()
+    # written behind via Redis so the read path stays read-only
+    await record_view(user.id, a.id)
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == a.creator_id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return to_out(a, creator_name)
 
 @router.patch("/assets/{asset_id}", response_model=AssetOut)
-def update_asset(asset_id: str, payload: AssetUpdateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def update_asset(asset_id: str, payload: AssetUpdateIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
     if a.creator_id != user.id: forbidden()
     for field, value in payload.model_dump(exclude_unset=True).items():
@@ -193,85 +296,144 @@ def update_asset(asset_id: str, payload: AssetUpdateIn, db: Session = Depends(ge
             setattr(a, "meta_json", value)
         else:
             setattr(a, field, value)
-    db.commit(); db.refresh(a)
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == user.id)).scalar_one_or_none()
+    await db.commit(); await db.refresh(a)
+    if a.visibility == "published":
+        await response_cache.abump_version("assets")
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == user.id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return to_out(a, creator_name)
 
 @router.post("/assets/{asset_id}/publish", response_model=AssetOut)
-def publish(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def publish(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
     if a.creator_id != user.id: forbidden()
     if not a.model_object_key:
         bad_request("model_object_key is required")
+    obj = await s3_async.head_object(settings.s3_bucket_marketplace_models, a.model_object_key)
+    if obj is None:
+        bad_request("Model file has not been uploaded")
+    if obj.size > settings.max_upload_bytes:
+        bad_request("Model file is too large")
+    if a.visibility != "published":
+        await abump_stats(db, user.id, published_assets=1)
     a.visibility = "published"
     a.published_at = dt.datetime.now(dt.timezone.utc)
-    db.commit(); db.refresh(a)
-    prof = db.execute(select(UserProfile).where(UserProfile.user_id == user.id)).scalar_one_or_none()
+    await db.commit(); await db.refresh(a)
+    await ainvalidate_profile(user.id)
+    await response_cache.abump_version("assets")
+    prof = (await db.execute(select(UserProfile).where(UserProfile.user_id == user.id))).scalar_one_or_none()
     creator_name = prof.username if prof else None
     return to_out(a, creator_name)
 
 @router.post("/assets/{asset_id}/like")
-def like_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def like_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
-    existing = db.execute(select(Like).where(Like.user_id == user.id, Like.asset_id == a.id)).scalar_one_or_none()
+    existing = (await db.execute(select(Like).where(Like.user_id == user.id, Like.asset_id == a.id))).scalar_one_or_none()
     if existing:
         conflict("Already liked")
     db.add(Like(user_id=user.id, asset_id=a.id))
-    db.flush()
-    _set_like_count(a, db)
-    db.commit()
+    await abump(db, a.id, "likes")
+    await db.commit()
+    await abump(db, a.id, "likes", after_commit=True)
+    if a.creator_id != user.id:
+        await anotify(db, a.creator_id, "asset_like", {"asset_id": str(a.id), "user_id": str(user.id)})
     return {"detail": "ok"}
 
 @router.delete("/assets/{asset_id}/like")
-def unlike_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def unlike_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
-    like = db.execute(select(Like).where(Like.user_id == user.id, Like.asset_id == a.id)).scalar_one_or_none()
+    like = (await db.execute(select(Like).where(Like.user_id == user.id, Like.asset_id == a.id))).scalar_one_or_none()
     if not like:
         not_found("Like not found")
-    db.delete(like)
-    db.flush()
-    _set_like_count(a, db)
-    db.commit()
+    await db.delete(like)
+    await abump(db, a.id, "likes", -1)
+    await db.commit()
+    await abump(db, a.id, "likes", -1, after_commit=True)
     return {"detail": "ok"}
 
 @router.post("/assets/{asset_id}/save")
-def save_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def save_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
-    existing = db.execute(select(Save).where(Save.user_id == user.id, Save.asset_id == a.id)).scalar_one_or_none()
+    existing = (await db.execute(select(Save).where(Save.user_id == user.id, Save.asset_id == a.id))).scalar_one_or_none()
     if existing:
         conflict("Already saved")
     db.add(Save(user_id=user.id, asset_id=a.id))
-    db.commit()
+    await abump(db, a.id, "saves")
+    await db.commit()
+    await abump(db, a.id, "saves", after_commit=True)
     return {"detail": "ok"}
 
 @router.delete("/assets/{asset_id}/save")
-def unsave_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def unsave_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
-    saved = db.execute(select(Save).where(Save.user_id == user.id, Save.asset_id == a.id)).scalar_one_or_none()
+    saved = (await db.execute(select(Save).where(Save.user_id == user.id, Save.asset_id == a.id))).scalar_one_or_none()
     if not saved:
         not_found("Save not found")
-    db.delete(saved)
-    db.commit()
+    await db.delete(saved)
+    await abump(db, a.id, "saves", -1)
+    await db.commit()
+    await abump(db, a.id, "saves", -1, after_commit=True)
     return {"detail": "ok"}
 
 @router.delete("/assets/{asset_id}")
-def delete_asset(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def delete_asset(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
     if a.creator_id != user.id: forbidden()
-    db.delete(a)
-    db.commit()
+    was_published = a.visibility == "published"
+    model_keys = [k for k in [a.model_object_key, *(a.preview_object_keys or [])] if k]
+    thumb_keys = [a.thumb_object_key] if a.thumb_object_key else []
+    await abump_stats(db, user.id, assets=-1, published_assets=-1 if was_published else 0)
+    await db.delete(a)
+    await db.commit()
+    await ainvalidate_profile(user.id)
+    await ainvalidate_dashboard(user.id)
+    if was_published:
+        await response_cache.abump_version("assets")
+    await _delete_owned_objects(user.id, model_keys, thumb_keys)
     return {"detail": "ok"}
 
+async def _delete_owned_objects(user_id, model_keys: list[str], thumb_keys: list[str]) -> None:
+    # Keys are client-supplied; only remove objects under the owner's upload prefix. Best effort:
+    # an orphaned object is cheaper than failing a delete that is already committed, so failures
+    # are logged with their keys for cleanup instead.
+    prefix = f"{user_id}/"
+    targets = [(settings.s3_bucket_marketplace_models, k) for k in model_keys if k.startswith(prefix)]
+    targets += [(settings.s3_bucket_marketplace_thumbs, k) for k in thumb_keys if k.startswith(prefix)]
+    results = await asyncio.gather(*(s3_async.delete_object(b, k) for b, k in targets), return_exceptions=True)
+    failed = [(f"{b}/{k}", r) for (b, k), r in zip(targets, results) if isinstance(r, Exception)]
+    if failed:
+        log.warning(
+            "asset object delete failed, orphaned: %s", ", ".join(path for path, _ in failed), exc_info=failed[0][1],
+        )
+
 @router.get("/assets/{asset_id}/entitlement", response_model=EntitlementOut)
-def entitlement(asset_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    a = db.get(Asset, asset_id)
+async def entitlement(asset_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    a = await db.get(Asset, asset_id)
     if not a: not_found()
-    entitled, reason = is_entitled_to_asset(db, user.id, a)
+    entitled, reason = await ais_entitled_to_asset(db, user.id, a)
     return EntitlementOut(asset_id=str(a.id), entitled=entitled, reason=reason)
+
+@router.post("/entitlements", response_model=list[EntitlementOut])
+async def entitlements(payload: EntitlementBatchIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Entitlements for a page of asset cards: one asset query plus the (cached) user snapshot."""
+    ids = list(dict.fromkeys(payload.asset_ids))
+    if len(ids) > settings.entitlement_batch_max:
+        bad_request(f"At most {settings.entitlement_batch_max} asset ids per request")
+    rows = {r.id: r for r in (await db.execute(
+        select(Asset.id, Asset.visibility, Asset.is_paid).where(Asset.id.in_(ids))
+    )).all()}
+    snap = None
+    if any(r.visibility == "published" and r.is_paid for r in rows.values()):
+        snap = await aentitlement_snapshot(db, user.id)
+    out = []
+    for asset_id in ids:
+        r = rows.get(asset_id)
+        entitled, reason = resolve(asset_id, r.visibility, r.is_paid, snap) if r else (False, "not_found")
+        out.append(EntitlementOut(asset_id=str(asset_id), entitled=entitled, reason=reason))
+    return out
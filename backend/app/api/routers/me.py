@@ -2,33 +2,39 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_current_principal
 from app.api.schemas.me import MeOut, MeUpdateIn
 from app.core.errors import conflict
 from app.db.models.user import UserProfile
+from app.services.principal_cache import Principal, invalidate_principal, store_principal
+from app.services.response_cache import bump_version
+from app.services.user_stats import detach_user_stats, invalidate_profile
 
 router = APIRouter()
 
-@router.get("/me", response_model=MeOut)
-def get_me(user = Depends(get_current_user)):
-    profile = user.profile
+def to_me_out(p: Principal) -> MeOut:
     return MeOut(
-        id=str(user.id),
-        email=user.email,
-        role=user.role,
-        username=profile.username if profile else "",
-        bio=profile.bio if profile else None,
-        avatar_url=profile.avatar_url if profile else None,
-        links=profile.links if profile else None,
+        id=str(p.id),
+        email=p.email,
+        role=p.role,
+        username=p.username or "",
+        bio=p.bio,
+        avatar_url=p.avatar_url,
+        links=p.links,
     )
 
+@router.get("/me", response_model=MeOut)
+def get_me(principal: Principal = Depends(get_current_principal)):
+    return to_me_out(principal)
+
 @router.patch("/me", response_model=MeOut)
 def update_me(payload: MeUpdateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
     profile = user.profile
     if not profile:
         profile = UserProfile(user_id=user.id, username=payload.username or user.email.split("@")[0])
         db.add(profile)
-    if payload.username and payload.username != profile.username:
+    renamed = bool(payload.username and payload.username != profile.username)
+    if renamed:
         exists = db.execute(select(UserProfile).where(UserProfile.username == payload.username)).scalar_one_or_none()
         if exists:
             conflict("Username already taken")
@@ -40,10 +46,21 @@ def update_me(payload: MeUpdateIn, db: Session = Depends(get_db), user = Depends
     if payload.links is not None:
         profile.links = payload.links
     db.commit(); db.refresh(user)
-    return get_me(user)
+    principal = Principal.from_user(user)
+    store_principal(principal)
+    invalidate_profile(user.id)
+    if renamed:
+        # listings embed the creator's username
+        bump_version("assets")
+    return to_me_out(principal)
 
 @router.delete("/me")
 def delete_me(db: Session = Depends(get_db), user = Depends(get_current_user)):
+    user_id = user.id
+    detach_user_stats(db, user_id)
     db.delete(user)
     db.commit()
+    invalidate_principal(user_id)
+    invalidate_profile(user_id)
+    bump_version("assets")
     return {"detail": "ok"}
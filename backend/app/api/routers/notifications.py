@@ -1,24 +1,65 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
-from app.api.deps import get_db, get_current_user
+from uuid import UUID
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, tuple_
+from app.api.deps import get_async_db, get_async_principal
+from app.api.pagination import paginate, set_next_cursor
 from app.core.errors import not_found
 from app.db.models.social import Notification
+from app.services import notifications
+from app.services.pubsub import hub
 
 router = APIRouter()
 
 @router.get("", response_model=list[dict])
-def list_notifications(limit: int = 50, offset: int = 0, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    q = select(Notification).where(Notification.user_id == user.id).order_by(desc(Notification.created_at)).limit(limit).offset(offset)
-    items = db.execute(q).scalars().all()
-    return [{"id": str(n.id), "type": n.type, "payload": n.payload_json, "is_read": n.is_read, "created_at": n.created_at.isoformat()} for n in items]
+async def list_notifications(response: Response, limit: int = 50, offset: int = 0, cursor: str | None = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    q = select(Notification).where(Notification.user_id == user.id)
+    q = paginate(q, Notification.created_at, Notification.id, limit=limit, offset=offset, cursor=cursor)
+    items = (await db.execute(q)).scalars().all()
+    set_next_cursor(response, items, limit, "created_at")
+    return [notifications.to_out(n) for n in items]
+
+@router.get("/unread-count")
+async def unread_count(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    return {"count": await notifications.aunread_count(db, user.id)}
+
+@router.get("/stream")
+async def stream_notifications(db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Server-sent events: ``unread`` once, then a ``notification`` event per new notification."""
+    q = await hub.subscribe(notifications.channel(user.id))
+    try:
+        unread = await notifications.aunread_count(db, user.id)
+    except BaseException:
+        await hub.unsubscribe(notifications.channel(user.id), q)
+        raise
+    await db.close()
+    return StreamingResponse(
+        notifications.stream(user.id, q, unread),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/read")
+async def mark_all_read(up_to: UUID | None = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Mark every unread notification read, or only those up to and including ``up_to`` (newest-first order)."""
+    stmt = update(Notification).where(Notification.user_id == user.id, Notification.is_read.is_(False))
+    if up_to:
+        anchor = select(Notification.created_at, Notification.id).where(Notification.id == up_to, Notification.user_id == user.id)
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) <= anchor.scalar_subquery())
+    marked = (await db.execute(stmt.values(is_read=True).execution_options(synchronize_session=False))).rowcount or 0
+    await db.commit()
+    await notifications.amark_read(user.id, marked, all_read=up_to is None)
+    return {"marked": marked}
 
 @router.post("/{notif_id}/read")
-def mark_read(notif_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    n = db.get(Notification, notif_id)
+async def mark_read(notif_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    n = await db.get(Notification, notif_id)
     if not n or n.user_id != user.id:
         not_found()
-    n.is_read = True
-    db.commit()
+    if not n.is_read:
+        n.is_read = True
+        await db.commit()
+        await notifications.amark_read(user.id, 1)
     return {"detail": "ok"}
@@ -1,15 +1,22 @@
 from __future__ import annotations
+import asyncio
 import uuid
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
-from app.api.deps import get_db, get_current_user
-from app.api.schemas.common import PresignedURL, PresignIn
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, select
+from app.api.deps import get_async_db, get_async_principal
+from app.api.pagination import paginate, set_next_cursor
+from app.api.schemas.common import MultipartPresignIn, MultipartUploadOut, PartURL, PresignBatchIn, PresignedURL, PresignIn
 from app.api.schemas.jobs import ScanJobCreateIn, JobOut, DownloadOut
 from app.core.errors import not_found, forbidden, bad_request
-from app.db.models.jobs import ScanJob
-from app.workers.tasks import scan_reconstruct_task
+from app.db.models.jobs import ScanJob, ScanJobInput
+from app.workers.queue import enqueue
+from app.services import job_events, uploads
 from app.services.s3 import s3
+from app.services.s3_async import s3_async
+from app.services.user_stats import abump_stats, ainvalidate_dashboard
 from app.core.config import settings
 
 router = APIRouter()
@@ -24,61 +31,138 @@ def to_job_out(j: ScanJob) -> JobOut:
     )
 
 @router.post("/jobs", response_model=JobOut)
-def create_scan_job(payload: ScanJobCreateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def create_scan_job(payload: ScanJobCreateIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     if payload.kind not in ["photos", "zip"]:
         bad_request("kind must be photos|zip")
     job = ScanJob(user_id=user.id, status="created", progress=0, job_metadata={"kind": payload.kind})
-    db.add(job); db.commit(); db.refresh(job)
+    db.add(job)
+    await abump_stats(db, user.id, scan_jobs=1)
+    await db.commit(); await db.refresh(job)
+    await ainvalidate_dashboard(user.id)
     return to_job_out(job)
 
+def _input_key(user_id, job_id: str, filename: str) -> str:
+    return f"{user_id}/{job_id}/inputs/{uuid.uuid4()}_{filename}"
+
+async def _add_inputs(db: AsyncSession, job: ScanJob, inputs: list[tuple[str, str | None]]) -> None:
+    # One multi-row INSERT, however many files; the job row itself is left alone.
+    await db.execute(insert(ScanJobInput).values([
+        {"job_id": job.id, "object_key": key, "content_type": content_type} for key, content_type in inputs
+    ]))
+    await db.commit()
+
 @router.post("/jobs/{job_id}/presign", response_model=PresignedURL)
-def presign_upload(job_id: str, payload: PresignIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(ScanJob, job_id)
+async def presign_upload(job_id: str, payload: PresignIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(ScanJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
-    key = f"{user.id}/{job_id}/inputs/{uuid.uuid4()}_{payload.filename}"
+    key = _input_key(user.id, job_id, payload.filename)
     url = s3.presign_put(
         settings.s3_bucket_scans_raw,
         key,
         expires=3600,
         content_type=payload.content_type,
     )
-    # store key in job
-    keys = list(j.input_keys or [])
-    keys.append(key)
-    j.input_keys = keys
-    db.commit()
+    await _add_inputs(db, j, [(key, payload.content_type)])
     return PresignedURL(url=url, headers={"Content-Type": payload.content_type})
 
+@router.post("/jobs/{job_id}/presign:batch", response_model=list[PresignedURL])
+async def presign_upload_batch(job_id: str, payload: PresignBatchIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Presign many inputs (e.g. every photo of a capture) in one call; URLs come back in request order."""
+    if len(payload.files) > settings.scan_presign_batch_max:
+        bad_request(f"At most {settings.scan_presign_batch_max} files per batch")
+    j = await db.get(ScanJob, job_id)
+    if not j: not_found()
+    if j.user_id != user.id: forbidden()
+    keys = [_input_key(user.id, job_id, f.filename) for f in payload.files]
+    out = [
+        PresignedURL(
+            url=s3.presign_put(settings.s3_bucket_scans_raw, key, expires=3600, content_type=f.content_type),
+            headers={"Content-Type": f.content_type},
+        )
+        for key, f in zip(keys, payload.files)
+    ]
+    await _add_inputs(db, j, [(key, f.content_type) for key, f in zip(keys, payload.files)])
+    return out
+
+@router.post("/jobs/{job_id}/presign:multipart", response_model=MultipartUploadOut)
+async def presign_multipart_upload(job_id: str, payload: MultipartPresignIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Start a multipart upload for a large input (e.g. a zip); parts go through /uploads/multipart."""
+    if payload.size > settings.max_upload_bytes:
+        bad_request("File too large")
+    j = await db.get(ScanJob, job_id)
+    if not j: not_found()
+    if j.user_id != user.id: forbidden()
+    key = _input_key(user.id, job_id, payload.filename)
+    upload_id, part_size, part_count = await uploads.start(settings.s3_bucket_scans_raw, key, payload.size, payload.content_type)
+    # Recorded now like single-PUT inputs; start drops it if the upload is never completed.
+    await _add_inputs(db, j, [(key, payload.content_type)])
+    urls = uploads.presign_parts(settings.s3_bucket_scans_raw, key, upload_id, range(1, part_count + 1))
+    return MultipartUploadOut(
+        key=key, upload_id=upload_id, part_size=part_size, part_count=part_count,
+        parts=[PartURL(part_number=n, url=url) for n, url in urls],
+    )
+
 @router.post("/jobs/{job_id}/start", response_model=JobOut)
-def start_reconstruction(job_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(ScanJob, job_id)
+async def start_reconstruction(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(ScanJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
-    if not j.input_keys:
+    inputs = (await db.execute(
+        select(ScanJobInput.id, ScanJobInput.object_key).where(ScanJobInput.job_id == j.id)
+    )).all()
+    if not inputs:
         bad_request("Upload images first")
+    # Presigned uploads the client never completed would fail the worker; drop them here.
+    found = await asyncio.gather(*(s3_async.head_object(settings.s3_bucket_scans_raw, i.object_key) for i in inputs))
+    missing = [i.id for i, obj in zip(inputs, found) if obj is None]
+    if len(missing) == len(inputs):
+        bad_request("Upload images first")
+    if missing:
+        await db.execute(delete(ScanJobInput).where(ScanJobInput.id.in_(missing)))
     j.status = "queued"
     j.progress = 0
-    db.commit()
-    scan_reconstruct_task.delay(str(j.id))
+    await db.commit()
+    await run_in_threadpool(enqueue, "scan_reconstruct_task", str(j.id))
     return to_job_out(j)
 
 @router.get("/jobs", response_model=list[JobOut])
-def list_jobs(limit: int = 20, offset: int = 0, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    q = select(ScanJob).where(ScanJob.user_id == user.id).order_by(desc(ScanJob.created_at)).limit(limit).offset(offset)
-    items = db.execute(q).scalars().all()
+async def list_jobs(response: Response, limit: int = 20, offset: int = 0, cursor: str | None = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    q = paginate(select(ScanJob).where(ScanJob.user_id == user.id), ScanJob.created_at, ScanJob.id, limit=limit, offset=offset, cursor=cursor)
+    items = (await db.execute(q)).scalars().all()
+    set_next_cursor(response, items, limit, "created_at")
     return [to_job_out(j) for j in items]
 
+@router.get("/jobs/{job_id}/events")
+async def job_events_stream(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    """Server-sent ``progress`` events for the job until it succeeds or fails (replaces polling)."""
+    q = await job_events.hub.subscribe(job_events.channel("scan", job_id))
+    try:
+        j = await db.get(ScanJob, job_id)
+        if not j: not_found()
+        if j.user_id != user.id: forbidden()
+        current = {"id": str(j.id), "kind": "scan", "status": j.status, "progress": j.progress, "stage": None, "error": j.error}
+    except BaseException:
+        await job_events.hub.unsubscribe(job_events.channel("scan", job_id), q)
+        raise
+    # Don't hold a pooled connection for the lifetime of the stream.
+    await db.close()
+    return StreamingResponse(
+        job_events.stream("scan", job_id, q, current),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/jobs/{job_id}", response_model=JobOut)
-def get_job(job_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(ScanJob, job_id)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(ScanJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
     return to_job_out(j)
 
 @router.get("/jobs/{job_id}/download/glb", response_model=DownloadOut)
-def download_glb(job_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    j = db.get(ScanJob, job_id)
+async def download_glb(job_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    j = await db.get(ScanJob, job_id)
     if not j: not_found()
     if j.user_id != user.id: forbidden()
     if not j.output_glb_key: not_found("No GLB yet")
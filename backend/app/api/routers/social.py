@@ -1,14 +1,22 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from sqlalchemy import select, desc, func, or_
-from app.api.deps import get_db, get_current_user
+import datetime as dt
+from sqlalchemy import select, exists
+from app.api.deps import get_async_db, get_async_principal, get_async_read_db
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate, set_next_cursor
 from app.api.schemas.social import FollowUserOut, PostCreateIn, PostOut, ProfileOut
 from app.core.errors import not_found, conflict
 from app.db.models.social import Post, Like, Save, Follow
-from app.db.models.marketplace import Asset
-from app.db.models.user import User, UserProfile
+from app.db.models.user import User, UserProfile, UserStats
+from app.services.notifications import anotify
+from app.services.timelines import on_follow, on_unfollow, read_feed
+from app.workers.queue import enqueue
+from app.services.user_stats import (
+    ProfileSnapshot, abump_stats, aget_profile_snapshot, ainvalidate_profile, astore_profile_snapshot, profile_stats_columns,
+)
 
 router = APIRouter()
 
@@ -19,85 +27,121 @@ def to_post_out(p: Post) -> PostOut:
     )
 
 @router.post("/posts", response_model=PostOut)
-def create_post(payload: PostCreateIn, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def create_post(payload: PostCreateIn, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
     p = Post(creator_id=user.id, asset_id=payload.asset_id, caption=payload.caption, media_keys=payload.media_keys)
-    db.add(p); db.commit(); db.refresh(p)
+    db.add(p); await db.commit(); await db.refresh(p)
+    await run_in_threadpool(enqueue, "fanout_post_task", str(p.id))
     return to_post_out(p)
 
+@router.get("/feed", response_model=list[PostOut])
+async def home_feed(response: Response, limit: int = 20, cursor: str | None = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    # Primary, not a replica: a missing timeline is rebuilt from this session, and fan-out skips
+    # timelines that don't exist, so a lagging rebuild would lose recent posts until it expires.
+    limit = max(1, min(limit, 100))
+    entries = await read_feed(db, user.id, limit, decode_cursor(cursor) if cursor else None)
+    if not entries:
+        return []
+    ids = [post_id for post_id, _ in entries]
+    by_id = {p.id: p for p in (await db.execute(select(Post).where(Post.id.in_(ids)))).scalars().all()}
+    items = [by_id[i] for i in ids if i in by_id]
+    if len(entries) == limit:
+        last_id = ids[-1]
+        last = by_id.get(last_id)
+        ts = last.created_at if last else dt.datetime.fromtimestamp(entries[-1][1] / 1000, dt.timezone.utc)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(ts, last_id)
+    return [to_post_out(p) for p in items]
+
 @router.get("/posts", response_model=list[PostOut])
-def feed(limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
-    q = select(Post).order_by(desc(Post.created_at)).limit(limit).offset(offset)
-    return [to_post_out(p) for p in db.execute(q).scalars().all()]
+async def feed(response: Response, limit: int = 20, offset: int = 0, cursor: str | None = None, db: AsyncSession = Depends(get_async_read_db)):
+    q = paginate(select(Post), Post.created_at, Post.id, limit=limit, offset=offset, cursor=cursor)
+    items = (await db.execute(q)).scalars().all()
+    set_next_cursor(response, items, limit, "created_at")
+    return [to_post_out(p) for p in items]
 
 @router.post("/posts/{post_id}/like")
-def like(post_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    existing = db.execute(select(Like).where(Like.user_id==user.id, Like.post_id==post_id)).scalar_one_or_none()
+async def like(post_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    existing = (await db.execute(select(Like).where(Like.user_id==user.id, Like.post_id==post_id))).scalar_one_or_none()
     if existing:
         conflict("Already liked")
     db.add(Like(user_id=user.id, post_id=post_id))
-    db.commit()
+    await db.commit()
+    creator_id = (await db.execute(select(Post.creator_id).where(Post.id == post_id))).scalar_one_or_none()
+    if creator_id and creator_id != user.id:
+        await anotify(db, creator_id, "post_like", {"post_id": str(post_id), "user_id": str(user.id)})
     return {"detail": "ok"}
 
 @router.post("/posts/{post_id}/save")
-def save(post_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    existing = db.execute(select(Save).where(Save.user_id==user.id, Save.post_id==post_id)).scalar_one_or_none()
+async def save(post_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    existing = (await db.execute(select(Save).where(Save.user_id==user.id, Save.post_id==post_id))).scalar_one_or_none()
     if existing:
         conflict("Already saved")
     db.add(Save(user_id=user.id, post_id=post_id))
-    db.commit()
+    await db.commit()
     return {"detail": "ok"}
 
 @router.post("/follow/{user_id}")
-def follow(user_id: UUID, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    existing = db.execute(select(Follow).where(Follow.follower_id==user.id, Follow.following_id==user_id)).scalar_one_or_none()
+async def follow(user_id: UUID, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    existing = (await db.execute(select(Follow).where(Follow.follower_id==user.id, Follow.following_id==user_id))).scalar_one_or_none()
     if existing:
         conflict("Already following")
     db.add(Follow(follower_id=user.id, following_id=user_id))
-    db.commit()
+    await abump_stats(db, user_id, followers=1)
+    await abump_stats(db, user.id, following=1)
+    await db.commit()
+    await ainvalidate_profile(user_id, user.id)
+    await on_follow(user.id, user_id)
+    await anotify(db, user_id, "follow", {"user_id": str(user.id)})
     return {"detail": "ok"}
 
 @router.delete("/follow/{user_id}")
-def unfollow(user_id: UUID, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    existing = db.execute(select(Follow).where(Follow.follower_id==user.id, Follow.following_id==user_id)).scalar_one_or_none()
+async def unfollow(user_id: UUID, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    existing = (await db.execute(select(Follow).where(Follow.follower_id==user.id, Follow.following_id==user_id))).scalar_one_or_none()
     if not existing:
         not_found("Follow not found")
-    db.delete(existing)
-    db.commit()
+    await db.delete(existing)
+    await abump_stats(db, user_id, followers=-1)
+    await abump_stats(db, user.id, following=-1)
+    await db.commit()
+    await ainvalidate_profile(user_id, user.id)
+    await on_unfollow(user.id, user_id)
     return {"detail": "ok"}
 
 @router.get("/profile/{user_id}", response_model=ProfileOut)
-def profile(user_id: UUID, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    prof = db.get(UserProfile, user_id)
-    if not prof:
-        target_user = db.get(User, user_id)
-        if not target_user:
-            not_found("Profile not found")
-        default_username = target_user.email.split("@")[0]
-        prof = UserProfile(user_id=user_id, username=default_username, bio=None, avatar_url=None, links=None)
-        db.add(prof)
-        db.commit()
-        db.refresh(prof)
-    posts_stmt = select(func.count()).select_from(Asset).where(Asset.creator_id==user_id)
-    if user.id != user_id:
-        posts_stmt = posts_stmt.where(Asset.visibility == "published")
-    posts = db.execute(posts_stmt).scalar_one()
-    followers = db.execute(select(func.count()).select_from(Follow).where(Follow.following_id==user_id)).scalar_one()
-    following = db.execute(select(func.count()).select_from(Follow).where(Follow.follower_id==user_id)).scalar_one()
+async def profile(user_id: UUID, db: AsyncSession = Depends(get_async_db), user = Depends(get_async_principal)):
+    is_self = user.id == user_id
     is_following = False
-    if user.id != user_id:
-        is_following = db.execute(
-            select(Follow).where(Follow.follower_id==user.id, Follow.following_id==user_id)
-        ).scalar_one_or_none() is not None
+    snap = await aget_profile_snapshot(user_id)
+    if snap is None:
+        following_q = exists().where(Follow.follower_id == user.id, Follow.following_id == User.id)
+        row = (await db.execute(
+            select(User.email, UserProfile.username, UserProfile.bio, UserProfile.avatar_url,
+                   *profile_stats_columns(), following_q.label("is_following"))
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .where(User.id == user_id)
+        )).one_or_none()
+        if not row:
+            not_found("Profile not found")
+        snap = ProfileSnapshot(
+            username=row.username or row.email.split("@")[0], bio=row.bio, avatar_url=row.avatar_url,
+            followers=row.followers, following=row.following, assets=row.assets, published_assets=row.published_assets,
+        )
+        await astore_profile_snapshot(user_id, snap)
+        is_following = not is_self and row.is_following
+    elif not is_self:
+        is_following = (await db.execute(
+            select(exists().where(Follow.follower_id == user.id, Follow.following_id == user_id))
+        )).scalar_one()
     return ProfileOut(
         user_id=str(user_id),
-        username=prof.username,
-        bio=prof.bio,
-        avatar_url=prof.avatar_url,
-        posts=posts,
-        followers=followers,
-        following=following,
+        username=snap.username,
+        bio=snap.bio,
+        avatar_url=snap.avatar_url,
+        posts=snap.assets if is_self else snap.published_assets,
+        followers=snap.followers,
+        following=snap.following,
         is_following=is_following,
-        is_self=user.id == user_id,
+        is_self=is_self,
     )
 
 def _follow_user_out(user: User, profile: UserProfile | None) -> FollowUserOut:
@@ -109,7 +153,7 @@ def _follow_user_out(user: User, profile: UserProfile | None) -> FollowUserOut:
     )
 
 @router.get("/followers/{user_id}", response_model=list[FollowUserOut])
-def followers(user_id: UUID, limit: int = 50, offset: int = 0, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def followers(user_id: UUID, limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_async_read_db), user = Depends(get_async_principal)):
     stmt = (
         select(User, UserProfile)
         .join(Follow, Follow.follower_id == User.id)
@@ -119,11 +163,11 @@ def followers(user_id: UUID, limit: int = 50, offset: int = 0, db: Session = Dep
         .limit(limit)
         .offset(offset)
     )
-    rows = db.execute(stmt).all()
+    rows = (await db.execute(stmt)).all()
     return [_follow_user_out(row[0], row[1]) for row in rows]
 
 @router.get("/following/{user_id}", response_model=list[FollowUserOut])
-def following(user_id: UUID, limit: int = 50, offset: int = 0, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def following(user_id: UUID, limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_async_read_db), user = Depends(get_async_principal)):
     stmt = (
         select(User, UserProfile)
         .join(Follow, Follow.following_id == User.id)
@@ -133,5 +177,5 @@ def following(user_id: UUID, limit: int = 50, offset: int = 0, db: Session = Dep
         .limit(limit)
         .offset(offset)
     )
-    rows = db.execute(stmt).all()
+    rows = (await db.execute(stmt)).all()
     return [_follow_user_out(row[0], row[1]) for row in rows]
@@ -5,7 +5,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, desc
 from app.api.deps import get_db
 from app.core.errors import bad_request
-from app.db.models.marketplace import Purchase, Subscription
+from app.db.models.marketplace import Asset, Purchase, Subscription
+from app.services.entitlements import invalidate_entitlements
+from app.services.notifications import notify
 from app.services.stripe_service import verify_webhook
 
 router = APIRouter()
@@ -34,6 +36,10 @@ async def webhook(request: Request, stripe_signature: str | None = Header(defaul
                     p.status = "succeeded"
                     p.stripe_payment_intent = data.get("payment_intent")
                     db.commit()
+                    invalidate_entitlements(p.user_id)
+                    a = db.get(Asset, p.asset_id)
+                    if a:
+                        notify(db, a.creator_id, "asset_purchase", {"asset_id": str(a.id), "user_id": str(p.user_id)})
         if meta.get("kind") == "subscription":
             # subscription id lives on session.subscriptions
             sub_id = data.get("subscription")
@@ -42,6 +48,7 @@ async def webhook(request: Request, stripe_signature: str | None = Header(defaul
             if sub_id and customer and user_id:
                 s = Subscription(user_id=user_id, stripe_customer_id=customer, stripe_subscription_id=sub_id, status="active", plan="default", current_period_end=None)
                 db.add(s); db.commit()
+                invalidate_entitlements(user_id)
     elif etype.startswith("customer.subscription."):
         sub = data
         sub_id = sub.get("id")
@@ -53,5 +60,6 @@ async def webhook(request: Request, stripe_signature: str | None = Header(defaul
                 if cpe:
                     s.current_period_end = dt.datetime.fromtimestamp(int(cpe), tz=dt.timezone.utc)
                 db.commit()
+                invalidate_entitlements(s.user_id)
 
     return {"received": True}
\ No newline at end of file
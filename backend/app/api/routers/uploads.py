@@ -0,0 +1,45 @@
+from __future__ import annotations
+from fastapi import APIRouter, Depends
+from app.api.deps import get_async_principal
+from app.api.schemas.common import MultipartCompleteOut, MultipartPartsIn, MultipartRef, PartURL, UploadedPart
+from app.core.errors import bad_request, forbidden, not_found
+from app.services import uploads
+from app.services.s3_async import S3Error, s3_async
+
+# Part presign, resume, complete and abort for multipart uploads started by
+# POST /scan/jobs/{id}/presign:multipart or POST /marketplace/assets/presign:multipart.
+router = APIRouter()
+
+def _bucket(user, key: str) -> str:
+    bucket = uploads.bucket_for_key(user.id, key)
+    if not bucket: forbidden()
+    return bucket
+
+@router.post("/multipart/parts", response_model=list[PartURL])
+async def presign_parts(payload: MultipartPartsIn, user = Depends(get_async_principal)):
+    bucket = _bucket(user, payload.key)
+    numbers = sorted(set(payload.part_numbers))
+    if numbers[0] < 1 or numbers[-1] > uploads.max_part_number():
+        bad_request(f"part numbers must be between 1 and {uploads.max_part_number()}")
+    return [PartURL(part_number=n, url=url) for n, url in uploads.presign_parts(bucket, payload.key, payload.upload_id, numbers)]
+
+@router.get("/multipart/parts", response_model=list[UploadedPart])
+async def list_parts(key: str, upload_id: str, user = Depends(get_async_principal)):
+    """Parts already stored, so an interrupted client can resume with the missing ones."""
+    parts = await s3_async.list_parts(_bucket(user, key), key, upload_id)
+    if parts is None: not_found()
+    return [UploadedPart(part_number=p.part_number, size=p.size, etag=p.etag) for p in parts]
+
+@router.post("/multipart/complete", response_model=MultipartCompleteOut)
+async def complete(payload: MultipartRef, user = Depends(get_async_principal)):
+    try:
+        size = await uploads.finish(_bucket(user, payload.key), payload.key, payload.upload_id)
+    except (ValueError, S3Error) as e:
+        bad_request(str(e))
+    if size is None: not_found()
+    return MultipartCompleteOut(key=payload.key, size=size)
+
+@router.post("/multipart/abort")
+async def abort(payload: MultipartRef, user = Depends(get_async_principal)):
+    await s3_async.abort_multipart_upload(_bucket(user, payload.key), payload.key, payload.upload_id)
+    return {"detail": "ok"}
@@ -19,3 +19,36 @@ class PresignedURL(BaseModel):
 class PresignIn(BaseModel):
     filename: str
     content_type: str = "application/octet-stream"
+
+class PresignBatchIn(BaseModel):
+    files: list[PresignIn] = Field(min_length=1)
+
+class MultipartPresignIn(PresignIn):
+    size: int = Field(gt=0, description="Total upload size in bytes")
+
+class PartURL(BaseModel):
+    part_number: int
+    url: str
+
+class MultipartUploadOut(BaseModel):
+    key: str
+    upload_id: str
+    part_size: int
+    part_count: int
+    parts: list[PartURL]
+
+class MultipartRef(BaseModel):
+    key: str
+    upload_id: str
+
+class MultipartPartsIn(MultipartRef):
+    part_numbers: list[int] = Field(min_length=1)
+
+class UploadedPart(BaseModel):
+    part_number: int
+    size: int
+    etag: str
+
+class MultipartCompleteOut(BaseModel):
+    key: str
+    size: int
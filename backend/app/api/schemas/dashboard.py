@@ -0,0 +1,18 @@
+from __future__ import annotations
+from pydantic import BaseModel, Field
+
+class DashboardOut(BaseModel):
+    assets: int = 0
+    downloads: int = 0
+    ai_jobs: int = 0
+    scan_jobs: int = 0
+
+class TimeSeriesPoint(BaseModel):
+    t: str
+    downloads: int = 0
+    likes: int = 0
+
+class AssetTimeSeriesOut(BaseModel):
+    asset_id: str
+    interval: str = "hour"
+    points: list[TimeSeriesPoint] = Field(default_factory=list)
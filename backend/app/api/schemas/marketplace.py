@@ -1,6 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import Any
+from uuid import UUID
 
 class AssetOut(BaseModel):
     id: str
@@ -55,6 +56,9 @@ class AssetPresignIn(BaseModel):
     content_type: str = "application/octet-stream"
     kind: str = "model"
 
+class AssetMultipartPresignIn(AssetPresignIn):
+    size: int = Field(gt=0, description="Total upload size in bytes")
+
 class AssetPresignOut(BaseModel):
     url: str
     key: str
@@ -63,3 +67,6 @@ class EntitlementOut(BaseModel):
     asset_id: str
     entitled: bool
     reason: str
+
+class EntitlementBatchIn(BaseModel):
+    asset_ids: list[UUID] = Field(min_length=1)
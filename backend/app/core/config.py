@@ -6,6 +6,19 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     database_url: str = "postgresql+psycopg://r2v:r2v@db:5432/r2v"
+    # Comma-separated async read replicas for read-only handlers; replicas lagging more than
+    # db_replica_max_lag_seconds (checked every db_replica_check_seconds) fall back to the primary.
+    database_replica_urls: str = ""
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_check_seconds: float = 5.0
+    # Per-engine pool sizing (per process). With PgBouncer in transaction mode set db_pgbouncer.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_replica_pool_size: int = 10
+    db_replica_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pgbouncer: bool = False
     redis_url: str = "redis://redis:6379/0"
 
     s3_endpoint_url: str = "http://minio:9000"
@@ -17,6 +30,13 @@ class Settings(BaseSettings):
     s3_bucket_marketplace_thumbs: str = "r2v-marketplace-thumbs"
     s3_bucket_scans_raw: str = "r2v-user-scans-raw"
     s3_bucket_job_outputs: str = "r2v-job-outputs"
+    # Presigned GETs are signed per aligned window and memoized (0 disables).
+    s3_presign_window_seconds: int = 900
+    s3_presign_cache_size: int = 50000
+    # boto3 pool for workers (botocore defaults to 10); the API's async client has its own pool.
+    s3_max_pool_connections: int = 50
+    s3_async_max_connections: int = 100
+    s3_async_timeout_seconds: float = 30.0
 
     jwt_secret: str = "dev_secret_change_in_prod"
     jwt_issuer: str = "r2v-backend"
@@ -25,6 +45,23 @@ class Settings(BaseSettings):
     refresh_token_expires_days: int = 30
     verification_code_expires_min: int = 15
     password_reset_expires_min: int = 30
+    # Authenticated-principal cache: in-process LRU (short TTL) in front of an optional Redis tier.
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 10
+    principal_cache_redis: bool = True
+    principal_cache_redis_ttl_seconds: int = 300
+    # Public profile snapshots (GET /social/profile/{id}); invalidated on writes, local TTL bounds cross-worker staleness.
+    profile_cache_size: int = 10000
+    profile_cache_ttl_seconds: int = 5
+    profile_cache_redis_ttl_seconds: int = 300
+    dashboard_cache_ttl_seconds: int = 300
+    # Per-user entitlement snapshots (subscription flag + purchased asset ids); invalidated by the Stripe webhook.
+    entitlement_cache_ttl_seconds: int = 300
+    entitlement_batch_max: int = 100
+    asset_batch_max: int = 200
+    # Serialized public listings (GET /marketplace/assets) with ETags; 0 disables. Asset writes bump
+    # a version that orphans all entries, so the TTL only bounds staleness of like/view counts.
+    response_cache_ttl_seconds: int = 30
 
     stripe_secret_key: str = ""
     stripe_webhook_secret: str = ""
@@ -39,7 +76,67 @@ class Settings(BaseSettings):
 
     rate_limit_requests: int = 120
     rate_limit_window_seconds: int = 60
+    # "METHOD /path-glob" -> tokens per request; 0 exempts the route. Unmatched routes cost 1.
+    rate_limit_route_costs: dict[str, int] = {
+        "GET /health": 0,
+        "GET /metrics": 0,
+        "POST /auth/login": 5,
+        "POST /auth/signup": 5,
+        "POST /auth/password/*": 5,
+        "POST /ai/jobs": 10,
+        "POST /scan/jobs/*/start": 10,
+        "POST /billing/checkout/*": 5,
+    }
+    # Approve up to N tokens per client locally between Redis syncs (1 = every request hits Redis).
+    rate_limit_local_sync_every: int = 1
     max_upload_bytes: int = 104857600
+    # Multipart uploads: target part size (S3 minimum is 5 MiB) and how long part URLs stay valid.
+    upload_part_bytes: int = 8388608
+    upload_part_url_expires_seconds: int = 3600
+    # Files per POST /scan/jobs/{id}/presign:batch call.
+    scan_presign_batch_max: int = 500
+    # Zip scan inputs are read in place with ranged GETs of this size; only image members are
+    # extracted, bounded in count and total uncompressed bytes.
+    scan_zip_read_block_bytes: int = 1048576
+    scan_zip_max_members: int = 2000
+    scan_zip_max_extracted_bytes: int = 1073741824
+
+    # Asset like/save/download counters: an atomic UPDATE per event, or (buffered) deltas
+    # accumulated in Redis and applied in batches by the beat-scheduled flush task.
+    # Views are always buffered (they ride on the recently-viewed write-behind).
+    asset_counters_buffered: bool = False
+    asset_counters_flush_seconds: float = 5.0
+    asset_counters_flush_batch: int = 1000
+    # Home feed: per-user Redis timelines (fan-out on write), bounded and expiring when idle.
+    # Creators above the follower threshold are merged at read time instead of fanned out.
+    feed_timeline_length: int = 800
+    feed_timeline_ttl_seconds: int = 14 * 86400
+    feed_fanout_max_followers: int = 10000
+    feed_fanout_batch: int = 1000
+    # SSE streams (job progress, notifications): comment line sent when quiet, so proxies keep the connection.
+    sse_keepalive_seconds: float = 15.0
+    # Notifications are queued in Redis and inserted in batches by the beat-scheduled flush.
+    notifications_flush_seconds: float = 1.0
+    notifications_flush_batch: int = 1000
+    notifications_unread_ttl_seconds: int = 3600
+    # Download events: Redis stream drained by celery beat into the monthly-partitioned downloads table.
+    download_events_max_len: int = 1_000_000
+    download_events_flush_seconds: float = 2.0
+    download_events_flush_batch: int = 2000
+    downloads_partitions_ahead: int = 3
+    # Drop downloads partitions older than N months (0 keeps everything). Lifetime download counters
+    # are then no longer reconciled from the table.
+    downloads_retention_months: int = 0
+    # The API samples the write-behind buffers every N seconds and logs a warning (celery beat not
+    # running?) when one has grown for warn_samples samples in a row and holds at least warn_size entries.
+    write_behind_check_seconds: float = 60.0
+    write_behind_warn_samples: int = 5
+    write_behind_warn_size: int = 1000
+    # Recently viewed: per-user Redis sorted set, written behind to recently_viewed by celery beat.
+    recently_viewed_limit: int = 50
+    recently_viewed_ttl_seconds: int = 30 * 86400
+    recently_viewed_flush_seconds: float = 10.0
+    recently_viewed_flush_batch: int = 1000
 
     openscancloud_base_url: str | None = None
     openscancloud_token: str | None = None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import os
+import time
+import uuid
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.logging import get_logger
+
+log = get_logger("app.request")
+
+# With PROMETHEUS_MULTIPROC_DIR set (one dir shared by all uvicorn workers), prometheus_client
+# writes samples to mmap'd files and /metrics aggregates every worker; otherwise it is in-process.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter("http_requests_total", "Responses by route and status", ["method", "route", "status"])
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size by route template",
+    ["method", "route"], buckets=SIZE_BUCKETS,
+)
+# Hit ratio: rate(...{result="hit"}) / rate(...{result=~"hit|miss"}).
+RESPONSE_CACHE = Counter("response_cache_requests_total", "Response cache lookups by cache and result", ["cache", "result"])
+# SQLAlchemy pools, labelled by engine (primary, primary_async, replicaN).
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum")
+DB_POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent acquiring a pooled connection", ["engine"], buckets=LATENCY_BUCKETS)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that hit pool_timeout", ["engine"])
+DB_READ_ROUTE = Counter("db_read_sessions_total", "Read-only sessions by target (replicaN or primary_fallback)", ["target"])
+# Redis write-behind buffers waiting for a beat-scheduled flush; every API worker samples the same keys.
+WRITE_BEHIND_BACKLOG = Gauge("write_behind_backlog", "Entries waiting in a Redis write-behind buffer", ["buffer"], multiprocess_mode="max")
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served", multiprocess_mode="livesum")
+
+def render_metrics() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+def _route_label(scope: Scope) -> str:
+    # FastAPI stores the matched APIRoute in the scope; templates keep label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware: request id propagation, access log and per-route metrics."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["x-request-id"] = request_id
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            route = _route_label(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            log.info(
+                "request",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": int(elapsed * 1000),
+                },
+            )
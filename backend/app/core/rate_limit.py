@@ -1,20 +1,141 @@
 from __future__ import annotations
-from fastapi import Request
+import math
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.core.config import settings
-from app.services.redis_client import get_redis_sync
-
-async def rate_limit_middleware(request: Request, call_next):
-    ip = request.client.host if request.client else "unknown"
-    key = f"rl:{ip}:{request.url.path}"
-    r = get_redis_sync()
-    try:
-        count = r.incr(key)
-        if count == 1:
-            r.expire(key, settings.rate_limit_window_seconds)
-        if count > settings.rate_limit_requests:
-            retry_after = r.ttl(key)
-            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"}, headers={"Retry-After": str(max(retry_after, 1))})
-    except Exception:
-        pass
-    return await call_next(request)
+from app.services.principal_cache import decode_access_claims
+from app.services.redis_client import get_redis_async
+
+# Token bucket, one round-trip. ARGV: capacity, refill tokens/ms, cost, debt.
+# "debt" settles tokens already granted by the local pre-counter and is charged unconditionally.
+# Uses the Redis server clock so API replicas never disagree about elapsed time.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local debt = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill) - debt
+local allowed = 0
+local retry_ms = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_ms = math.ceil((cost - tokens) / refill)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill) + 1000)
+return {allowed, tostring(tokens), retry_ms}
+"""
+
+LOCAL_MAX_AGE_SECONDS = 1.0
+
+_bucket_script = None
+
+def _script():
+    global _bucket_script
+    if _bucket_script is None:
+        _bucket_script = get_redis_async().register_script(TOKEN_BUCKET_LUA)
+    return _bucket_script
+
+@lru_cache(maxsize=4096)
+def route_cost(method: str, path: str) -> int:
+    target = f"{method} {path}"
+    for pattern, cost in settings.rate_limit_route_costs.items():
+        if fnmatchcase(target, pattern):
+            return cost
+    return 1
+
+def client_key(scope: Scope) -> str:
+    auth = Headers(scope=scope).get("authorization") or ""
+    if auth[:7].lower() == "bearer ":
+        try:
+            sub = decode_access_claims(auth[7:]).get("sub")
+        except Exception:
+            sub = None
+        if sub:
+            return f"rl:u:{sub}"
+    client = scope.get("client")
+    ip = client[0] if client else "unknown"
+    return f"rl:ip:{ip}"
+
+class LocalPreCounter:
+    """Approximate in-process counter for hot clients.
+
+    After a Redis sync reports ``remaining`` tokens, up to ``batch`` tokens are granted locally
+    without a round-trip; the next sync charges them to the shared bucket as debt.
+    """
+
+    def __init__(self, batch: int, max_clients: int = 10_000) -> None:
+        self.batch = batch
+        self.max_clients = max_clients
+        self._state: OrderedDict[str, list[float]] = OrderedDict()
+
+    def try_spend(self, key: str, cost: int) -> bool:
+        st = self._state.get(key)
+        if st is None:
+            return False
+        pending, remaining, synced_at = st
+        if time.monotonic() - synced_at > LOCAL_MAX_AGE_SECONDS:
+            return False
+        if pending + cost > self.batch or pending + cost > remaining:
+            return False
+        st[0] = pending + cost
+        self._state.move_to_end(key)
+        return True
+
+    def take_debt(self, key: str) -> int:
+        st = self._state.pop(key, None)
+        return int(st[0]) if st else 0
+
+    def record(self, key: str, remaining: float) -> None:
+        self._state[key] = [0, remaining, time.monotonic()]
+        if len(self._state) > self.max_clients:
+            self._state.popitem(last=False)
+
+_local = LocalPreCounter(settings.rate_limit_local_sync_every) if settings.rate_limit_local_sync_every > 1 else None
+
+class RateLimitMiddleware:
+    """Pure ASGI token-bucket limiter: answers 429 itself, otherwise passes the request through untouched."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        retry_after = await self._retry_after(scope) if scope["type"] == "http" else None
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"}, headers={"Retry-After": str(retry_after)})
+        await response(scope, receive, send)
+
+    async def _retry_after(self, scope: Scope) -> int | None:
+        """Seconds to wait if the request is over the limit, else ``None`` (fails open without Redis)."""
+        cost = route_cost(scope["method"], scope["path"])
+        if cost <= 0:
+            return None
+        key = client_key(scope)
+        if _local and _local.try_spend(key, cost):
+            return None
+        debt = _local.take_debt(key) if _local else 0
+        capacity = settings.rate_limit_requests
+        refill_per_ms = capacity / (settings.rate_limit_window_seconds * 1000)
+        try:
+            allowed, remaining, retry_ms = await _script()(keys=[key], args=[capacity, refill_per_ms, cost, debt])
+        except Exception:
+            return None
+        if _local:
+            _local.record(key, float(remaining))
+        if allowed:
+            return None
+        return max(math.ceil(int(retry_ms) / 1000), 1)
@@ -1,5 +1,5 @@
-from app.db.models.user import User, UserProfile, RefreshToken, VerificationCode
-from app.db.models.jobs import AIJob, ScanJob
-from app.db.models.marketplace import Asset, Download, Purchase, Subscription, RecentlyViewed
+from app.db.models.user import User, UserProfile, UserStats, RefreshToken, VerificationCode
+from app.db.models.jobs import AIJob, ScanJob, ScanJobInput
+from app.db.models.marketplace import Asset, AssetStatsHourly, Download, Purchase, Subscription, RecentlyViewed
 from app.db.models.social import Post, Like, Save, Follow, Notification
 from app.db.models.audit import AuditLog
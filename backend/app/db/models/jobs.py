@@ -1,12 +1,13 @@
 from __future__ import annotations
 import uuid, datetime as dt
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 class AIJob(Base):
     __tablename__ = "ai_jobs"
+    __table_args__ = (Index("ix_ai_jobs_user_keyset", "user_id", text("created_at DESC"), text("id DESC")),)
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     status: Mapped[str] = mapped_column(String(32), index=True, default="queued", nullable=False)
@@ -28,11 +29,11 @@ class AIJob(Base):
 
 class ScanJob(Base):
     __tablename__ = "scan_jobs"
+    __table_args__ = (Index("ix_scan_jobs_user_keyset", "user_id", text("created_at DESC"), text("id DESC")),)
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     status: Mapped[str] = mapped_column(String(32), index=True, default="created", nullable=False)
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    input_keys: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
     logs: Mapped[str | None] = mapped_column(Text, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     # NOTE: attribute name cannot be "metadata" (reserved by SQLAlchemy Declarative).
@@ -43,3 +44,12 @@ class ScanJob(Base):
     preview_keys: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
     updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), onupdate=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
+
+class ScanJobInput(Base):
+    """One uploaded (or presigned, not yet uploaded) input object of a scan job."""
+    __tablename__ = "scan_job_inputs"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scan_jobs.id", ondelete="CASCADE"), index=True, nullable=False)
+    object_key: Mapped[str] = mapped_column(Text, nullable=False)
+    content_type: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
@@ -1,13 +1,24 @@
 from __future__ import annotations
 import uuid, datetime as dt
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Index
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Boolean, Computed, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
+ASSET_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(jsonb_to_tsvector('english', tags, '[\"string\"]'), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
 class Asset(Base):
     __tablename__ = "assets"
-    __table_args__ = (Index("ix_assets_search", "title", "category", "style"),)
+    __table_args__ = (Index("ix_assets_search", "title", "category", "style"),
+                      Index("ix_assets_published_keyset", text("published_at DESC"), text("id DESC"),
+                            postgresql_where=text("visibility = 'published'")),
+                      Index("ix_assets_search_vector", "search_vector", postgresql_using="gin"),
+                      Index("ix_assets_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+                      Index("ix_assets_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}))
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     creator_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     title: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
@@ -27,15 +38,35 @@ class Asset(Base):
     # NOTE: attribute name cannot be "metadata" (reserved by SQLAlchemy Declarative).
     # Column name MUST remain "metadata" per the project spec.
     meta_json: Mapped[dict] = mapped_column("metadata", JSONB, default=dict, nullable=False)
+    # Maintained by app.services.counters; reconciled against likes/saves/downloads periodically.
+    like_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    save_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    download_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    view_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Generated by Postgres (migration 0004); deferred so ordinary asset loads never fetch it.
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, Computed(ASSET_SEARCH_VECTOR_SQL, persisted=True), deferred=True)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
     updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), onupdate=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
 
+class AssetStatsHourly(Base):
+    """Per-asset hourly rollup behind the dashboard time series (maintained by app.services.counters)."""
+    __tablename__ = "asset_stats_hourly"
+    asset_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    downloads: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    likes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
 class Download(Base):
+    # Range-partitioned by month (migration 0008); partitions are created ahead and expired by
+    # app.services.download_events. The partition key has to be part of the primary key.
     __tablename__ = "downloads"
+    __table_args__ = (Index("ix_downloads_user_created", "user_id", "created_at"),
+                      Index("ix_downloads_asset_created", "asset_id", "created_at"),
+                      {"postgresql_partition_by": "RANGE (created_at)"})
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
-    asset_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), index=True, nullable=False)
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc), index=True, nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    asset_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), nullable=False)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), primary_key=True, default=lambda: dt.datetime.now(dt.timezone.utc), nullable=False)
     ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
     user_agent: Mapped[str | None] = mapped_column(Text, nullable=True)
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import uuid, datetime as dt
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
@@ -28,6 +28,18 @@ class UserProfile(Base):
     links: Mapped[str | None] = mapped_column(Text, nullable=True)
     user: Mapped["User"] = relationship(back_populates="profile")
 
+class UserStats(Base):
+    """Denormalized profile/dashboard counters, maintained by app.services.user_stats and reconciled nightly."""
+    __tablename__ = "user_stats"
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followers: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    following: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    assets: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    published_assets: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    downloads: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    ai_jobs: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    scan_jobs: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
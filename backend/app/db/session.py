@@ -1,7 +1,115 @@
 from __future__ import annotations
-from sqlalchemy import create_engine
+import itertools
+import time
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_TIMEOUTS, DB_POOL_WAIT, DB_READ_ROUTE
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+def _instrumented(base: type, label: str) -> type:
+    # One subclass per engine so the label survives pool.recreate() (which reuses the class).
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                DB_POOL_TIMEOUTS.labels(label).inc()
+                raise
+            finally:
+                DB_POOL_WAIT.labels(label).observe(time.perf_counter() - start)
+
+    return InstrumentedPool
+
+def _engine_kwargs(label: str, pool_size: int, max_overflow: int, pool_base: type) -> dict:
+    kwargs = dict(
+        poolclass=_instrumented(pool_base, label),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+    )
+    if settings.db_pgbouncer:
+        # Transaction pooling hands each transaction a different server connection, so psycopg
+        # must not prepare statements server-side.
+        kwargs["connect_args"] = {"prepare_threshold": None}
+    return kwargs
+
+def _track_checkouts(sync_engine, label: str) -> None:
+    gauge = DB_POOL_CHECKED_OUT.labels(label)
+    event.listen(sync_engine, "checkout", lambda *_: gauge.inc())
+    event.listen(sync_engine, "checkin", lambda *_: gauge.dec())
+
+engine = create_engine(
+    settings.database_url, **_engine_kwargs("primary", settings.db_pool_size, settings.db_max_overflow, QueuePool)
+)
+_track_checkouts(engine, "primary")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+# psycopg 3 ships a native asyncio driver, so the same DATABASE_URL drives both engines.
+# expire_on_commit=False: async sessions cannot lazy-load expired attributes after commit.
+async_engine = create_async_engine(
+    settings.database_url,
+    **_engine_kwargs("primary_async", settings.db_pool_size, settings.db_max_overflow, AsyncAdaptedQueuePool),
+)
+_track_checkouts(async_engine.sync_engine, "primary_async")
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Seconds of replay lag; 0 when caught up (or when pointed at a primary, e.g. in dev).
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class Replica:
+    """An async read replica whose replay lag is re-checked at most every ``db_replica_check_seconds``."""
+
+    def __init__(self, label: str, engine: AsyncEngine) -> None:
+        self.label = label
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        self.healthy = False
+        self._checked_at = float("-inf")
+
+    async def usable(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at >= settings.db_replica_check_seconds:
+            # Stamp first: concurrent requests keep the previous verdict instead of all probing.
+            self._checked_at = now
+            try:
+                async with self.engine.connect() as conn:
+                    lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar_one())
+                self.healthy = lag <= settings.db_replica_max_lag_seconds
+            except Exception:
+                self.healthy = False
+        return self.healthy
+
+def _make_replicas() -> list[Replica]:
+    replicas = []
+    urls = [u.strip() for u in settings.database_replica_urls.split(",") if u.strip()]
+    for i, url in enumerate(urls):
+        label = f"replica{i}"
+        e = create_async_engine(
+            url, **_engine_kwargs(label, settings.db_replica_pool_size, settings.db_replica_max_overflow, AsyncAdaptedQueuePool)
+        )
+        _track_checkouts(e.sync_engine, label)
+        replicas.append(Replica(label, e))
+    return replicas
+
+replicas = _make_replicas()
+_next_replica = itertools.count()
+
+async def read_session() -> AsyncSession:
+    """Session for read-only work: round-robin over replicas within the lag budget, else the primary."""
+    if replicas:
+        start = next(_next_replica)
+        for i in range(len(replicas)):
+            replica = replicas[(start + i) % len(replicas)]
+            if await replica.usable():
+                DB_READ_ROUTE.labels(replica.label).inc()
+                return replica.sessionmaker()
+        DB_READ_ROUTE.labels("primary_fallback").inc()
+    return AsyncSessionLocal()
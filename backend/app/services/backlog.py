@@ -0,0 +1,63 @@
+from __future__ import annotations
+import asyncio
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import WRITE_BEHIND_BACKLOG
+from app.services import counters, download_events, notifications, recently_viewed
+from app.services.redis_client import get_redis_async
+
+log = get_logger(__name__)
+
+# Redis buffers that only reach Postgres through celery beat flush tasks. If beat isn't running
+# they grow without bound, so the API samples them and warns when one keeps growing.
+
+async def sizes() -> dict[str, int]:
+    r = get_redis_async()
+    pipe = r.pipeline(transaction=False)
+    pipe.llen(notifications._PENDING_KEY)
+    pipe.scard(counters._DIRTY_KEY)
+    pipe.hlen(recently_viewed._PENDING_KEY)
+    notif, dirty, recent = await pipe.execute()
+    downloads = 0
+    try:
+        for g in await r.xinfo_groups(download_events.STREAM_KEY):
+            if g["name"] == download_events.GROUP:
+                # lag (Redis 7+): entries never delivered; pending: delivered but not acked.
+                downloads = (g.get("lag") or 0) + g["pending"]
+    except Exception:
+        # No stream yet (nothing downloaded) or an older Redis without XINFO lag.
+        pass
+    return {"notifications": notif, "asset_counters": dirty, "recently_viewed": recent, "download_events": downloads}
+
+class BacklogWatch:
+    """Warns once a buffer has grown for ``write_behind_warn_samples`` samples in a row past the threshold."""
+
+    def __init__(self) -> None:
+        self._last: dict[str, int] = {}
+        self._growing: dict[str, int] = {}
+
+    def observe(self, current: dict[str, int]) -> list[str]:
+        stuck = []
+        for name, size in current.items():
+            WRITE_BEHIND_BACKLOG.labels(name).set(size)
+            grew = size > self._last.get(name, size)
+            self._growing[name] = self._growing.get(name, 0) + 1 if grew else 0
+            self._last[name] = size
+            if self._growing[name] >= settings.write_behind_warn_samples and size >= settings.write_behind_warn_size:
+                stuck.append(name)
+        return stuck
+
+async def watch() -> None:
+    """Background loop for the API lifespan."""
+    monitor = BacklogWatch()
+    while True:
+        try:
+            stuck = monitor.observe(await sizes())
+            if stuck:
+                log.warning(
+                    "write-behind backlog keeps growing (%s); is celery beat running? "
+                    "(celery -A app.workers.celery_app:celery_app beat)", ", ".join(stuck),
+                )
+        except Exception:
+            pass
+        await asyncio.sleep(settings.write_behind_check_seconds)
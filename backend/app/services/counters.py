@@ -0,0 +1,204 @@
+from __future__ import annotations
+import datetime as dt
+import uuid
+from sqlalchemy import DateTime, Integer, func, or_, select, update, values, column
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.marketplace import Asset, AssetStatsHourly, Download
+from app.db.models.social import Like, Save
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+COUNTER_COLUMNS = {
+    "likes": "like_count",
+    "saves": "save_count",
+    "downloads": "download_count",
+    "views": "view_count",
+}
+# Counters that also feed the asset_stats_hourly time series (net per hour, so unlikes subtract).
+HOURLY_FIELDS = ("downloads", "likes")
+# Pending deltas live in one hash per asset; the set tracks which hashes need flushing.
+# Hourly deltas share the hash as "<field>@<bucket epoch>" entries.
+_DIRTY_KEY = "counters:asset:dirty"
+
+def _hash_key(asset_id) -> str:
+    return f"counters:asset:{asset_id}"
+
+def hour_bucket(at: dt.datetime | None = None) -> dt.datetime:
+    at = at or dt.datetime.now(dt.timezone.utc)
+    return at.astimezone(dt.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def _hourly_upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[AssetStatsHourly.asset_id, AssetStatsHourly.bucket],
+        set_={f: getattr(AssetStatsHourly, f) + getattr(stmt.excluded, f) for f in HOURLY_FIELDS},
+    )
+
+def _hourly_stmt(asset_id, field: str, delta: int):
+    row = {"asset_id": asset_id, "bucket": hour_bucket(), **{f: 0 for f in HOURLY_FIELDS}, field: delta}
+    return _hourly_upsert(insert(AssetStatsHourly).values(**row))
+
+def buffer_delta(pipe, asset_id, field: str, delta: int, at: dt.datetime | None = None) -> None:
+    """Queue a counter delta on a Redis pipeline for the next ``flush_buffered`` (caller executes ``pipe``).
+
+    ``at`` places the hourly rollup for events recorded earlier than now.
+    """
+    key = _hash_key(asset_id)
+    pipe.hincrby(key, field, delta)
+    if field in HOURLY_FIELDS:
+        pipe.hincrby(key, f"{field}@{int(hour_bucket(at).timestamp())}", delta)
+    pipe.sadd(_DIRTY_KEY, str(asset_id))
+
+def _increment_stmt(asset_id, field: str, delta: int):
+    col = getattr(Asset, COUNTER_COLUMNS[field])
+    # Pins updated_at (it has an onupdate) so counter traffic doesn't read as an edit to the asset, and
+    # skips session sync so loaded Asset instances keep their slightly stale counts instead of expiring.
+    return (
+        update(Asset).where(Asset.id == asset_id).values({col: func.greatest(col + delta, 0), Asset.updated_at: Asset.updated_at})
+        .execution_options(synchronize_session=False)
+    )
+
+def bump(db: Session, asset_id, field: str, delta: int = 1, after_commit: bool = False) -> None:
+    """Add ``delta`` to an asset counter: buffered in Redis, or an atomic UPDATE in ``db``'s transaction.
+
+    Callers bump twice around their commit. Inside the transaction only the unbuffered UPDATE runs,
+    so it rolls back with the change it counts; with ``after_commit=True`` only the Redis delta is
+    queued, so a failed commit never leaves one behind. If Redis is down by then, the UPDATE runs in
+    a transaction of its own.
+    """
+    if settings.asset_counters_buffered != after_commit:
+        return
+    if after_commit:
+        try:
+            pipe = get_redis_sync().pipeline(transaction=False)
+            buffer_delta(pipe, asset_id, field, delta)
+            pipe.execute()
+            return
+        except Exception:
+            pass
+    db.execute(_increment_stmt(asset_id, field, delta))
+    if field in HOURLY_FIELDS:
+        db.execute(_hourly_stmt(asset_id, field, delta))
+    if after_commit:
+        db.commit()
+
+async def abump(db: AsyncSession, asset_id, field: str, delta: int = 1, after_commit: bool = False) -> None:
+    if settings.asset_counters_buffered != after_commit:
+        return
+    if after_commit:
+        try:
+            pipe = get_redis_async().pipeline(transaction=False)
+            buffer_delta(pipe, asset_id, field, delta)
+            await pipe.execute()
+            return
+        except Exception:
+            pass
+    await db.execute(_increment_stmt(asset_id, field, delta))
+    if field in HOURLY_FIELDS:
+        await db.execute(_hourly_stmt(asset_id, field, delta))
+    if after_commit:
+        await db.commit()
+
+def _drain(batch: int) -> dict[str, dict[str, int]]:
+    r = get_redis_sync()
+    ids = r.spop(_DIRTY_KEY, batch) or []
+    if not ids:
+        return {}
+    # HGETALL + DEL per hash under MULTI, so increments land either in this batch or the next.
+    pipe = r.pipeline(transaction=True)
+    for asset_id in ids:
+        pipe.hgetall(_hash_key(asset_id))
+        pipe.delete(_hash_key(asset_id))
+    res = pipe.execute()
+    return {asset_id: {k: int(v) for k, v in res[2 * i].items()} for i, asset_id in enumerate(ids) if res[2 * i]}
+
+def _restore(pending: dict[str, dict[str, int]]) -> None:
+    pipe = get_redis_sync().pipeline(transaction=False)
+    for asset_id, deltas in pending.items():
+        for field, delta in deltas.items():
+            pipe.hincrby(_hash_key(asset_id), field, delta)
+        pipe.sadd(_DIRTY_KEY, asset_id)
+    pipe.execute()
+
+def _hourly_rows(pending: dict[str, dict[str, int]]) -> list[tuple]:
+    buckets: dict[tuple[uuid.UUID, int], dict[str, int]] = {}
+    for asset_id, deltas in pending.items():
+        for key, delta in deltas.items():
+            field, sep, epoch = key.partition("@")
+            if sep:
+                buckets.setdefault((uuid.UUID(asset_id), int(epoch)), {})[field] = delta
+    return [
+        (asset_id, dt.datetime.fromtimestamp(epoch, dt.timezone.utc), *(d.get(f, 0) for f in HOURLY_FIELDS))
+        for (asset_id, epoch), d in buckets.items()
+    ]
+
+def flush_buffered(db: Session, batch: int | None = None) -> int:
+    """Apply buffered deltas with one ``UPDATE ... FROM (VALUES ...)`` per batch; returns assets updated.
+
+    Hourly deltas go through one upsert per batch, joined to ``assets`` so rows for assets
+    deleted since the event are dropped instead of failing the batch.
+    """
+    batch = batch or settings.asset_counters_flush_batch
+    total = 0
+    while True:
+        pending = _drain(batch)
+        if not pending:
+            return total
+        v = values(
+            column("id", UUID(as_uuid=True)), *(column(f, Integer) for f in COUNTER_COLUMNS), name="v"
+        ).data([(uuid.UUID(asset_id), *(d.get(f, 0) for f in COUNTER_COLUMNS)) for asset_id, d in pending.items()])
+        stmt = update(Asset).where(Asset.id == v.c.id).values({
+            getattr(Asset, col): func.greatest(getattr(Asset, col) + v.c[f], 0) for f, col in COUNTER_COLUMNS.items()
+        } | {Asset.updated_at: Asset.updated_at}).execution_options(synchronize_session=False)
+        hourly = _hourly_rows(pending)
+        try:
+            db.execute(stmt)
+            if hourly:
+                hv = values(
+                    column("asset_id", UUID(as_uuid=True)), column("bucket", DateTime(timezone=True)),
+                    *(column(f, Integer) for f in HOURLY_FIELDS), name="h",
+                ).data(hourly)
+                src = select(hv).join(Asset, Asset.id == hv.c.asset_id)
+                db.execute(_hourly_upsert(insert(AssetStatsHourly).from_select(["asset_id", "bucket", *HOURLY_FIELDS], src)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            _restore(pending)
+            raise
+        total += len(pending)
+        if len(pending) < batch:
+            return total
+
+def reconcile(db: Session, batch: int = 5000) -> int:
+    """Recompute like/save/download counters from their source tables; returns rows corrected.
+
+    Views have no source table and are left as is, as are downloads once old download partitions
+    expire. Walks assets by id in batches to keep transactions short.
+    """
+    sources = {
+        "like_count": select(func.count()).select_from(Like).where(Like.asset_id == Asset.id).scalar_subquery(),
+        "save_count": select(func.count()).select_from(Save).where(Save.asset_id == Asset.id).scalar_subquery(),
+    }
+    if not settings.downloads_retention_months:
+        sources["download_count"] = (
+            select(func.count()).select_from(Download).where(Download.asset_id == Asset.id).scalar_subquery()
+        )
+    fixed, last_id = 0, None
+    while True:
+        ids_q = select(Asset.id).order_by(Asset.id).limit(batch)
+        if last_id is not None:
+            ids_q = ids_q.where(Asset.id > last_id)
+        ids = db.execute(ids_q).scalars().all()
+        if not ids:
+            return fixed
+        last_id = ids[-1]
+        stmt = (
+            update(Asset)
+            .where(Asset.id.in_(ids))
+            .where(or_(*(getattr(Asset, c) != src for c, src in sources.items())))
+            .values(**sources, updated_at=Asset.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        fixed += db.execute(stmt).rowcount or 0
+        db.commit()
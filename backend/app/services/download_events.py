@@ -0,0 +1,167 @@
+from __future__ import annotations
+import datetime as dt
+import os
+import socket
+import uuid
+from collections import Counter
+from sqlalchemy import DateTime, String, Text, select, text, values, column
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.marketplace import Asset, Download
+from app.db.models.user import User
+from app.services import counters
+from app.services.redis_client import get_redis_sync
+from app.services.user_stats import bump_stats_many, invalidate_dashboard
+
+# Redis stream + consumer group: an event is acked only after its row is committed, and entries
+# a dead consumer left pending are re-claimed, so delivery is at-least-once. Replays are harmless
+# because the event id is the row's primary key (ON CONFLICT DO NOTHING).
+STREAM_KEY = "events:downloads"
+GROUP = "downloads-writer"
+CLAIM_IDLE_MS = 60_000
+
+def _consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+def _event(user_id, asset_id, ip: str | None, user_agent: str | None) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(user_id),
+        "asset_id": str(asset_id),
+        "ts": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "ip": ip or "",
+        "ua": (user_agent or "")[:512],
+    }
+
+def record_download(db: Session, user_id, asset_id, ip: str | None = None, user_agent: str | None = None) -> None:
+    """Queue a download event; falls back to a synchronous insert when Redis is unavailable.
+
+    The stream is capped (approximately) at ``download_events_max_len`` entries to bound memory
+    if the writer stalls; past that the oldest events are trimmed.
+    """
+    event = _event(user_id, asset_id, ip, user_agent)
+    try:
+        get_redis_sync().xadd(STREAM_KEY, event, maxlen=settings.download_events_max_len, approximate=True)
+        return
+    except Exception:
+        pass
+    created_at = dt.datetime.fromisoformat(event["ts"])
+    db.add(Download(id=uuid.UUID(event["id"]), user_id=user_id, asset_id=asset_id, created_at=created_at, ip=ip, user_agent=user_agent))
+    counters.bump(db, asset_id, "downloads")
+    bump_stats_many(db, "downloads", {user_id: 1})
+    db.commit()
+    counters.bump(db, asset_id, "downloads", after_commit=True)
+    invalidate_dashboard(user_id)
+
+def _ensure_group(r) -> None:
+    try:
+        r.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+def _write(db: Session, entries: list[tuple[str, dict | None]]) -> int:
+    """Insert one batch of stream entries, then ack them all (including trimmed, payload-less ones)."""
+    rows = [
+        (uuid.UUID(f["id"]), uuid.UUID(f["user_id"]), uuid.UUID(f["asset_id"]), dt.datetime.fromisoformat(f["ts"]),
+         f.get("ip") or None, f.get("ua") or None)
+        for _, f in entries if f
+    ]
+    r = get_redis_sync()
+    if not rows:
+        if entries:
+            r.xack(STREAM_KEY, GROUP, *(entry_id for entry_id, _ in entries))
+        return 0
+    v = values(
+        column("id", UUID(as_uuid=True)), column("user_id", UUID(as_uuid=True)), column("asset_id", UUID(as_uuid=True)),
+        column("created_at", DateTime(timezone=True)), column("ip", String), column("user_agent", Text), name="e",
+    ).data(rows)
+    # Joined to users/assets so events for rows deleted since don't fail the batch.
+    src = select(v).join(Asset, Asset.id == v.c.asset_id).join(User, User.id == v.c.user_id)
+    stmt = (
+        insert(Download).from_select(["id", "user_id", "asset_id", "created_at", "ip", "user_agent"], src)
+        .on_conflict_do_nothing()
+        .returning(Download.user_id, Download.asset_id, Download.created_at)
+    )
+    inserted = db.execute(stmt).all()
+    bump_stats_many(db, "downloads", Counter(r.user_id for r in inserted))
+    db.commit()
+    # Asset counters/hourly rollups ride on the counter buffer; only newly inserted rows count.
+    pipe = r.pipeline(transaction=False)
+    for row in inserted:
+        counters.buffer_delta(pipe, row.asset_id, "downloads", 1, at=row.created_at)
+    for user_id in {row.user_id for row in inserted}:
+        invalidate_dashboard(user_id)
+    pipe.xack(STREAM_KEY, GROUP, *(entry_id for entry_id, _ in entries))
+    pipe.execute()
+    return len(inserted)
+
+def flush(db: Session, batch: int | None = None) -> int:
+    """Drain the download stream into ``downloads`` with multi-row inserts; returns rows inserted."""
+    batch = batch or settings.download_events_flush_batch
+    r = get_redis_sync()
+    _ensure_group(r)
+    consumer = _consumer_name()
+    total = 0
+    # Entries delivered to a consumer that died before acking.
+    _, claimed, *_ = r.xautoclaim(STREAM_KEY, GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id="0-0", count=batch)
+    if claimed:
+        total += _write(db, claimed)
+    while True:
+        resp = r.xreadgroup(GROUP, consumer, {STREAM_KEY: ">"}, count=batch)
+        entries = resp[0][1] if resp else []
+        if not entries:
+            return total
+        total += _write(db, entries)
+        if len(entries) < batch:
+            return total
+
+def _month_start(d: dt.date) -> dt.date:
+    return d.replace(day=1)
+
+def _add_months(d: dt.date, n: int) -> dt.date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return dt.date(d.year + y, m + 1, 1)
+
+def partition_name(month: dt.date) -> str:
+    return f"downloads_y{month.year:04d}m{month.month:02d}"
+
+def ensure_partitions(db: Session, months_ahead: int | None = None, today: dt.date | None = None) -> list[str]:
+    """Create monthly ``downloads`` partitions from the current month through ``months_ahead``."""
+    months_ahead = settings.downloads_partitions_ahead if months_ahead is None else months_ahead
+    start = _month_start(today or dt.datetime.now(dt.timezone.utc).date())
+    created = []
+    for i in range(months_ahead + 1):
+        lo, hi = _add_months(start, i), _add_months(start, i + 1)
+        name = partition_name(lo)
+        # Explicit UTC offsets: bare dates would be read in the session time zone.
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF downloads "
+            f"FOR VALUES FROM ('{lo.isoformat()} 00:00:00+00') TO ('{hi.isoformat()} 00:00:00+00')"
+        ))
+        created.append(name)
+    db.commit()
+    return created
+
+def drop_expired_partitions(db: Session, retention_months: int | None = None, today: dt.date | None = None) -> list[str]:
+    """Drop monthly partitions entirely older than the retention window (0 keeps everything)."""
+    retention_months = settings.downloads_retention_months if retention_months is None else retention_months
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(today or dt.datetime.now(dt.timezone.utc).date()), -retention_months)
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'downloads'"
+    )).scalars().all()
+    dropped = []
+    for name in sorted(names):
+        if not name.startswith("downloads_y"):
+            continue
+        month = dt.date(int(name[11:15]), int(name[16:18]), 1)
+        if _add_months(month, 1) <= cutoff:
+            db.execute(text(f"ALTER TABLE downloads DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    db.commit()
+    return dropped
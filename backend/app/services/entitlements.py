@@ -1,17 +1,105 @@
 from __future__ import annotations
+import uuid
+from dataclasses import dataclass
+import orjson
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, exists, func
+from app.core.config import settings
 from app.db.models.marketplace import Asset, Purchase, Subscription
+from app.services.redis_client import get_redis_async, get_redis_sync
 
-def is_entitled_to_asset(db: Session, user_id, asset: Asset) -> tuple[bool, str]:
-    if asset.visibility != "published":
+ACTIVE_SUBSCRIPTION_STATUSES = ("active", "trialing")
+
+@dataclass(frozen=True, slots=True)
+class EntitlementSnapshot:
+    """Everything needed to decide a user's access to any asset: subscription flag + purchases."""
+
+    subscribed: bool
+    purchased: frozenset[uuid.UUID]
+
+    def to_json(self) -> bytes:
+        return orjson.dumps({"subscribed": self.subscribed, "purchased": [str(i) for i in self.purchased]})
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> EntitlementSnapshot:
+        data = orjson.loads(raw)
+        return cls(subscribed=data["subscribed"], purchased=frozenset(uuid.UUID(i) for i in data["purchased"]))
+
+def _redis_key(user_id) -> str:
+    return f"entitlements:{user_id}"
+
+def _snapshot_stmt(user_id):
+    # One round-trip: subscription flag and the purchased asset ids as scalar subqueries.
+    subscribed = exists().where(Subscription.user_id == user_id, Subscription.status.in_(ACTIVE_SUBSCRIPTION_STATUSES))
+    purchased = (
+        select(func.array_agg(Purchase.asset_id))
+        .where(Purchase.user_id == user_id, Purchase.status == "succeeded")
+        .scalar_subquery()
+    )
+    return select(subscribed.label("subscribed"), purchased.label("purchased"))
+
+def _from_row(row) -> EntitlementSnapshot:
+    return EntitlementSnapshot(subscribed=bool(row.subscribed), purchased=frozenset(row.purchased or ()))
+
+def entitlement_snapshot(db: Session, user_id) -> EntitlementSnapshot:
+    r = get_redis_sync()
+    try:
+        raw = r.get(_redis_key(user_id))
+        if raw:
+            return EntitlementSnapshot.from_json(raw)
+    except Exception:
+        r = None
+    snap = _from_row(db.execute(_snapshot_stmt(user_id)).one())
+    if r is not None:
+        try:
+            r.set(_redis_key(user_id), snap.to_json(), ex=settings.entitlement_cache_ttl_seconds)
+        except Exception:
+            pass
+    return snap
+
+async def aentitlement_snapshot(db: AsyncSession, user_id) -> EntitlementSnapshot:
+    r = get_redis_async()
+    try:
+        raw = await r.get(_redis_key(user_id))
+        if raw:
+            return EntitlementSnapshot.from_json(raw)
+    except Exception:
+        r = None
+    snap = _from_row((await db.execute(_snapshot_stmt(user_id))).one())
+    if r is not None:
+        try:
+            await r.set(_redis_key(user_id), snap.to_json(), ex=settings.entitlement_cache_ttl_seconds)
+        except Exception:
+            pass
+    return snap
+
+def invalidate_entitlements(*user_ids) -> None:
+    """Call after committing purchase or subscription changes."""
+    try:
+        get_redis_sync().delete(*(_redis_key(u) for u in user_ids))
+    except Exception:
+        pass
+
+def _needs_snapshot(asset: Asset) -> bool:
+    return asset.visibility == "published" and asset.is_paid
+
+def resolve(asset_id, visibility: str, is_paid: bool, snap: EntitlementSnapshot | None) -> tuple[bool, str]:
+    """``snap`` is only consulted for published paid assets."""
+    if visibility != "published":
         return False, "asset_not_published"
-    if not asset.is_paid:
+    if not is_paid:
         return True, "free"
-    q = select(Purchase).where(and_(Purchase.user_id == user_id, Purchase.asset_id == asset.id, Purchase.status == "succeeded"))
-    if db.execute(q).scalar_one_or_none():
+    if asset_id in snap.purchased:
         return True, "purchase"
-    sq = select(Subscription).where(and_(Subscription.user_id == user_id, Subscription.status.in_(["active", "trialing"])))
-    if db.execute(sq).scalar_one_or_none():
+    if snap.subscribed:
         return True, "subscription"
     return False, "not_entitled"
+
+def is_entitled_to_asset(db: Session, user_id, asset: Asset) -> tuple[bool, str]:
+    snap = entitlement_snapshot(db, user_id) if _needs_snapshot(asset) else None
+    return resolve(asset.id, asset.visibility, asset.is_paid, snap)
+
+async def ais_entitled_to_asset(db: AsyncSession, user_id, asset: Asset) -> tuple[bool, str]:
+    snap = await aentitlement_snapshot(db, user_id) if _needs_snapshot(asset) else None
+    return resolve(asset.id, asset.visibility, asset.is_paid, snap)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, AsyncIterator
+import orjson
+from app.core.config import settings
+from app.services.pubsub import KEEPALIVE, hub, sse
+from app.services.redis_client import get_redis_sync
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+def channel(kind: str, job_id) -> str:
+    return f"jobs:{kind}:{job_id}"
+
+def publish(kind: str, job_id, *, status: str, progress: int, stage: str | None = None, error: str | None = None) -> None:
+    """Fire-and-forget progress event from a worker; subscribers fall back to polling if Redis is down."""
+    event = {"id": str(job_id), "kind": kind, "status": status, "progress": progress, "stage": stage, "error": error}
+    try:
+        get_redis_sync().publish(channel(kind, job_id), orjson.dumps(event))
+    except Exception:
+        pass
+
+async def stream(kind: str, job_id, q: asyncio.Queue, current: dict[str, Any]) -> AsyncIterator[bytes]:
+    """SSE body for one job: the current state, then live events until the job finishes.
+
+    ``q`` must be subscribed before ``current`` is read so no event falls in between.
+    """
+    name = channel(kind, job_id)
+    try:
+        yield sse("progress", current)
+        progress = current["progress"]
+        status = current["status"]
+        while status not in TERMINAL_STATUSES:
+            try:
+                raw = await asyncio.wait_for(q.get(), timeout=settings.sse_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            event = orjson.loads(raw)
+            # Events queued before ``current`` was read can be older than it.
+            if event["status"] not in TERMINAL_STATUSES and event["progress"] < progress:
+                continue
+            progress, status = event["progress"], event["status"]
+            yield sse("progress", raw)
+    finally:
+        await hub.unsubscribe(name, q)
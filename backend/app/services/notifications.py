@@ -0,0 +1,179 @@
+from __future__ import annotations
+import asyncio
+import datetime as dt
+import uuid
+from collections import Counter
+from typing import AsyncIterator
+import orjson
+from sqlalchemy import DateTime, String, func, select, values, column
+from sqlalchemy.dialects.postgresql import JSONB, UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.social import Notification
+from app.db.models.user import User
+from app.services.pubsub import KEEPALIVE, hub, sse
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+# New notifications are queued in a Redis list and written by the beat-scheduled flush in
+# multi-row INSERTs; once committed they are published to notifications:{user} for SSE streams.
+# notif:unread:{user} caches the unread count. It is adjusted in place only while it exists
+# (a missing key is recounted from the database) and expires so drift can't outlive its TTL.
+_PENDING_KEY = "notifications:pending"
+
+# KEYS[1] counter, ARGV[1] delta. A counter that would go negative is dropped and recounted.
+ADJUST_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return nil end
+local v = redis.call('INCRBY', KEYS[1], ARGV[1])
+if v < 0 then redis.call('DEL', KEYS[1]) end
+return v
+"""
+
+def channel(user_id) -> str:
+    return f"notifications:{user_id}"
+
+def _unread_key(user_id) -> str:
+    return f"notif:unread:{user_id}"
+
+def _event(user_id, type_: str, payload: dict) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(user_id),
+        "type": type_,
+        "payload": payload,
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+    }
+
+def to_out(n: Notification) -> dict:
+    return {"id": str(n.id), "type": n.type, "payload": n.payload_json, "is_read": n.is_read, "created_at": n.created_at.isoformat()}
+
+def _row(event: dict) -> Notification:
+    return Notification(
+        id=uuid.UUID(event["id"]), user_id=uuid.UUID(event["user_id"]), type=event["type"],
+        payload_json=event["payload"], created_at=dt.datetime.fromisoformat(event["created_at"]),
+    )
+
+def notify(db: Session, user_id, type_: str, payload: dict) -> None:
+    """Queue a notification (call after committing the event); inserts directly if Redis is down."""
+    event = _event(user_id, type_, payload)
+    try:
+        get_redis_sync().rpush(_PENDING_KEY, orjson.dumps(event))
+        return
+    except Exception:
+        pass
+    db.add(_row(event))
+    db.commit()
+
+async def anotify(db: AsyncSession, user_id, type_: str, payload: dict) -> None:
+    event = _event(user_id, type_, payload)
+    try:
+        await get_redis_async().rpush(_PENDING_KEY, orjson.dumps(event))
+        return
+    except Exception:
+        pass
+    db.add(_row(event))
+    await db.commit()
+
+def flush(db: Session, batch: int | None = None) -> int:
+    """Write queued notifications in batches; returns rows inserted.
+
+    Each batch is popped atomically (LRANGE + LTRIM in MULTI) and pushed back to the head of the
+    queue if the insert fails. Ids are generated at enqueue time, so a replayed batch is a no-op.
+    """
+    r = get_redis_sync()
+    batch = batch or settings.notifications_flush_batch
+    written = 0
+    while True:
+        pipe = r.pipeline()
+        pipe.lrange(_PENDING_KEY, 0, batch - 1)
+        pipe.ltrim(_PENDING_KEY, batch, -1)
+        raw, _ = pipe.execute()
+        if not raw:
+            return written
+        try:
+            inserted = _write(db, [orjson.loads(e) for e in raw])
+        except Exception:
+            db.rollback()
+            r.lpush(_PENDING_KEY, *reversed(raw))
+            raise
+        _deliver(r, inserted)
+        written += len(inserted)
+        if len(raw) < batch:
+            return written
+
+def _write(db: Session, events: list[dict]) -> list[dict]:
+    v = values(
+        column("id", UUID(as_uuid=True)), column("user_id", UUID(as_uuid=True)), column("type", String),
+        column("payload_json", JSONB), column("created_at", DateTime(timezone=True)), name="n",
+    ).data([
+        (uuid.UUID(e["id"]), uuid.UUID(e["user_id"]), e["type"], e["payload"], dt.datetime.fromisoformat(e["created_at"]))
+        for e in events
+    ])
+    # Joined to users so notifications for deleted accounts don't fail the batch.
+    src = select(v.c.id, v.c.user_id, v.c.type, v.c.payload_json, v.c.created_at).join(User, User.id == v.c.user_id)
+    stmt = (
+        insert(Notification).from_select(["id", "user_id", "type", "payload_json", "created_at"], src)
+        .on_conflict_do_nothing(index_elements=[Notification.id])
+        .returning(Notification.id)
+    )
+    ids = {str(i) for i in db.execute(stmt).scalars().all()}
+    db.commit()
+    return [e for e in events if e["id"] in ids]
+
+def _deliver(r, events: list[dict]) -> None:
+    if not events:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        for user_id, n in Counter(e["user_id"] for e in events).items():
+            pipe.eval(ADJUST_IF_EXISTS_LUA, 1, _unread_key(user_id), n)
+        for e in events:
+            pipe.publish(channel(e["user_id"]), orjson.dumps({
+                "id": e["id"], "type": e["type"], "payload": e["payload"], "is_read": False, "created_at": e["created_at"],
+            }))
+        pipe.execute()
+    except Exception:
+        pass
+
+async def aunread_count(db: AsyncSession, user_id) -> int:
+    r = get_redis_async()
+    try:
+        raw = await r.get(_unread_key(user_id))
+        if raw is not None:
+            return int(raw)
+    except Exception:
+        r = None
+    count = (await db.execute(
+        select(func.count()).select_from(Notification).where(Notification.user_id == user_id, Notification.is_read.is_(False))
+    )).scalar_one()
+    if r is not None:
+        try:
+            await r.set(_unread_key(user_id), count, ex=settings.notifications_unread_ttl_seconds)
+        except Exception:
+            pass
+    return count
+
+async def amark_read(user_id, marked: int, all_read: bool = False) -> None:
+    """Adjust the cached unread count after ``marked`` notifications were flagged read."""
+    try:
+        r = get_redis_async()
+        if all_read:
+            await r.set(_unread_key(user_id), 0, ex=settings.notifications_unread_ttl_seconds)
+        elif marked:
+            await r.eval(ADJUST_IF_EXISTS_LUA, 1, _unread_key(user_id), -marked)
+    except Exception:
+        pass
+
+async def stream(user_id, q: asyncio.Queue, unread: int) -> AsyncIterator[bytes]:
+    """SSE body: the unread count, then each new notification as it is written."""
+    try:
+        yield sse("unread", {"count": unread})
+        while True:
+            try:
+                raw = await asyncio.wait_for(q.get(), timeout=settings.sse_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            yield sse("notification", raw)
+    finally:
+        await hub.unsubscribe(channel(user_id), q)
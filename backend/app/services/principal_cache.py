@@ -0,0 +1,126 @@
+from __future__ import annotations
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+import orjson
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_token
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated user snapshot: enough for authorization and /me without touching the DB."""
+
+    id: uuid.UUID
+    email: str
+    role: str
+    is_active: bool
+    username: str | None = None
+    bio: str | None = None
+    avatar_url: str | None = None
+    links: str | None = None
+    # Role claimed by the access token of the current request (not cached).
+    jwt_role: str | None = None
+
+    @classmethod
+    def from_user(cls, user) -> Principal:
+        profile = user.profile
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            username=profile.username if profile else None,
+            bio=profile.bio if profile else None,
+            avatar_url=profile.avatar_url if profile else None,
+            links=profile.links if profile else None,
+        )
+
+    def to_json(self) -> bytes:
+        data = asdict(self)
+        data.pop("jwt_role")
+        return orjson.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> Principal:
+        data = orjson.loads(raw)
+        data["id"] = uuid.UUID(data["id"])
+        return cls(**data)
+
+# Local entries are not invalidated across processes, so their TTL bounds how long another
+# API worker can keep serving a stale principal (e.g. right after a deactivation).
+_principals = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl_seconds)
+_claims = TTLCache(settings.principal_cache_size, 0)
+
+def _redis_key(user_id: str) -> str:
+    return f"principal:{user_id}"
+
+def decode_access_claims(token: str) -> Dict[str, Any]:
+    """``decode_token`` memoized per token until its ``exp``; raises like ``decode_token``."""
+    claims = _claims.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        ttl = float(claims.get("exp", 0)) - time.time()
+        if ttl > 0:
+            _claims.set(token, claims, ttl=ttl)
+    return claims
+
+def get_cached_principal(user_id: str) -> Principal | None:
+    p = _principals.get(user_id)
+    if p is not None or not settings.principal_cache_redis:
+        return p
+    try:
+        raw = get_redis_sync().get(_redis_key(user_id))
+    except Exception:
+        return None
+    if raw:
+        p = Principal.from_json(raw)
+        _principals.set(user_id, p)
+    return p
+
+async def aget_cached_principal(user_id: str) -> Principal | None:
+    p = _principals.get(user_id)
+    if p is not None or not settings.principal_cache_redis:
+        return p
+    try:
+        raw = await get_redis_async().get(_redis_key(user_id))
+    except Exception:
+        return None
+    if raw:
+        p = Principal.from_json(raw)
+        _principals.set(user_id, p)
+    return p
+
+def store_principal(p: Principal) -> None:
+    _principals.set(str(p.id), p)
+    if settings.principal_cache_redis:
+        try:
+            get_redis_sync().set(_redis_key(str(p.id)), p.to_json(), ex=settings.principal_cache_redis_ttl_seconds)
+        except Exception:
+            pass
+
+async def astore_principal(p: Principal) -> None:
+    _principals.set(str(p.id), p)
+    if settings.principal_cache_redis:
+        try:
+            await get_redis_async().set(_redis_key(str(p.id)), p.to_json(), ex=settings.principal_cache_redis_ttl_seconds)
+        except Exception:
+            pass
+
+def invalidate_principal(user_id) -> None:
+    _principals.pop(str(user_id))
+    if settings.principal_cache_redis:
+        try:
+            get_redis_sync().delete(_redis_key(str(user_id)))
+        except Exception:
+            pass
+
+async def ainvalidate_principal(user_id) -> None:
+    _principals.pop(str(user_id))
+    if settings.principal_cache_redis:
+        try:
+            await get_redis_async().delete(_redis_key(str(user_id)))
+        except Exception:
+            pass
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import asyncio
+from typing import Any
+import orjson
+from app.core.logging import get_logger
+from app.services.redis_client import get_redis_async
+
+log = get_logger(__name__)
+
+class PubSubHub:
+    """Fans Redis pub/sub messages out to in-process subscribers.
+
+    Every SSE stream in the process shares one pub/sub connection: a channel is subscribed while
+    at least one local queue listens to it, and a single reader task dispatches messages.
+    """
+
+    def __init__(self, queue_size: int = 16) -> None:
+        self.queue_size = queue_size
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, name: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = get_redis_async().pubsub(ignore_subscribe_messages=True)
+            if name not in self._queues:
+                await self._pubsub.subscribe(name)
+                self._queues[name] = set()
+            self._queues[name].add(q)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._run())
+        return q
+
+    async def unsubscribe(self, name: str, q: asyncio.Queue) -> None:
+        async with self._lock:
+            queues = self._queues.get(name)
+            if queues is None:
+                return
+            queues.discard(q)
+            if not queues:
+                del self._queues[name]
+                try:
+                    await self._pubsub.unsubscribe(name)
+                except Exception:
+                    pass
+
+    def _dispatch(self, name: str, data: str) -> None:
+        for q in self._queues.get(name, ()):
+            if q.full():
+                # Slow consumer: drop its oldest event rather than block the reader.
+                q.get_nowait()
+            q.put_nowait(data)
+
+    async def _run(self) -> None:
+        while self._queues:
+            try:
+                msg = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.warning("pub/sub reader lost its Redis connection; retrying", exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+            if msg and msg["type"] == "message":
+                self._dispatch(msg["channel"], msg["data"])
+
+hub = PubSubHub()
+
+def sse(event: str, data: dict[str, Any] | str) -> bytes:
+    """One server-sent event; ``data`` is a dict or already-serialized JSON."""
+    payload = data if isinstance(data, str) else orjson.dumps(data).decode()
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+KEEPALIVE = b": keepalive\n\n"
@@ -0,0 +1,105 @@
+from __future__ import annotations
+import datetime as dt
+import time
+import uuid
+from sqlalchemy import DateTime, func, select, values, column
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.marketplace import Asset, RecentlyViewed
+from app.db.models.user import User
+from app.services.counters import buffer_delta
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+# Per-user sorted set (asset id -> last view, epoch ms), trimmed to the newest entries.
+# Views waiting for the database sit in one hash, "<user>:<asset>" -> epoch ms, so repeat views
+# of the same asset between flushes collapse into a single row update.
+_PENDING_KEY = "recent:pending"
+
+def _user_key(user_id) -> str:
+    return f"recent:{user_id}"
+
+async def record_view(user_id, asset_id) -> None:
+    """Record an asset view without touching the database (best effort: dropped if Redis is down)."""
+    now_ms = int(time.time() * 1000)
+    key = _user_key(user_id)
+    try:
+        pipe = get_redis_async().pipeline(transaction=False)
+        pipe.zadd(key, {str(asset_id): now_ms})
+        pipe.zremrangebyrank(key, 0, -settings.recently_viewed_limit - 1)
+        pipe.expire(key, settings.recently_viewed_ttl_seconds)
+        pipe.hset(_PENDING_KEY, f"{user_id}:{asset_id}", now_ms)
+        buffer_delta(pipe, asset_id, "views", 1)
+        await pipe.execute()
+    except Exception:
+        pass
+
+async def recent_asset_ids(user_id, limit: int) -> list[uuid.UUID] | None:
+    """Newest-first asset ids from Redis; ``None`` when Redis has nothing for this user."""
+    try:
+        ids = await get_redis_async().zrevrange(_user_key(user_id), 0, limit - 1)
+    except Exception:
+        return None
+    return [uuid.UUID(i) for i in ids] if ids else None
+
+async def warm_recent(user_id, rows: list[tuple[uuid.UUID, dt.datetime]]) -> None:
+    """Seed a user's sorted set from the database (e.g. after Redis lost it)."""
+    if not rows:
+        return
+    key = _user_key(user_id)
+    try:
+        pipe = get_redis_async().pipeline(transaction=False)
+        pipe.zadd(key, {str(asset_id): int(at.timestamp() * 1000) for asset_id, at in rows}, nx=True)
+        pipe.expire(key, settings.recently_viewed_ttl_seconds)
+        await pipe.execute()
+    except Exception:
+        pass
+
+def flush(db: Session, batch: int | None = None) -> int:
+    """Upsert pending views into ``recently_viewed``; returns rows written.
+
+    The pending hash is renamed away atomically, so views recorded meanwhile start a fresh hash.
+    Rows for users or assets deleted since the view are skipped by the join. On failure the
+    entries are merged back without clobbering newer views.
+    """
+    r = get_redis_sync()
+    work_key = f"{_PENDING_KEY}:{uuid.uuid4().hex}"
+    try:
+        r.rename(_PENDING_KEY, work_key)
+    except Exception:
+        return 0  # nothing pending (RENAME fails on a missing key)
+    pending = r.hgetall(work_key)
+    rows = []
+    for field, ms in pending.items():
+        user_id, _, asset_id = field.partition(":")
+        rows.append((uuid.UUID(user_id), uuid.UUID(asset_id), dt.datetime.fromtimestamp(int(ms) / 1000, dt.timezone.utc)))
+    batch = batch or settings.recently_viewed_flush_batch
+    written = 0
+    try:
+        for i in range(0, len(rows), batch):
+            v = values(
+                column("user_id", UUID(as_uuid=True)), column("asset_id", UUID(as_uuid=True)),
+                column("last_viewed_at", DateTime(timezone=True)), name="v",
+            ).data(rows[i:i + batch])
+            src = (
+                select(func.gen_random_uuid(), v.c.user_id, v.c.asset_id, v.c.last_viewed_at)
+                .join(Asset, Asset.id == v.c.asset_id)
+                .join(User, User.id == v.c.user_id)
+            )
+            stmt = insert(RecentlyViewed).from_select(["id", "user_id", "asset_id", "last_viewed_at"], src)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_recent_user_asset",
+                set_={"last_viewed_at": func.greatest(RecentlyViewed.last_viewed_at, stmt.excluded.last_viewed_at)},
+            )
+            written += db.execute(stmt).rowcount or 0
+            db.commit()
+    except Exception:
+        db.rollback()
+        pipe = r.pipeline(transaction=False)
+        for field, ms in pending.items():
+            pipe.hsetnx(_PENDING_KEY, field, ms)
+        pipe.delete(work_key)
+        pipe.execute()
+        raise
+    r.delete(work_key)
+    return written
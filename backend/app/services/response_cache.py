@@ -0,0 +1,85 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass, field
+import orjson
+from starlette.responses import Response
+from app.core.config import settings
+from app.core.metrics import RESPONSE_CACHE
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+# resp:{name}:{params digest} -> "{version}\n{etag}\n{headers json}\n{body}"
+# cache:v:{name}              -> version counter; bumping it orphans every entry of that cache,
+#                                which then expires on its own TTL.
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, headers: dict[str, str] | None = None) -> CachedResponse:
+        return cls(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', headers=headers or {})
+
+    def to_response(self, if_none_match: str | None) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2).
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def cache_key(name: str, **params) -> str:
+    norm = {k: sorted(v) if isinstance(v, list) else v for k, v in params.items() if v not in (None, "", [])}
+    digest = hashlib.blake2b(orjson.dumps(norm, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    return f"resp:{name}:{digest}"
+
+def _version_key(name: str) -> str:
+    return f"cache:v:{name}"
+
+async def aget(name: str, key: str) -> tuple[CachedResponse | None, str | None]:
+    """Look up ``key`` in one round-trip. Returns the entry (if current) and the cache version to
+    store a freshly built response under; ``(None, None)`` when Redis is unavailable."""
+    if settings.response_cache_ttl_seconds <= 0:
+        return None, None
+    try:
+        version, raw = await get_redis_async().mget(_version_key(name), key)
+    except Exception:
+        RESPONSE_CACHE.labels(name, "error").inc()
+        return None, None
+    version = version or "0"
+    if raw:
+        stored_version, etag, headers, body = raw.split("\n", 3)
+        # Entries written under an older version are stale even though their TTL hasn't run out.
+        if stored_version == version:
+            RESPONSE_CACHE.labels(name, "hit").inc()
+            return CachedResponse(body=body.encode("utf-8"), etag=etag, headers=orjson.loads(headers)), version
+    RESPONSE_CACHE.labels(name, "miss").inc()
+    return None, version
+
+async def astore(key: str, version: str | None, entry: CachedResponse) -> None:
+    if version is None:
+        return
+    raw = f"{version}\n{entry.etag}\n{orjson.dumps(entry.headers).decode()}\n{entry.body.decode('utf-8')}"
+    try:
+        await get_redis_async().set(key, raw, ex=settings.response_cache_ttl_seconds)
+    except Exception:
+        pass
+
+def bump_version(name: str) -> None:
+    try:
+        get_redis_sync().incr(_version_key(name))
+    except Exception:
+        pass
+
+async def abump_version(name: str) -> None:
+    try:
+        await get_redis_async().incr(_version_key(name))
+    except Exception:
+        pass
@@ -1,46 +1,41 @@
 from __future__ import annotations
-import boto3
-from botocore.client import Config
-from urllib.parse import urlparse, urlunparse
+import datetime as dt
+import threading
+import time
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.services.sigv4 import SigV4Presigner
 
 class S3Client:
     def __init__(self) -> None:
-        self.client = boto3.client(
-            "s3",
-            endpoint_url=settings.s3_endpoint_url,
-            aws_access_key_id=settings.s3_access_key,
-            aws_secret_access_key=settings.s3_secret_key,
-            region_name=settings.s3_region,
-            config=Config(signature_version="s3v4"),
+        self._client = None
+        self._client_lock = threading.Lock()
+        # Presigned URLs are handed to clients, so sign for the public endpoint when one is set.
+        self.presigner = SigV4Presigner(
+            settings.s3_public_endpoint_url or settings.s3_endpoint_url,
+            settings.s3_access_key,
+            settings.s3_secret_key,
+            settings.s3_region,
         )
-        self.public_client = None
-        if settings.s3_public_endpoint_url:
-            self.public_client = boto3.client(
-                "s3",
-                endpoint_url=settings.s3_public_endpoint_url,
-                aws_access_key_id=settings.s3_access_key,
-                aws_secret_access_key=settings.s3_secret_key,
-                region_name=settings.s3_region,
-                config=Config(signature_version="s3v4"),
-            )
+        self._presign_cache = TTLCache(settings.s3_presign_cache_size, settings.s3_presign_window_seconds)
 
-    def _apply_public_endpoint(self, url: str) -> str:
-        if not settings.s3_public_endpoint_url:
-            return url
-        public = urlparse(settings.s3_public_endpoint_url)
-        original = urlparse(url)
-        if not public.scheme or not public.netloc:
-            return url
-        public_path = public.path.rstrip("/")
-        new_path = f"{public_path}{original.path}" if public_path else original.path
-        return urlunparse(
-            original._replace(
-                scheme=public.scheme,
-                netloc=public.netloc,
-                path=new_path,
-            )
-        )
+    @property
+    def client(self):
+        """boto3 client, built on first use: API processes only presign (natively) and never need it."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.client import Config
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=settings.s3_endpoint_url,
+                        aws_access_key_id=settings.s3_access_key,
+                        aws_secret_access_key=settings.s3_secret_key,
+                        region_name=settings.s3_region,
+                        config=Config(signature_version="s3v4", max_pool_connections=settings.s3_max_pool_connections),
+                    )
+        return self._client
 
     def presign_put(
         self,
@@ -49,17 +44,31 @@ class S3Client:
         expires: int = 3600,
         content_type: str | None = None,
     ) -> str:
-        params = {"Bucket": bucket, "Key": key}
-        if content_type:
-            params["ContentType"] = content_type
-        client = self.public_client or self.client
-        return client.generate_presigned_url("put_object", Params=params, ExpiresIn=expires)
+        return self.presigner.presign("PUT", bucket, key, expires, content_type=content_type)
+
+    def presign_upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, expires: int = 3600) -> str:
+        return self.presigner.presign(
+            "PUT", bucket, key, expires, params={"partNumber": str(part_number), "uploadId": upload_id}
+        )
 
     def presign_get(self, bucket: str, key: str, expires: int = 3600) -> str:
-        client = self.public_client or self.client
-        url = client.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires)
-        if client is self.client:
-            return self._apply_public_endpoint(url)
+        """Presigned GET URL, byte-identical for every call within an aligned time window.
+
+        The URL is signed as of the window start and stays valid for ``expires`` seconds past the
+        window end, so callers always get at least ``expires`` seconds of validity while browsers
+        and CDNs can cache by URL.
+        """
+        window = settings.s3_presign_window_seconds
+        if window <= 0:
+            return self.presigner.presign("GET", bucket, key, expires)
+        now = time.time()
+        start = int(now // window) * window
+        cache_key = (bucket, key, expires, start)
+        url = self._presign_cache.get(cache_key)
+        if url is None:
+            signed_at = dt.datetime.fromtimestamp(start, dt.timezone.utc)
+            url = self.presigner.presign("GET", bucket, key, expires + window, signed_at=signed_at)
+            self._presign_cache.set(cache_key, url, ttl=start + window - now)
         return url
 
     def upload_file(self, local_path: str, bucket: str, key: str, content_type: str | None = None) -> None:
@@ -69,4 +78,15 @@ class S3Client:
     def download_file(self, bucket: str, key: str, local_path: str) -> None:
         self.client.download_file(bucket, key, local_path)
 
+    def object_size(self, bucket: str, key: str) -> int:
+        return self.client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+
+    def get_range(self, bucket: str, key: str, start: int, end: int) -> bytes:
+        """Bytes ``start``..``end`` inclusive."""
+        body = self.client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")["Body"]
+        try:
+            return body.read()
+        finally:
+            body.close()
+
 s3 = S3Client()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import asyncio
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from app.core.config import settings
+from app.services.sigv4 import SigV4Presigner
+
+if TYPE_CHECKING:
+    import httpx
+
+# Requests are signed with short-lived query-string SigV4 URLs for the internal endpoint.
+_SIGN_EXPIRES = 60
+
+@dataclass(frozen=True, slots=True)
+class ObjectInfo:
+    size: int
+    content_type: str | None
+    etag: str | None
+
+@dataclass(frozen=True, slots=True)
+class PartInfo:
+    part_number: int
+    size: int
+    etag: str
+
+class S3Error(Exception):
+    """An S3 error document, including the ones CompleteMultipartUpload returns with a 200."""
+
+    def __init__(self, code: str, message: str = "") -> None:
+        super().__init__(f"{code}: {message}" if message else code)
+        self.code = code
+
+def _xml(body: bytes) -> ET.Element:
+    root = ET.fromstring(body)
+    if root.tag.rsplit("}", 1)[-1] == "Error":
+        raise S3Error(_text(root, "Code") or "", _text(root, "Message") or "")
+    return root
+
+def _text(el: ET.Element, name: str) -> str | None:
+    # {*} matches with or without the S3 namespace, which not every S3-compatible store sets.
+    return el.findtext(f"{{*}}{name}")
+
+class AsyncS3Client:
+    """Non-blocking object operations for request handlers, over one pooled httpx client.
+
+    Workers keep the boto3 client in ``app.services.s3``; this covers the handful of calls the API
+    makes itself (existence/size checks, small reads, deletes) without tying up threadpool slots.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str | None = None,
+        access_key: str | None = None,
+        secret_key: str | None = None,
+        region: str | None = None,
+        max_connections: int | None = None,
+    ) -> None:
+        self.signer = SigV4Presigner(
+            endpoint_url or settings.s3_endpoint_url,
+            access_key or settings.s3_access_key,
+            secret_key or settings.s3_secret_key,
+            region or settings.s3_region,
+        )
+        self.max_connections = max_connections or settings.s3_async_max_connections
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=settings.s3_async_timeout_seconds,
+            )
+        return self._http
+
+    def _url(self, method: str, bucket: str, key: str, content_type: str | None = None, params: dict[str, str] | None = None) -> str:
+        return self.signer.presign(method, bucket, key, _SIGN_EXPIRES, content_type=content_type, params=params)
+
+    async def head_object(self, bucket: str, key: str) -> ObjectInfo | None:
+        """Object metadata, or ``None`` if it doesn't exist."""
+        r = await self.http.head(self._url("HEAD", bucket, key))
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return ObjectInfo(
+            size=int(r.headers.get("content-length", 0)),
+            content_type=r.headers.get("content-type"),
+            etag=r.headers.get("etag"),
+        )
+
+    async def get_object(self, bucket: str, key: str, byte_range: tuple[int, int] | None = None) -> bytes:
+        """Whole object, or the inclusive ``byte_range``; meant for small reads."""
+        headers = {"Range": f"bytes={byte_range[0]}-{byte_range[1]}"} if byte_range else None
+        r = await self.http.get(self._url("GET", bucket, key), headers=headers)
+        r.raise_for_status()
+        return r.content
+
+    async def put_object(self, bucket: str, key: str, body: bytes, content_type: str | None = None) -> None:
+        headers = {"Content-Type": content_type} if content_type else None
+        r = await self.http.put(self._url("PUT", bucket, key, content_type), content=body, headers=headers)
+        r.raise_for_status()
+
+    async def delete_object(self, bucket: str, key: str) -> None:
+        r = await self.http.delete(self._url("DELETE", bucket, key))
+        if r.status_code != 404:
+            r.raise_for_status()
+
+    async def delete_objects(self, bucket: str, keys: list[str]) -> None:
+        await asyncio.gather(*(self.delete_object(bucket, k) for k in keys))
+
+    async def create_multipart_upload(self, bucket: str, key: str, content_type: str | None = None) -> str:
+        """Start a multipart upload and return its upload id."""
+        headers = {"Content-Type": content_type} if content_type else None
+        r = await self.http.post(self._url("POST", bucket, key, content_type, {"uploads": ""}), headers=headers)
+        r.raise_for_status()
+        return _text(_xml(r.content), "UploadId")
+
+    async def list_parts(self, bucket: str, key: str, upload_id: str) -> list[PartInfo] | None:
+        """Parts uploaded so far, or ``None`` if the upload doesn't exist (completed or aborted)."""
+        parts: list[PartInfo] = []
+        params = {"uploadId": upload_id}
+        while True:
+            r = await self.http.get(self._url("GET", bucket, key, params=params))
+            if r.status_code == 404:
+                return None
+            r.raise_for_status()
+            root = _xml(r.content)
+            for p in root.iterfind("{*}Part"):
+                parts.append(PartInfo(int(_text(p, "PartNumber")), int(_text(p, "Size")), _text(p, "ETag")))
+            if (_text(root, "IsTruncated") or "false").lower() != "true":
+                return parts
+            params = {"uploadId": upload_id, "part-number-marker": _text(root, "NextPartNumberMarker")}
+
+    async def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: list[PartInfo]) -> None:
+        body = "".join(
+            f"<Part><PartNumber>{p.part_number}</PartNumber><ETag>{p.etag}</ETag></Part>"
+            for p in sorted(parts, key=lambda p: p.part_number)
+        )
+        r = await self.http.post(
+            self._url("POST", bucket, key, params={"uploadId": upload_id}),
+            content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+        r.raise_for_status()
+        _xml(r.content)
+
+    async def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        r = await self.http.delete(self._url("DELETE", bucket, key, params={"uploadId": upload_id}))
+        if r.status_code != 404:
+            r.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+s3_async = AsyncS3Client()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+from sqlalchemy import Select, func, literal, or_
+from app.db.models.marketplace import Asset
+
+# Matches the generated column / index definitions in migration 0004.
+TS_CONFIG = "english"
+# Half-life-ish decay for the recency boost: an asset published this long ago scores half.
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+def asset_search(stmt: Select, q: str) -> tuple[Select, object]:
+    """Filter ``stmt`` to assets matching ``q`` and return it with a relevance score expression.
+
+    Full-text matches on the weighted title/tags/description ``search_vector`` (GIN), plus
+    typo-tolerant trigram word similarity on the title (GIN ``gin_trgm_ops``). Relevance is
+    boosted by recency so fresh uploads surface above stale exact matches.
+    """
+    tsq = func.websearch_to_tsquery(TS_CONFIG, q)
+    matches_text = Asset.search_vector.op("@@")(tsq)
+    matches_fuzzy = literal(q).op("<%")(Asset.title)
+    age_days = func.extract("epoch", func.now() - Asset.published_at) / 86400.0
+    recency = RECENCY_HALF_LIFE_DAYS / (RECENCY_HALF_LIFE_DAYS + func.greatest(age_days, 0))
+    relevance = func.ts_rank_cd(Asset.search_vector, tsq, 32) + func.word_similarity(q, Asset.title)
+    score = relevance * (0.5 + 0.5 * recency)
+    return stmt.where(or_(matches_text, matches_fuzzy)), score
+
+def with_tags(stmt: Select, tags: list[str]) -> Select:
+    """Assets carrying every tag in ``tags`` (JSONB containment, GIN-indexed)."""
+    return stmt.where(Asset.tags.contains(tags))
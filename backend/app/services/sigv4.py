@@ -0,0 +1,88 @@
+from __future__ import annotations
+import datetime as dt
+import hashlib
+import hmac
+from urllib.parse import quote, urlsplit
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.digest(key, msg.encode("utf-8"), "sha256")
+
+class SigV4Presigner:
+    """Query-string SigV4 presigner for path-style S3 URLs (AWS, MinIO).
+
+    Produces the same URLs as boto3's ``generate_presigned_url`` for ``get_object`` /
+    ``put_object`` without building a botocore request per call: the signing key and credential
+    scope are derived once per UTC day and the endpoint-dependent parts are precomputed.
+    """
+
+    def __init__(self, endpoint_url: str, access_key: str, secret_key: str, region: str, service: str = "s3") -> None:
+        parts = urlsplit(endpoint_url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc.rsplit("@", 1)[-1]
+        self.base_path = parts.path.rstrip("/")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self._day: str | None = None
+        self._signing_key = b""
+        self._credential = ""
+
+    def _scope_for(self, datestamp: str) -> tuple[bytes, str]:
+        if datestamp != self._day:
+            k = _hmac(f"AWS4{self.secret_key}".encode("utf-8"), datestamp)
+            k = _hmac(k, self.region)
+            k = _hmac(k, self.service)
+            signing_key = _hmac(k, "aws4_request")
+            credential = quote(f"{self.access_key}/{datestamp}/{self.region}/{self.service}/aws4_request", safe="-_.~")
+            # Assign together so a concurrent caller never pairs one day's key with another's scope.
+            self._signing_key, self._credential, self._day = signing_key, credential, datestamp
+        return self._signing_key, self._credential
+
+    def presign(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        expires: int,
+        *,
+        content_type: str | None = None,
+        params: dict[str, str] | None = None,
+        signed_at: dt.datetime | None = None,
+    ) -> str:
+        """``params`` are extra signed query parameters, e.g. ``partNumber``/``uploadId`` for multipart."""
+        now = signed_at or dt.datetime.now(dt.timezone.utc)
+        if now.tzinfo is not None:
+            now = now.astimezone(dt.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = amz_date[:8]
+        signing_key, credential = self._scope_for(datestamp)
+
+        path = f"{self.base_path}/{quote(bucket, safe='')}/{quote(key, safe='/~')}"
+        if content_type:
+            signed_headers = "content-type%3Bhost"
+            canonical_headers = f"content-type:{content_type.strip()}\nhost:{self.host}\n"
+            header_list = "content-type;host"
+        else:
+            signed_headers = "host"
+            canonical_headers = f"host:{self.host}\n"
+            header_list = "host"
+        query = (
+            f"X-Amz-Algorithm={ALGORITHM}&X-Amz-Credential={credential}&X-Amz-Date={amz_date}"
+            f"&X-Amz-Expires={int(expires)}&X-Amz-SignedHeaders={signed_headers}"
+        )
+        if params:
+            # The canonical query must be sorted by encoded name.
+            pairs = [p.split("=", 1) for p in query.split("&")]
+            pairs += [[quote(k, safe="-_.~"), quote(str(v), safe="-_.~")] for k, v in params.items()]
+            query = "&".join(f"{k}={v}" for k, v in sorted(pairs))
+        canonical_request = f"{method}\n{path}\n{query}\n{canonical_headers}\n{header_list}\n{UNSIGNED_PAYLOAD}"
+        string_to_sign = (
+            f"{ALGORITHM}\n{amz_date}\n{datestamp}/{self.region}/{self.service}/aws4_request\n"
+            f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+        )
+        signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        return f"{self.scheme}://{self.host}{path}?{query}&X-Amz-Signature={signature}"
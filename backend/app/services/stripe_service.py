@@ -1,12 +1,14 @@
 from __future__ import annotations
-import stripe
 from app.core.config import settings
 
-def configure_stripe() -> None:
+def configure_stripe():
+    """Import (on first use, it is slow to load) and configure the stripe SDK."""
+    import stripe
     stripe.api_key = settings.stripe_secret_key
+    return stripe
 
 def create_asset_checkout_session(*, user_id: str, asset_id: str, title: str, amount_cents: int, currency: str) -> str:
-    configure_stripe()
+    stripe = configure_stripe()
     session = stripe.checkout.Session.create(
         mode="payment",
         success_url=settings.stripe_success_url,
@@ -17,7 +19,7 @@ def create_asset_checkout_session(*, user_id: str, asset_id: str, title: str, am
     return session.url
 
 def create_subscription_checkout_session(*, user_id: str) -> str:
-    configure_stripe()
+    stripe = configure_stripe()
     if not settings.stripe_subscription_price_id:
         raise ValueError("STRIPE_SUBSCRIPTION_PRICE_ID not configured")
     session = stripe.checkout.Session.create(
@@ -30,5 +32,5 @@ def create_subscription_checkout_session(*, user_id: str) -> str:
     return session.url
 
 def verify_webhook(payload: bytes, sig_header: str):
-    configure_stripe()
+    stripe = configure_stripe()
     return stripe.Webhook.construct_event(payload, sig_header, settings.stripe_webhook_secret)
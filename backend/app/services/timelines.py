@@ -0,0 +1,160 @@
+from __future__ import annotations
+import datetime as dt
+import uuid
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.social import Follow, Post
+from app.db.models.user import UserStats
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+# timeline:{user}  - home feed, fanned out on write: post id -> created_at (epoch ms)
+# author:{user}    - the creator's own recent posts; merged at read time for creators above
+#                    feed_fanout_max_followers, and used to backfill/prune on follow/unfollow.
+# A "-" sentinel (score 0) keeps an otherwise empty timeline key alive, so "missing key"
+# reliably means "never built or expired" and triggers a rebuild from the database.
+_SENTINEL = "-"
+# Extra entries fetched per source to absorb posts sharing the cursor's millisecond.
+_TIE_SLACK = 16
+
+def _timeline_key(user_id) -> str:
+    return f"timeline:{user_id}"
+
+def _author_key(user_id) -> str:
+    return f"author:{user_id}"
+
+def score_of(ts: dt.datetime) -> int:
+    return int(ts.timestamp() * 1000)
+
+def _add(pipe, key: str, members: dict[str, int]) -> None:
+    pipe.zadd(key, members)
+    pipe.zremrangebyrank(key, 0, -settings.feed_timeline_length - 1)
+    pipe.expire(key, settings.feed_timeline_ttl_seconds)
+
+_ADD_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+  redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -tonumber(ARGV[3]) - 1)
+end
+return 0
+"""
+
+def _add_if_built(pipe, key: str, member: dict[str, int]) -> None:
+    # Timelines that don't exist are rebuilt from the database on next read; creating them
+    # here would leave a one-post timeline that looks complete.
+    (post_id, score), = member.items()
+    pipe.eval(_ADD_IF_EXISTS_LUA, 1, key, post_id, score, settings.feed_timeline_length)
+
+def fanout_post(db: Session, post_id) -> int:
+    """Push a new post into its author's list and, below the celebrity threshold, every follower's
+    existing timeline. Returns the number of timelines written."""
+    post = db.get(Post, post_id)
+    if not post:
+        return 0
+    r = get_redis_sync()
+    member = {str(post.id): score_of(post.created_at)}
+    pipe = r.pipeline(transaction=False)
+    _add(pipe, _author_key(post.creator_id), member)
+    _add_if_built(pipe, _timeline_key(post.creator_id), member)
+    pipe.execute()
+    followers = db.execute(select(UserStats.followers).where(UserStats.user_id == post.creator_id)).scalar_one_or_none() or 0
+    if followers > settings.feed_fanout_max_followers:
+        return 1
+    written, last = 1, None
+    while True:
+        q = select(Follow.follower_id).where(Follow.following_id == post.creator_id).order_by(Follow.follower_id)
+        if last is not None:
+            q = q.where(Follow.follower_id > last)
+        ids = db.execute(q.limit(settings.feed_fanout_batch)).scalars().all()
+        if not ids:
+            return written
+        pipe = r.pipeline(transaction=False)
+        for follower_id in ids:
+            _add_if_built(pipe, _timeline_key(follower_id), member)
+        pipe.execute()
+        written += len(ids)
+        last = ids[-1]
+
+async def on_follow(follower_id, creator_id) -> None:
+    """Merge the creator's recent posts into the follower's timeline (if it is built)."""
+    r = get_redis_async()
+    try:
+        if not await r.exists(_timeline_key(follower_id)):
+            return
+        posts = await r.zrevrange(_author_key(creator_id), 0, settings.feed_timeline_length - 1, withscores=True)
+        if posts:
+            pipe = r.pipeline(transaction=False)
+            _add(pipe, _timeline_key(follower_id), {m: int(s) for m, s in posts})
+            await pipe.execute()
+    except Exception:
+        pass
+
+async def on_unfollow(follower_id, creator_id) -> None:
+    r = get_redis_async()
+    try:
+        posts = await r.zrange(_author_key(creator_id), 0, -1)
+        if posts:
+            await r.zrem(_timeline_key(follower_id), *posts)
+    except Exception:
+        pass
+
+async def _recent_posts(db: AsyncSession, user_id, limit: int, before=None):
+    followees = select(Follow.following_id).where(Follow.follower_id == user_id)
+    q = select(Post.id, Post.created_at).where((Post.creator_id == user_id) | Post.creator_id.in_(followees))
+    if before:
+        q = q.where(tuple_(Post.created_at, Post.id) < tuple_(*before))
+    return (await db.execute(q.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit))).all()
+
+async def _rebuild(db: AsyncSession, user_id) -> None:
+    rows = await _recent_posts(db, user_id, settings.feed_timeline_length)
+    pipe = get_redis_async().pipeline(transaction=False)
+    key = _timeline_key(user_id)
+    pipe.delete(key)
+    _add(pipe, key, {_SENTINEL: 0, **{str(row.id): score_of(row.created_at) for row in rows}})
+    await pipe.execute()
+
+async def _celebrity_followees(db: AsyncSession, user_id) -> list[uuid.UUID]:
+    return (await db.execute(
+        select(Follow.following_id)
+        .join(UserStats, UserStats.user_id == Follow.following_id)
+        .where(Follow.follower_id == user_id, UserStats.followers > settings.feed_fanout_max_followers)
+    )).scalars().all()
+
+async def read_feed(db: AsyncSession, user_id, limit: int, before: tuple[dt.datetime, uuid.UUID] | None) -> list[tuple[uuid.UUID, int]]:
+    """Newest-first ``(post_id, score)`` pairs for the home feed, strictly after ``before``.
+
+    Merges the fanned-out timeline with the author lists of followed high-follower creators and
+    falls back to querying the database when Redis is unavailable.
+    """
+    try:
+        return await _read_timelines(db, user_id, limit, before)
+    except Exception:
+        rows = await _recent_posts(db, user_id, limit, before)
+        return [(row.id, score_of(row.created_at)) for row in rows]
+
+async def _read_timelines(db: AsyncSession, user_id, limit: int, before) -> list[tuple[uuid.UUID, int]]:
+    r = get_redis_async()
+    key = _timeline_key(user_id)
+    if not await r.exists(key):
+        await _rebuild(db, user_id)
+    sources = [key] + [_author_key(c) for c in await _celebrity_followees(db, user_id)]
+    max_score = score_of(before[0]) if before else "+inf"
+    pipe = r.pipeline(transaction=False)
+    for src in sources:
+        # min score 1 skips the sentinel
+        pipe.zrevrangebyscore(src, max_score, 1, start=0, num=limit + _TIE_SLACK, withscores=True)
+    pipe.expire(key, settings.feed_timeline_ttl_seconds)
+    results = await pipe.execute()
+    merged: dict[str, int] = {}
+    for entries in results[:-1]:
+        for member, score in entries:
+            merged[member] = int(score)
+    out = []
+    for member, score in sorted(merged.items(), key=lambda kv: (kv[1], kv[0]), reverse=True):
+        if before and score == max_score and member >= str(before[1]):
+            continue
+        out.append((uuid.UUID(member), score))
+        if len(out) == limit:
+            break
+    return out
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import math
+from app.core.config import settings
+from app.services.s3 import s3
+from app.services.s3_async import s3_async
+
+# S3 multipart limits: every part but the last must be at least 5 MiB, and at most 10,000 parts.
+MIN_PART_BYTES = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+def part_plan(size: int) -> tuple[int, int]:
+    """``(part_size, part_count)`` for an upload of ``size`` bytes."""
+    part_size = max(settings.upload_part_bytes, MIN_PART_BYTES, math.ceil(size / MAX_PARTS))
+    return part_size, max(1, math.ceil(size / part_size))
+
+def max_part_number() -> int:
+    # Beyond this a completed upload can't fit under max_upload_bytes anyway.
+    return min(MAX_PARTS, max(1, math.ceil(settings.max_upload_bytes / MIN_PART_BYTES)))
+
+def bucket_for_key(user_id, key: str) -> str | None:
+    """Bucket a client-supplied upload key belongs to, or ``None`` if it isn't one of ``user_id``'s.
+
+    Upload keys are minted by the presign endpoints as ``{user}/{job}/inputs/...`` (scan inputs)
+    or ``{user}/marketplace/{model|thumb}/...``, so the key alone identifies owner and bucket.
+    """
+    parts = key.split("/", 3)
+    if len(parts) < 4 or parts[0] != str(user_id) or not parts[3]:
+        return None
+    if parts[1] == "marketplace":
+        if parts[2] == "model":
+            return settings.s3_bucket_marketplace_models
+        if parts[2] == "thumb":
+            return settings.s3_bucket_marketplace_thumbs
+        return None
+    if parts[2] == "inputs":
+        return settings.s3_bucket_scans_raw
+    return None
+
+def presign_parts(bucket: str, key: str, upload_id: str, part_numbers) -> list[tuple[int, str]]:
+    expires = settings.upload_part_url_expires_seconds
+    return [(n, s3.presign_upload_part(bucket, key, upload_id, n, expires=expires)) for n in part_numbers]
+
+async def start(bucket: str, key: str, size: int, content_type: str | None) -> tuple[str, int, int]:
+    """Initiate a multipart upload; returns ``(upload_id, part_size, part_count)``."""
+    upload_id = await s3_async.create_multipart_upload(bucket, key, content_type)
+    part_size, part_count = part_plan(size)
+    return upload_id, part_size, part_count
+
+async def finish(bucket: str, key: str, upload_id: str) -> int | None:
+    """Complete from the parts S3 actually holds; returns the object size.
+
+    ``None`` if the upload is gone. Raises ``ValueError`` if nothing was uploaded, or (after
+    aborting) if the parts add up to more than ``max_upload_bytes``: presigned part URLs can't
+    bound the bytes a client sends, so this is where the limit is enforced.
+    """
+    parts = await s3_async.list_parts(bucket, key, upload_id)
+    if parts is None:
+        return None
+    if not parts:
+        raise ValueError("No parts uploaded")
+    size = sum(p.size for p in parts)
+    if size > settings.max_upload_bytes:
+        await s3_async.abort_multipart_upload(bucket, key, upload_id)
+        raise ValueError("Upload exceeds max_upload_bytes")
+    await s3_async.complete_multipart_upload(bucket, key, upload_id, parts)
+    return size
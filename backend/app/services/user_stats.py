@@ -0,0 +1,180 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+import orjson
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.jobs import AIJob, ScanJob
+from app.db.models.marketplace import Asset, Download
+from app.db.models.social import Follow
+from app.db.models.user import User, UserStats
+from app.services.redis_client import get_redis_async, get_redis_sync
+
+@dataclass(frozen=True, slots=True)
+class ProfileSnapshot:
+    """Viewer-independent part of a public profile, cached per user."""
+
+    username: str
+    bio: str | None
+    avatar_url: str | None
+    followers: int
+    following: int
+    assets: int
+    published_assets: int
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> ProfileSnapshot:
+        return cls(**orjson.loads(raw))
+
+STAT_COLUMNS = ("followers", "following", "assets", "published_assets", "downloads", "ai_jobs", "scan_jobs")
+PROFILE_COLUMNS = ("followers", "following", "assets", "published_assets")
+DASHBOARD_COLUMNS = ("assets", "downloads", "ai_jobs", "scan_jobs")
+_profiles = TTLCache(settings.profile_cache_size, settings.profile_cache_ttl_seconds)
+
+def _redis_key(user_id) -> str:
+    return f"profile:{user_id}"
+
+def _dashboard_key(user_id) -> str:
+    return f"dashboard:{user_id}"
+
+def _bump_stmt(user_id, deltas: dict[str, int]):
+    # Upsert so users that predate user_stats (or were never followed) get a row on first write.
+    stmt = insert(UserStats).values(user_id=user_id, **{k: max(d, 0) for k, d in deltas.items()})
+    return stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={k: func.greatest(getattr(UserStats, k) + d, 0) for k, d in deltas.items()},
+    )
+
+def bump_stats(db: Session, user_id, **deltas: int) -> None:
+    """Atomically add ``deltas`` (keyword per ``STAT_COLUMNS`` entry) in ``db``'s transaction."""
+    db.execute(_bump_stmt(user_id, deltas))
+
+async def abump_stats(db: AsyncSession, user_id, **deltas: int) -> None:
+    await db.execute(_bump_stmt(user_id, deltas))
+
+def bump_stats_many(db: Session, column: str, deltas: dict) -> None:
+    """One upsert adding ``deltas[user_id]`` to ``column`` for many users (e.g. a batch of events)."""
+    if not deltas:
+        return
+    stmt = insert(UserStats).values([{"user_id": user_id, column: max(n, 0)} for user_id, n in deltas.items()])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={column: func.greatest(getattr(UserStats, column) + getattr(stmt.excluded, column), 0)},
+    ))
+
+def detach_user_stats(db: Session, user_id) -> None:
+    """Before deleting a user: take their follow edges out of the other side's counters."""
+    following = select(Follow.following_id).where(Follow.follower_id == user_id)
+    followers = select(Follow.follower_id).where(Follow.following_id == user_id)
+    db.execute(update(UserStats).where(UserStats.user_id.in_(following)).values(followers=func.greatest(UserStats.followers - 1, 0)))
+    db.execute(update(UserStats).where(UserStats.user_id.in_(followers)).values(following=func.greatest(UserStats.following - 1, 0)))
+
+def profile_stats_columns():
+    """``user_stats`` counters for a ``User`` outer-joined to ``UserStats`` (zero when the row is missing)."""
+    return tuple(func.coalesce(getattr(UserStats, c), 0).label(c) for c in PROFILE_COLUMNS)
+
+async def aget_profile_snapshot(user_id) -> ProfileSnapshot | None:
+    key = str(user_id)
+    snap = _profiles.get(key)
+    if snap is not None:
+        return snap
+    try:
+        raw = await get_redis_async().get(_redis_key(key))
+    except Exception:
+        return None
+    if raw:
+        snap = ProfileSnapshot.from_json(raw)
+        _profiles.set(key, snap)
+    return snap
+
+async def astore_profile_snapshot(user_id, snap: ProfileSnapshot) -> None:
+    _profiles.set(str(user_id), snap)
+    try:
+        await get_redis_async().set(_redis_key(user_id), snap.to_json(), ex=settings.profile_cache_redis_ttl_seconds)
+    except Exception:
+        pass
+
+def invalidate_profile(*user_ids) -> None:
+    for user_id in user_ids:
+        _profiles.pop(str(user_id))
+    try:
+        get_redis_sync().delete(*(_redis_key(u) for u in user_ids))
+    except Exception:
+        pass
+
+async def ainvalidate_profile(*user_ids) -> None:
+    for user_id in user_ids:
+        _profiles.pop(str(user_id))
+    try:
+        await get_redis_async().delete(*(_redis_key(u) for u in user_ids))
+    except Exception:
+        pass
+
+async def aget_dashboard(user_id) -> dict[str, int] | None:
+    try:
+        raw = await get_redis_async().get(_dashboard_key(user_id))
+    except Exception:
+        return None
+    return orjson.loads(raw) if raw else None
+
+async def astore_dashboard(user_id, data: dict[str, int]) -> None:
+    try:
+        await get_redis_async().set(_dashboard_key(user_id), orjson.dumps(data), ex=settings.dashboard_cache_ttl_seconds)
+    except Exception:
+        pass
+
+def invalidate_dashboard(user_id) -> None:
+    try:
+        get_redis_sync().delete(_dashboard_key(user_id))
+    except Exception:
+        pass
+
+async def ainvalidate_dashboard(user_id) -> None:
+    try:
+        await get_redis_async().delete(_dashboard_key(user_id))
+    except Exception:
+        pass
+
+def reconcile(db: Session, batch: int = 5000) -> int:
+    """Recompute ``user_stats`` from its source tables for every user; returns rows written.
+
+    Walks users by id in batches and upserts only rows whose counters drifted. ``downloads`` is
+    skipped once old download partitions expire (the counter then holds the lifetime total).
+    """
+    def count(model, *where):
+        return select(func.count()).select_from(model).where(*where).scalar_subquery()
+
+    sources = {
+        "followers": count(Follow, Follow.following_id == User.id),
+        "following": count(Follow, Follow.follower_id == User.id),
+        "assets": count(Asset, Asset.creator_id == User.id),
+        "published_assets": count(Asset, Asset.creator_id == User.id, Asset.visibility == "published"),
+        "ai_jobs": count(AIJob, AIJob.user_id == User.id),
+        "scan_jobs": count(ScanJob, ScanJob.user_id == User.id),
+    }
+    if not settings.downloads_retention_months:
+        sources["downloads"] = count(Download, Download.user_id == User.id)
+    fixed, last_id = 0, None
+    while True:
+        ids_q = select(User.id).order_by(User.id).limit(batch)
+        if last_id is not None:
+            ids_q = ids_q.where(User.id > last_id)
+        ids = db.execute(ids_q).scalars().all()
+        if not ids:
+            return fixed
+        last_id = ids[-1]
+        src = select(User.id, *sources.values()).where(User.id.in_(ids))
+        stmt = insert(UserStats).from_select(["user_id", *sources], src)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={c: getattr(stmt.excluded, c) for c in sources},
+            where=or_(*(getattr(UserStats, c) != getattr(stmt.excluded, c) for c in sources)),
+        )
+        fixed += db.execute(stmt).rowcount or 0
+        db.commit()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery_app = Celery(
@@ -12,3 +13,34 @@ celery_app.conf.task_default_queue = "r2v"
 celery_app.conf.task_routes = {"app.workers.tasks.*": {"queue": "r2v"}}
 celery_app.conf.worker_prefetch_multiplier = 1
 celery_app.conf.task_acks_late = True
+# Run with `celery -A app.workers.celery_app:celery_app beat` (a single beat process per deployment).
+celery_app.conf.beat_schedule = {
+    "flush-asset-counters": {
+        "task": "app.workers.tasks.flush_asset_counters_task",
+        "schedule": settings.asset_counters_flush_seconds,
+    },
+    "flush-recently-viewed": {
+        "task": "app.workers.tasks.flush_recently_viewed_task",
+        "schedule": settings.recently_viewed_flush_seconds,
+    },
+    "flush-notifications": {
+        "task": "app.workers.tasks.flush_notifications_task",
+        "schedule": settings.notifications_flush_seconds,
+    },
+    "flush-download-events": {
+        "task": "app.workers.tasks.flush_download_events_task",
+        "schedule": settings.download_events_flush_seconds,
+    },
+    "maintain-download-partitions": {
+        "task": "app.workers.tasks.maintain_download_partitions_task",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "reconcile-asset-counters": {
+        "task": "app.workers.tasks.reconcile_asset_counters_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "reconcile-user-stats": {
+        "task": "app.workers.tasks.reconcile_user_stats_task",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
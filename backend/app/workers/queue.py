@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+def enqueue(task: str, *args) -> None:
+    """Send ``app.workers.tasks.<task>`` by name.
+
+    API processes enqueue through here so they never import the task module (and with it the
+    worker adapters, Pillow and friends); Celery itself is loaded on the first call.
+    """
+    from app.workers.celery_app import celery_app
+    celery_app.send_task(f"app.workers.tasks.{task}", args=args)
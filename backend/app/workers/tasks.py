@@ -1,10 +1,13 @@
 from __future__ import annotations
-import tempfile, datetime as dt
+import functools, tempfile, zipfile, datetime as dt
 from pathlib import Path
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.workers import zip_ingest
 from app.workers.celery_app import celery_app
 from app.db.session import SessionLocal
-from app.db.models.jobs import AIJob, ScanJob
+from app.db.models.jobs import AIJob, ScanJob, ScanJobInput
+from app.services import counters, download_events, job_events, notifications, recently_viewed, timelines, user_stats
 from app.services.s3 import s3
 from app.core.config import settings
 from app.workers.adapters.image_gen import generate_image
@@ -14,11 +17,22 @@ from app.workers.adapters.repair import repair_mesh
 def _db() -> Session:
     return SessionLocal()
 
+_JOB_KINDS = {AIJob: "ai", ScanJob: "scan"}
+
+def _report(job, db: Session, progress: int, stage: str, status: str | None = None):
+    """Commit job progress and publish it to the job's event channel (SSE subscribers)."""
+    if status:
+        job.status = status
+    job.progress = progress
+    db.commit()
+    job_events.publish(_JOB_KINDS[type(job)], job.id, status=job.status, progress=progress, stage=stage)
+
 def _mark_failed(job, err: str, db: Session):
     job.status = "failed"
     job.error = err
     job.updated_at = dt.datetime.now(dt.timezone.utc)
     db.commit()
+    job_events.publish(_JOB_KINDS[type(job)], job.id, status="failed", progress=job.progress, stage="failed", error=err)
 
 def _format_scan_error(err: Exception) -> str:
     message = str(err)
@@ -29,6 +43,15 @@ def _format_scan_error(err: Exception) -> str:
         )
     return message
 
+def _ingest_zip(key: str, dest: Path, prefix: str) -> int:
+    # Read in place with ranged GETs; the archive itself never lands on worker disk.
+    bucket = settings.s3_bucket_scans_raw
+    reader = zip_ingest.RangedReader(s3.object_size(bucket, key), functools.partial(s3.get_range, bucket, key))
+    try:
+        return zip_ingest.extract_images(reader, dest, prefix)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{Path(key).name} is not a valid zip archive.") from e
+
 @celery_app.task(name="app.workers.tasks.ai_generate_task")
 def ai_generate_task(job_id: str):
     db = _db()
@@ -36,7 +59,7 @@ def ai_generate_task(job_id: str):
     if not job:
         return
     try:
-        job.status = "running"; job.progress = 5; db.commit()
+        _report(job, db, 5, "started", status="running")
 
         with tempfile.TemporaryDirectory() as td:
             td = Path(td)
@@ -45,13 +68,13 @@ def ai_generate_task(job_id: str):
             glb_fixed = td / "fixed.glb"
 
             generate_image(job.prompt, img_path)
-            job.progress = 25; db.commit()
+            _report(job, db, 25, "image")
 
             image_to_3d(img_path, glb_raw)
-            job.progress = 60; db.commit()
+            _report(job, db, 60, "model")
 
             repair_mesh(glb_raw, glb_fixed)
-            job.progress = 80; db.commit()
+            _report(job, db, 80, "repair")
 
             # Upload outputs
             out_key_img = f"{job.user_id}/{job.id}/outputs/out.png"
@@ -62,9 +85,8 @@ def ai_generate_task(job_id: str):
             job.output_image_key = out_key_img
             job.output_glb_key = out_key_glb
             job.preview_keys = [out_key_img]
-            job.status = "succeeded"; job.progress = 100
             job.updated_at = dt.datetime.now(dt.timezone.utc)
-            db.commit()
+            _report(job, db, 100, "done", status="succeeded")
     except Exception as e:
         _mark_failed(job, str(e), db)
     finally:
@@ -77,7 +99,7 @@ def scan_reconstruct_task(job_id: str):
     if not job:
         return
     try:
-        job.status = "running"; job.progress = 5; db.commit()
+        _report(job, db, 5, "started", status="running")
         with tempfile.TemporaryDirectory() as td:
             td = Path(td)
             inputs = td / "inputs"; inputs.mkdir(parents=True, exist_ok=True)
@@ -86,25 +108,102 @@ def scan_reconstruct_task(job_id: str):
 
             from app.workers.adapters.photogrammetry import reconstruct_from_images
 
-            for key in job.input_keys or []:
+            input_keys = db.execute(
+                select(ScanJobInput.object_key).where(ScanJobInput.job_id == job.id).order_by(ScanJobInput.created_at, ScanJobInput.id)
+            ).scalars().all()
+            zip_job = (job.job_metadata or {}).get("kind") == "zip"
+            for n, key in enumerate(input_keys):
+                suffix = Path(key).suffix.lower()
+                if suffix == ".zip" or (zip_job and suffix not in zip_ingest.IMAGE_SUFFIXES):
+                    _ingest_zip(key, inputs, prefix=f"{n:04d}_")
+                    continue
                 filename = Path(key).name
                 target = inputs / filename
                 s3.download_file(settings.s3_bucket_scans_raw, key, str(target))
+            _report(job, db, 15, "inputs")
 
             reconstruct_from_images(inputs, out_glb)
-            job.progress = 70; db.commit()
+            _report(job, db, 70, "reconstruct")
 
             repair_mesh(out_glb, out_fixed)
-            job.progress = 85; db.commit()
+            _report(job, db, 85, "repair")
 
             out_key_glb = f"{job.user_id}/{job.id}/outputs/scan.glb"
             s3.upload_file(str(out_fixed), settings.s3_bucket_job_outputs, out_key_glb, content_type="model/gltf-binary")
             job.output_glb_key = out_key_glb
             job.preview_keys = [out_key_glb]
-            job.status = "succeeded"; job.progress = 100
             job.updated_at = dt.datetime.now(dt.timezone.utc)
-            db.commit()
+            _report(job, db, 100, "done", status="succeeded")
     except Exception as e:
         _mark_failed(job, _format_scan_error(e), db)
     finally:
         db.close()
+
+@celery_app.task(name="app.workers.tasks.flush_asset_counters_task")
+def flush_asset_counters_task():
+    db = _db()
+    try:
+        return counters.flush_buffered(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.reconcile_asset_counters_task")
+def reconcile_asset_counters_task():
+    db = _db()
+    try:
+        # Apply pending deltas first so they aren't added on top of the recomputed totals later.
+        if settings.asset_counters_buffered:
+            counters.flush_buffered(db)
+        return counters.reconcile(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.reconcile_user_stats_task")
+def reconcile_user_stats_task():
+    db = _db()
+    try:
+        return user_stats.reconcile(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.flush_recently_viewed_task")
+def flush_recently_viewed_task():
+    db = _db()
+    try:
+        return recently_viewed.flush(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.flush_download_events_task")
+def flush_download_events_task():
+    db = _db()
+    try:
+        return download_events.flush(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.maintain_download_partitions_task")
+def maintain_download_partitions_task():
+    db = _db()
+    try:
+        created = download_events.ensure_partitions(db)
+        dropped = download_events.drop_expired_partitions(db)
+        return {"created": created, "dropped": dropped}
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.fanout_post_task")
+def fanout_post_task(post_id: str):
+    db = _db()
+    try:
+        return timelines.fanout_post(db, post_id)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.flush_notifications_task")
+def flush_notifications_task():
+    db = _db()
+    try:
+        return notifications.flush(db)
+    finally:
+        db.close()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import io
+import shutil
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Callable
+from app.core.config import settings
+
+# What the photogrammetry adapters pick up from the inputs directory.
+IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+class RangedReader(io.RawIOBase):
+    """Seekable read-only file over an object fetched in ranged GETs.
+
+    ``zipfile`` reads the end-of-central-directory record and the central directory first, then
+    each member's local header and data, so only the tail and the selected members are fetched.
+    Reads are served from one ``block_size`` buffer; larger reads go out as a single range.
+    """
+
+    def __init__(self, size: int, fetch: Callable[[int, int], bytes], block_size: int | None = None) -> None:
+        self.size = size
+        self._fetch = fetch
+        self._block_size = block_size or settings.scan_zip_read_block_bytes
+        self._pos = 0
+        self._buf = b""
+        self._buf_start = 0
+        self.requests = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b) -> int:
+        want = min(len(b), self.size - self._pos)
+        if want <= 0:
+            return 0
+        offset = self._pos - self._buf_start
+        if not (0 <= offset and offset + want <= len(self._buf)):
+            end = min(self.size, self._pos + max(want, self._block_size))
+            self._buf = self._fetch(self._pos, end - 1)
+            self._buf_start = self._pos
+            self.requests += 1
+            offset = 0
+            if len(self._buf) < want:
+                raise OSError("short ranged read")
+        b[:want] = self._buf[offset:offset + want]
+        self._pos += want
+        return want
+
+def _is_image(info: zipfile.ZipInfo) -> bool:
+    path = PurePosixPath(info.filename)
+    if info.is_dir() or path.name.startswith(".") or "__MACOSX" in path.parts:
+        return False
+    return path.suffix.lower() in IMAGE_SUFFIXES
+
+def extract_images(fileobj, dest: Path, prefix: str = "") -> int:
+    """Extract the image members of a zip archive into ``dest``; returns how many were written.
+
+    Members are flattened to ``{prefix}{index}_{basename}`` so archive paths can't escape ``dest``
+    or collide. Limits are checked against the central directory before anything is extracted;
+    ``zipfile`` stops each member at its declared size, so they also bound what is written.
+    """
+    with zipfile.ZipFile(fileobj) as zf:
+        members = [i for i in zf.infolist() if _is_image(i)]
+        if len(members) > settings.scan_zip_max_members:
+            raise ValueError(f"Archive has more than {settings.scan_zip_max_members} images.")
+        if sum(i.file_size for i in members) > settings.scan_zip_max_extracted_bytes:
+            raise ValueError("Archive images exceed the extraction size limit.")
+        if any(i.flag_bits & 0x1 for i in members):
+            raise ValueError("Encrypted archives are not supported.")
+        for n, info in enumerate(members):
+            target = dest / f"{prefix}{n:05d}_{PurePosixPath(info.filename).name}"
+            with zf.open(info) as src, target.open("wb") as out:
+                shutil.copyfileobj(src, out, 1024 * 1024)
+        return len(members)
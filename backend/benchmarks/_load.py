@@ -0,0 +1,70 @@
+from __future__ import annotations
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass
+class LoadResult:
+    label: str
+    requests: int
+    errors: int
+    elapsed_s: float
+    latencies_ms: list[float]
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed_s if self.elapsed_s else 0.0
+
+    def pct(self, p: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def line(self) -> str:
+        p50 = statistics.median(self.latencies_ms) if self.latencies_ms else 0.0
+        return (
+            f"{self.label:<28} req={self.requests:<6} err={self.errors:<4} "
+            f"rps={self.rps:8.1f}  p50={p50:7.1f}ms  p99={self.pct(99):7.1f}ms"
+        )
+
+
+async def run_load(
+    label: str,
+    url: str,
+    *,
+    concurrency: int,
+    total: int,
+    headers: dict[str, str] | None = None,
+    params: dict[str, str] | None = None,
+) -> LoadResult:
+    """Fire ``total`` GETs at ``url`` from ``concurrency`` concurrent clients."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60, headers=headers) as client:
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(url, params=params)
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return LoadResult(label=label, requests=total, errors=errors, elapsed_s=elapsed, latencies_ms=latencies)
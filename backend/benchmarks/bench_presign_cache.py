@@ -0,0 +1,60 @@
+"""``list_assets`` serialization cost (``to_out`` over a page of assets) with and without the
+presign cache. Runs offline: presigning is local HMAC work, no S3 round-trip.
+
+    python -m benchmarks.bench_presign_cache --items 100 --rounds 50
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import time
+import uuid
+
+from app.api.routers.marketplace import to_out
+from app.core.config import settings
+from app.db.models.marketplace import Asset
+from app.services.s3 import s3
+
+
+def _assets(n: int) -> list[Asset]:
+    now = dt.datetime.now(dt.timezone.utc)
+    creator = uuid.uuid4()
+    return [
+        Asset(
+            id=uuid.uuid4(), creator_id=creator, title=f"Asset {i}", tags=["bench"], category="props", style="lowpoly",
+            is_paid=False, price=0, currency="usd", visibility="published", published_at=now,
+            model_object_key=f"{creator}/m/{i}.glb", thumb_object_key=f"{creator}/t/{i}.png",
+            preview_object_keys=[f"{creator}/p/{i}.glb"], meta_json={},
+        )
+        for i in range(n)
+    ]
+
+
+def _time_page(items: list[Asset], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        [to_out(a, "bench") for a in items]
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    items = _assets(args.items)
+
+    window = settings.s3_presign_window_seconds
+    settings.s3_presign_window_seconds = 0
+    uncached = _time_page(items, args.rounds)
+    settings.s3_presign_window_seconds = window or 900
+    s3._presign_cache.clear()
+    _time_page(items, 1)  # fill the cache for this window
+    cached = _time_page(items, args.rounds)
+
+    print(f"page of {args.items} assets ({2 * args.items} presigned URLs)")
+    print(f"  signing every URL : {uncached:8.2f} ms/page")
+    print(f"  presign cache hit : {cached:8.2f} ms/page  ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-URL cost of boto3 ``generate_presigned_url`` vs ``SigV4Presigner`` (offline).
+
+    python -m benchmarks.bench_presigner --n 20000
+"""
+from __future__ import annotations
+import argparse
+import time
+
+import boto3
+from botocore.client import Config
+
+from app.services.sigv4 import SigV4Presigner
+
+ENDPOINT = "http://localhost:9000"
+
+
+def _per_call_us(fn, n: int) -> float:
+    fn(0)
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+
+    client = boto3.client(
+        "s3", endpoint_url=ENDPOINT, aws_access_key_id="AKID", aws_secret_access_key="SECRET",
+        region_name="us-east-1", config=Config(signature_version="s3v4"),
+    )
+    presigner = SigV4Presigner(ENDPOINT, "AKID", "SECRET", "us-east-1")
+
+    cases = {
+        "GET": (
+            lambda i: client.generate_presigned_url("get_object", Params={"Bucket": "b", "Key": f"u/{i}.glb"}, ExpiresIn=900),
+            lambda i: presigner.presign("GET", "b", f"u/{i}.glb", 900),
+        ),
+        "PUT": (
+            lambda i: client.generate_presigned_url(
+                "put_object", Params={"Bucket": "b", "Key": f"u/{i}.jpg", "ContentType": "image/jpeg"}, ExpiresIn=3600
+            ),
+            lambda i: presigner.presign("PUT", "b", f"u/{i}.jpg", 3600, content_type="image/jpeg"),
+        ),
+    }
+    for name, (boto_fn, native_fn) in cases.items():
+        boto_us = _per_call_us(boto_fn, args.n)
+        native_us = _per_call_us(native_fn, args.n)
+        print(f"{name}: boto3 {boto_us:8.1f} us/url   SigV4Presigner {native_us:6.1f} us/url   ({boto_us / native_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
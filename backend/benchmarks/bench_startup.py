@@ -0,0 +1,55 @@
+"""Cold-start cost of ``import app.main`` from ``python -X importtime`` (offline).
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def import_times(module: str = "app.main") -> dict[str, tuple[int, int]]:
+    """``{module: (self_us, cumulative_us)}`` for one fresh interpreter importing ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--module", default="app.main")
+    args = parser.parse_args()
+
+    totals = []
+    cumulative = defaultdict(list)
+    for _ in range(args.runs):
+        times = import_times(args.module)
+        totals.append(times[args.module][1] / 1000)
+        for name, (_, cum) in times.items():
+            cumulative[name].append(cum / 1000)
+
+    print(f"import {args.module}: median {statistics.median(totals):.0f} ms, "
+          f"min {min(totals):.0f} ms over {args.runs} runs")
+    top_level = {n: statistics.median(v) for n, v in cumulative.items() if "." not in n and n != args.module}
+    print(f"\n{'top-level package':<32}{'median cumulative ms':>22}")
+    for name, ms in sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{name:<32}{ms:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
 #!/usr/bin/env bash
 set -euo pipefail
 alembic upgrade head
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+if [[ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]]; then
+  # Stale per-worker metric files from a previous run would be summed into /metrics.
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+  mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}"
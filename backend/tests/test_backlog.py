@@ -0,0 +1,21 @@
+from app.core.config import settings
+from app.services.backlog import BacklogWatch
+
+def test_warns_only_after_sustained_growth(monkeypatch):
+    monkeypatch.setattr(settings, "write_behind_warn_samples", 3)
+    monkeypatch.setattr(settings, "write_behind_warn_size", 100)
+    watch = BacklogWatch()
+    assert watch.observe({"notifications": 500}) == []
+    assert watch.observe({"notifications": 600}) == []
+    assert watch.observe({"notifications": 700}) == []
+    assert watch.observe({"notifications": 800}) == ["notifications"]
+    # A flush that drains the buffer resets the streak.
+    assert watch.observe({"notifications": 10}) == []
+    assert watch.observe({"notifications": 20}) == []
+
+def test_small_buffers_never_warn(monkeypatch):
+    monkeypatch.setattr(settings, "write_behind_warn_samples", 1)
+    monkeypatch.setattr(settings, "write_behind_warn_size", 100)
+    watch = BacklogWatch()
+    watch.observe({"asset_counters": 1})
+    assert watch.observe({"asset_counters": 50}) == []
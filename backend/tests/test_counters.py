@@ -0,0 +1,174 @@
+import asyncio
+import datetime as dt
+import uuid
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql
+from app.api.routers import marketplace
+from app.core.config import settings
+from app.services import counters
+from app.services.counters import _hourly_rows, hour_bucket
+
+def test_hour_bucket_truncates_to_utc_hour():
+    at = dt.datetime(2025, 3, 4, 5, 59, 59, 999, tzinfo=dt.timezone(dt.timedelta(hours=2)))
+    assert hour_bucket(at) == dt.datetime(2025, 3, 4, 3, 0, tzinfo=dt.timezone.utc)
+
+def test_buffered_hourly_entries_group_per_asset_and_bucket():
+    asset_id = uuid.uuid4()
+    epoch = int(dt.datetime(2025, 3, 4, 3, tzinfo=dt.timezone.utc).timestamp())
+    pending = {str(asset_id): {"likes": 3, "downloads": 1, f"likes@{epoch}": 3, f"downloads@{epoch}": 1, "views": 7}}
+    assert _hourly_rows(pending) == [(asset_id, dt.datetime(2025, 3, 4, 3, tzinfo=dt.timezone.utc), 1, 3)]
+
+class _FakeRedis:
+    """Just the hash/set commands the counter buffer uses; pipelines apply queued calls on execute."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    def hincrby(self, key, field, delta):
+        h = self.hashes.setdefault(key, {})
+        h[field] = h.get(field, 0) + int(delta)
+        return h[field]
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+    def delete(self, key):
+        return int(self.hashes.pop(key, None) is not None)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(str(member))
+
+    def spop(self, key, count):
+        s = self.sets.get(key, set())
+        return [s.pop() for _ in range(min(count, len(s)))]
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.calls]
+
+class _RecordingSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.statements = []
+        self.commits = self.rollbacks = 0
+
+    def execute(self, stmt):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+def _counter_rows(compiled) -> dict[uuid.UUID, tuple]:
+    # VALUES (id, likes, saves, downloads, views) rows of the flush UPDATE, in bind order.
+    params = [v for k, v in compiled.params.items() if k.startswith("param_")]
+    width = 1 + len(counters.COUNTER_COLUMNS)
+    return {params[i]: tuple(params[i + 1:i + width]) for i in range(0, len(params), width)}
+
+def _buffer(r, asset_id, field, delta):
+    pipe = r.pipeline(transaction=False)
+    counters.buffer_delta(pipe, asset_id, field, delta)
+    pipe.execute()
+
+def test_flush_applies_net_deltas_and_empties_the_buffer(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(counters, "get_redis_sync", lambda: r)
+    a, b = uuid.uuid4(), uuid.uuid4()
+    _buffer(r, a, "likes", 1)
+    _buffer(r, a, "likes", 1)
+    _buffer(r, a, "likes", -1)
+    _buffer(r, a, "views", 5)
+    _buffer(r, b, "downloads", 1)
+
+    db = _RecordingSession()
+    assert counters.flush_buffered(db, batch=10) == 2
+    update_stmt, hourly_stmt = db.statements
+    assert "UPDATE assets SET" in str(update_stmt)
+    assert _counter_rows(update_stmt) == {a: (1, 0, 0, 5), b: (0, 0, 1, 0)}
+    assert "INSERT INTO asset_stats_hourly" in str(hourly_stmt) and "ON CONFLICT" in str(hourly_stmt)
+    assert db.commits == 1
+    assert r.hashes == {} and not r.sets.get(counters._DIRTY_KEY)
+    assert counters.flush_buffered(_RecordingSession(), batch=10) == 0
+
+def test_failed_flush_requeues_deltas_for_the_next_run(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(counters, "get_redis_sync", lambda: r)
+    a = uuid.uuid4()
+    _buffer(r, a, "saves", 2)
+
+    failing = _RecordingSession(fail=True)
+    with pytest.raises(RuntimeError):
+        counters.flush_buffered(failing, batch=10)
+    assert failing.rollbacks == 1 and failing.commits == 0
+    assert r.sets[counters._DIRTY_KEY] == {str(a)}
+
+    # Increments that arrive after the failure merge with the restored ones: nothing lost or doubled.
+    _buffer(r, a, "saves", 1)
+    db = _RecordingSession()
+    assert counters.flush_buffered(db, batch=10) == 1
+    assert _counter_rows(db.statements[0]) == {a: (0, 3, 0, 0)}
+    assert len(db.statements) == 1
+
+class _AsyncPipeline(_FakePipeline):
+    async def execute(self):
+        return super().execute()
+
+class _AsyncRedis(_FakeRedis):
+    def pipeline(self, transaction=True):
+        return _AsyncPipeline(self)
+
+class _LikeSession:
+    """Async session for ``like_asset``: the asset exists, no like yet, and commit fails as given."""
+
+    def __init__(self, asset, commit_error=None):
+        self.asset = asset
+        self.commit_error = commit_error
+        self.added = []
+
+    async def get(self, model, ident):
+        return self.asset
+
+    async def execute(self, stmt):
+        return SimpleNamespace(scalar_one_or_none=lambda: None)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        if self.commit_error:
+            raise self.commit_error
+
+def test_buffered_like_queues_no_delta_when_the_commit_fails(monkeypatch):
+    r = _AsyncRedis()
+    monkeypatch.setattr(settings, "asset_counters_buffered", True)
+    monkeypatch.setattr(counters, "get_redis_async", lambda: r)
+    asset = SimpleNamespace(id=uuid.uuid4(), creator_id=None)
+    user = SimpleNamespace(id=uuid.uuid4())
+
+    # A concurrent like won the Like unique key: the commit raises and nothing may be counted.
+    db = _LikeSession(asset, IntegrityError("INSERT INTO likes", {}, Exception("duplicate key")))
+    with pytest.raises(IntegrityError):
+        asyncio.run(marketplace.like_asset(str(asset.id), db=db, user=user))
+    assert r.hashes == {} and not r.sets
+
+    monkeypatch.setattr(marketplace, "anotify", lambda *a, **k: asyncio.sleep(0))
+    asyncio.run(marketplace.like_asset(str(asset.id), db=_LikeSession(asset), user=user))
+    assert r.hashes[counters._hash_key(asset.id)]["likes"] == 1
+    assert r.sets[counters._DIRTY_KEY] == {str(asset.id)}
@@ -0,0 +1,36 @@
+import datetime as dt
+from app.services.download_events import drop_expired_partitions, ensure_partitions
+
+class _Result:
+    def __init__(self, names):
+        self._names = names
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._names
+
+class _RecordingSession:
+    def __init__(self, partitions=()):
+        self.partitions = list(partitions)
+        self.sql = []
+
+    def execute(self, stmt):
+        self.sql.append(str(stmt))
+        return _Result(self.partitions)
+
+    def commit(self):
+        pass
+
+def test_ensure_partitions_creates_utc_month_ranges_ahead():
+    db = _RecordingSession()
+    names = ensure_partitions(db, months_ahead=2, today=dt.date(2025, 11, 17))
+    assert names == ["downloads_y2025m11", "downloads_y2025m12", "downloads_y2026m01"]
+    assert "FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')" in db.sql[1]
+
+def test_drop_expired_partitions_keeps_retention_window():
+    db = _RecordingSession(["downloads_y2024m10", "downloads_y2024m11", "downloads_y2025m11"])
+    dropped = drop_expired_partitions(db, retention_months=12, today=dt.date(2025, 11, 17))
+    assert dropped == ["downloads_y2024m10"]
+    assert drop_expired_partitions(_RecordingSession(["downloads_y2000m01"]), retention_months=0) == []
@@ -0,0 +1,13 @@
+import uuid
+from app.services.entitlements import EntitlementSnapshot, resolve
+
+def test_resolve_prefers_purchase_over_subscription():
+    bought, other = uuid.uuid4(), uuid.uuid4()
+    snap = EntitlementSnapshot.from_json(EntitlementSnapshot(True, frozenset({bought})).to_json())
+    assert resolve(bought, "published", True, snap) == (True, "purchase")
+    assert resolve(other, "published", True, snap) == (True, "subscription")
+    assert resolve(other, "published", True, EntitlementSnapshot(False, frozenset({bought}))) == (False, "not_entitled")
+
+def test_resolve_skips_snapshot_for_free_and_unpublished_assets():
+    assert resolve(uuid.uuid4(), "published", False, None) == (True, "free")
+    assert resolve(uuid.uuid4(), "draft", True, None) == (False, "asset_not_published")
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Worker/SDK modules the API must only load on first use (see app.workers.queue, S3Client.client,
+# stripe_service.configure_stripe).
+DEFERRED = ("app.workers.tasks", "celery", "boto3", "botocore", "stripe", "PIL")
+# Cold `import app.main` in a fresh interpreter; generous so only real regressions trip it.
+IMPORT_BUDGET_SECONDS = 4.0
+
+def test_api_import_defers_worker_deps_and_fits_budget():
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        "import app.main\n"
+        "print(time.perf_counter() - t)\n"
+        f"print(','.join(m for m in {DEFERRED!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1],
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    assert out[1] == "", f"imported eagerly: {out[1]}"
+    assert float(out[0]) < IMPORT_BUDGET_SECONDS
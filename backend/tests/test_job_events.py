@@ -0,0 +1,16 @@
+import asyncio
+import orjson
+from app.services.job_events import stream
+
+def test_stream_skips_stale_events_and_ends_on_terminal_status():
+    async def run():
+        q = asyncio.Queue()
+        for status, progress in (("running", 5), ("running", 60), ("succeeded", 100), ("running", 99)):
+            q.put_nowait(orjson.dumps({"status": status, "progress": progress}).decode())
+        current = {"id": "j", "kind": "ai", "status": "running", "progress": 25, "stage": None, "error": None}
+        return [chunk async for chunk in stream("ai", "j", q, current)]
+
+    chunks = asyncio.run(run())
+    assert len(chunks) == 3
+    assert all(c.startswith(b"event: progress\ndata: ") for c in chunks)
+    assert b'"progress":60' in chunks[1] and b'"succeeded"' in chunks[2]
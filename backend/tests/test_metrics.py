@@ -0,0 +1,11 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_request_id_and_route_metrics():
+    r = client.get("/health", headers={"x-request-id": "req-123"})
+    assert r.headers["x-request-id"] == "req-123"
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert "http_requests_in_flight" in body
@@ -0,0 +1,17 @@
+import datetime as dt
+import uuid
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.api.pagination import decode_cursor, encode_cursor, paginate
+from app.db.models.social import Post
+
+def test_cursor_round_trip():
+    ts = dt.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt.timezone.utc)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+def test_cursor_seeks_instead_of_offset():
+    cursor = encode_cursor(dt.datetime.now(dt.timezone.utc), uuid.uuid4())
+    sql = str(paginate(select(Post), Post.created_at, Post.id, limit=20, offset=40, cursor=cursor).compile(dialect=postgresql.dialect()))
+    assert "(posts.created_at, posts.id) < (" in sql
+    assert "OFFSET" not in sql
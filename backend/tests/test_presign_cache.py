@@ -0,0 +1,36 @@
+import datetime as dt
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+from app.core.config import settings
+from app.services.s3 import S3Client
+
+WINDOW = settings.s3_presign_window_seconds
+# An instant 100s into a window.
+T0 = (1_740_832_496 // WINDOW) * WINDOW + 100
+
+def _presign_at(client: S3Client, now: float, expires: int = 900) -> str:
+    with mock.patch("app.services.s3.time", SimpleNamespace(time=lambda: now)):
+        return client.presign_get("bkt", "u/1/model.glb", expires=expires)
+
+def _valid_until(url: str) -> float:
+    q = parse_qs(urlsplit(url).query)
+    signed = dt.datetime.strptime(q["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ").replace(tzinfo=dt.timezone.utc)
+    return signed.timestamp() + int(q["X-Amz-Expires"][0])
+
+def test_same_window_returns_identical_url():
+    client = S3Client()
+    first = _presign_at(client, T0)
+    assert _presign_at(client, T0 + WINDOW - 200) == first
+    # Cached or not, the URL is a pure function of the window.
+    assert _presign_at(S3Client(), T0 + 50) == first
+
+def test_next_window_signs_a_new_url():
+    client = S3Client()
+    assert _presign_at(client, T0) != _presign_at(client, T0 + WINDOW)
+
+def test_url_valid_for_at_least_expires_from_now():
+    client = S3Client()
+    for now in (T0 - 100, T0, T0 + WINDOW - 101):
+        url = _presign_at(client, now, expires=600)
+        assert _valid_until(url) - now >= 600
@@ -0,0 +1,149 @@
+import time
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.api.deps import get_db
+from app.api.routers import me
+from app.core.config import settings
+from app.core.security import ALGORITHM, create_access_token
+from app.db.models.user import User, UserProfile
+from app.main import app
+from app.services import principal_cache
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+class _Query:
+    def filter(self, *args):
+        return self
+
+    def update(self, *args, **kwargs):
+        return 0
+
+class _FakeSession:
+    """In-memory users; counts user loads so cache hits are visible."""
+
+    def __init__(self, *users):
+        self.users = {u.id: u for u in users}
+        self.loads = 0
+
+    def _user(self, user_id):
+        self.loads += 1
+        return self.users.get(uuid.UUID(str(user_id)))
+
+    def get(self, model, ident):
+        return self._user(ident)
+
+    def execute(self, stmt):
+        # The principal loader selects one user by id; other statements (stats updates) return nothing.
+        if not stmt.is_select:
+            return _Result(None)
+        return _Result(self._user(next(iter(stmt.compile().params.values()))))
+
+    def query(self, *args):
+        return _Query()
+
+    def delete(self, obj):
+        self.users.pop(obj.id, None)
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+def _user(role="user") -> User:
+    u = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:8]}@example.com", password_hash="x", role=role, is_active=True)
+    u.profile = UserProfile(user_id=u.id, username=f"u_{uuid.uuid4().hex[:8]}")
+    return u
+
+def _auth(user: User, role: str | None = None) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(str(user.id), role or user.role)}"}
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "principal_cache_redis", False)
+    monkeypatch.setattr(me, "invalidate_profile", lambda *a: None)
+    monkeypatch.setattr(me, "bump_version", lambda *a: None)
+    principal_cache._principals.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    principal_cache._principals.clear()
+
+def _use(db: _FakeSession) -> None:
+    app.dependency_overrides[get_db] = lambda: db
+
+def test_principal_is_cached_between_requests(client):
+    user = _user()
+    db = _FakeSession(user)
+    _use(db)
+    assert client.get("/me", headers=_auth(user)).status_code == 200
+    assert client.get("/me", headers=_auth(user)).status_code == 200
+    assert db.loads == 1
+
+def test_update_me_refreshes_cached_principal(client):
+    user = _user()
+    _use(_FakeSession(user))
+    assert client.get("/me", headers=_auth(user)).json()["bio"] is None
+    assert client.patch("/me", json={"bio": "hello"}, headers=_auth(user)).status_code == 200
+    assert client.get("/me", headers=_auth(user)).json()["bio"] == "hello"
+
+def test_delete_me_evicts_cached_principal(client):
+    user = _user()
+    _use(_FakeSession(user))
+    assert client.get("/me", headers=_auth(user)).status_code == 200
+    assert client.delete("/me", headers=_auth(user)).status_code == 200
+    assert client.get("/me", headers=_auth(user)).status_code == 401
+
+def test_deactivated_user_is_rejected_on_next_request(client):
+    user, admin = _user(), _user(role="admin")
+    _use(_FakeSession(user, admin))
+    assert client.get("/me", headers=_auth(user)).status_code == 200
+    r = client.post(f"/admin/users/{user.id}/deactivate", headers=_auth(admin))
+    assert r.status_code == 200
+    assert client.get("/me", headers=_auth(user)).status_code == 401
+
+def test_require_admin_uses_token_role(client):
+    user, admin = _user(), _user(role="admin")
+    _use(_FakeSession(user, admin))
+    assert client.post(f"/admin/users/{admin.id}/activate", headers=_auth(user)).status_code == 403
+    # An admin in the database still needs an admin token, and a token without a role claim is not one.
+    assert client.post(f"/admin/users/{user.id}/activate", headers=_auth(admin, role="user")).status_code == 403
+    claims = jwt.get_unverified_claims(create_access_token(str(admin.id), "admin"))
+    del claims["role"]
+    roleless = jwt.encode(claims, settings.jwt_secret, algorithm=ALGORITHM)
+    r = client.post(f"/admin/users/{user.id}/activate", headers={"Authorization": f"Bearer {roleless}"})
+    assert r.status_code == 403
+    assert client.post(f"/admin/users/{user.id}/activate", headers=_auth(admin)).status_code == 200
+
+def test_claims_not_cached_past_exp(monkeypatch):
+    calls = []
+
+    def decode(token):
+        calls.append(token)
+        return {"sub": "u", "exp": time.time() + 0.05}
+
+    monkeypatch.setattr(principal_cache, "decode_token", decode)
+    token = f"token-{uuid.uuid4()}"
+    principal_cache.decode_access_claims(token)
+    principal_cache.decode_access_claims(token)
+    assert len(calls) == 1
+    time.sleep(0.1)
+    principal_cache.decode_access_claims(token)
+    assert len(calls) == 2
+
+def test_expired_claims_are_never_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(principal_cache, "decode_token", lambda token: calls.append(token) or {"exp": time.time() - 1})
+    token = f"token-{uuid.uuid4()}"
+    principal_cache.decode_access_claims(token)
+    principal_cache.decode_access_claims(token)
+    assert len(calls) == 2
@@ -0,0 +1,38 @@
+from app.core.rate_limit import LocalPreCounter, route_cost
+
+def test_route_costs():
+    assert route_cost("GET", "/health") == 0
+    assert route_cost("POST", "/scan/jobs/abc/start") > route_cost("GET", "/scan/jobs/abc")
+    assert route_cost("GET", "/marketplace/assets") == 1
+
+def test_local_pre_counter_batches_until_sync():
+    local = LocalPreCounter(batch=3)
+    assert not local.try_spend("k", 1)
+    local.record("k", remaining=10)
+    assert local.try_spend("k", 1)
+    assert local.try_spend("k", 2)
+    assert not local.try_spend("k", 1)
+    assert local.take_debt("k") == 3
+    assert not local.try_spend("k", 1)
+
+def test_middleware_sends_429_and_passes_allowed_requests(monkeypatch):
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from app.core import rate_limit
+
+    verdicts = iter([[1, "5", 0], [0, "0", 2500]])
+
+    async def script(keys, args):
+        return next(verdicts)
+
+    monkeypatch.setattr(rate_limit, "_script", lambda: script)
+    monkeypatch.setattr(rate_limit, "_local", None)
+    app = Starlette(routes=[Route("/marketplace/assets", lambda request: PlainTextResponse("ok"))])
+    app.add_middleware(rate_limit.RateLimitMiddleware)
+    client = TestClient(app)
+    assert client.get("/marketplace/assets").text == "ok"
+    limited = client.get("/marketplace/assets")
+    assert limited.status_code == 429
+    assert limited.headers["retry-after"] == "3"
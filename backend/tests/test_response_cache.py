@@ -0,0 +1,15 @@
+from app.services.response_cache import CachedResponse, cache_key, etag_matches
+
+def test_cache_key_ignores_param_order_and_empty_values():
+    a = cache_key("assets", q="chair", tags=["b", "a"], cursor=None, limit=20)
+    b = cache_key("assets", limit=20, tags=["a", "b"], q="chair", category="")
+    assert a == b
+    assert a != cache_key("assets", q="chair", tags=["a", "b"], limit=21)
+
+def test_if_none_match_returns_304_with_etag():
+    entry = CachedResponse.build(b'[{"id":"1"}]', {"X-Next-Cursor": "abc"})
+    assert etag_matches(f'"nope", W/{entry.etag}', entry.etag)
+    r = entry.to_response(entry.etag)
+    assert r.status_code == 304 and r.body == b""
+    assert r.headers["etag"] == entry.etag and r.headers["x-next-cursor"] == "abc"
+    assert entry.to_response('"other"').body == entry.body
@@ -0,0 +1,74 @@
+import asyncio
+import boto3
+import pytest
+from moto.server import ThreadedMotoServer
+from app.services.s3_async import AsyncS3Client
+
+BUCKET = "r2v-test-bucket"
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    url = f"http://{host}:{port}"
+    boto3.client("s3", endpoint_url=url, aws_access_key_id="AKID", aws_secret_access_key="SECRET",
+                 region_name="us-east-1").create_bucket(Bucket=BUCKET)
+    yield url
+    server.stop()
+
+def test_head_get_put_delete_roundtrip(s3_endpoint):
+    async def run():
+        client = AsyncS3Client(s3_endpoint, "AKID", "SECRET", "us-east-1", max_connections=4)
+        key = "user/scans/a photo.jpg"
+        try:
+            assert await client.head_object(BUCKET, key) is None
+            await client.put_object(BUCKET, key, b"0123456789", content_type="image/jpeg")
+            info = await client.head_object(BUCKET, key)
+            assert info.size == 10 and info.content_type == "image/jpeg"
+            assert await client.get_object(BUCKET, key, byte_range=(2, 4)) == b"234"
+            await client.delete_objects(BUCKET, [key, "user/never-uploaded"])
+            assert await client.head_object(BUCKET, key) is None
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+def test_multipart_upload(s3_endpoint):
+    async def run():
+        client = AsyncS3Client(s3_endpoint, "AKID", "SECRET", "us-east-1", max_connections=4)
+        key = "user/scans/big archive.zip"
+        try:
+            upload_id = await client.create_multipart_upload(BUCKET, key, "application/zip")
+            for n, body in ((2, b"tail"), (1, b"x" * 5 * 1024 * 1024)):
+                url = client.signer.presign("PUT", BUCKET, key, 60, params={"partNumber": str(n), "uploadId": upload_id})
+                assert (await client.http.put(url, content=body)).status_code == 200
+            parts = await client.list_parts(BUCKET, key, upload_id)
+            assert [(p.part_number, p.size) for p in parts] == [(1, 5 * 1024 * 1024), (2, 4)]
+            await client.complete_multipart_upload(BUCKET, key, upload_id, parts)
+            assert (await client.head_object(BUCKET, key)).size == 5 * 1024 * 1024 + 4
+            assert await client.list_parts(BUCKET, key, upload_id) is None
+
+            aborted = await client.create_multipart_upload(BUCKET, "user/scans/abandoned.zip")
+            await client.abort_multipart_upload(BUCKET, "user/scans/abandoned.zip", aborted)
+            assert await client.list_parts(BUCKET, "user/scans/abandoned.zip", aborted) is None
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+def test_owned_object_delete_failures_are_logged(monkeypatch, caplog):
+    from app.api.routers import marketplace
+
+    deleted = []
+
+    async def delete_object(bucket, key):
+        if key.endswith("broken.glb"):
+            raise OSError("connection reset")
+        deleted.append(key)
+
+    monkeypatch.setattr(marketplace.s3_async, "delete_object", delete_object)
+    with caplog.at_level("WARNING", logger=marketplace.log.name):
+        asyncio.run(marketplace._delete_owned_objects("u1", ["u1/ok.glb", "u1/broken.glb", "u2/other.glb"], ["u1/t.png"]))
+    assert sorted(deleted) == ["u1/ok.glb", "u1/t.png"]
+    assert "u1/broken.glb" in caplog.text and "u2/other.glb" not in caplog.text
@@ -0,0 +1,61 @@
+import datetime as dt
+import socket
+from unittest import mock
+import boto3
+import httpx
+import pytest
+from botocore.client import Config
+from app.services.sigv4 import SigV4Presigner
+
+SIGNED_AT = dt.datetime(2025, 3, 1, 12, 34, 56, tzinfo=dt.timezone.utc)
+
+def _boto(endpoint: str):
+    return boto3.client(
+        "s3", endpoint_url=endpoint, aws_access_key_id="AKID", aws_secret_access_key="SECRET",
+        region_name="eu-west-1", config=Config(signature_version="s3v4"),
+    )
+
+@pytest.mark.parametrize("endpoint", ["http://minio:9000", "https://cdn.example.com/s3/"])
+@pytest.mark.parametrize("key", ["u/1/model.glb", "u/x y+z~(1)/é.png"])
+@pytest.mark.parametrize("content_type", [None, "image/png"])
+def test_matches_boto3(endpoint, key, content_type):
+    presigner = SigV4Presigner(endpoint, "AKID", "SECRET", "eu-west-1")
+    client = _boto(endpoint)
+    with mock.patch("botocore.auth.get_current_datetime", return_value=SIGNED_AT.replace(tzinfo=None)):
+        expected_get = client.generate_presigned_url("get_object", Params={"Bucket": "bkt", "Key": key}, ExpiresIn=900)
+        put_params = {"Bucket": "bkt", "Key": key}
+        if content_type:
+            put_params["ContentType"] = content_type
+        expected_put = client.generate_presigned_url("put_object", Params=put_params, ExpiresIn=3600)
+    assert presigner.presign("GET", "bkt", key, 900, signed_at=SIGNED_AT) == expected_get
+    assert presigner.presign("PUT", "bkt", key, 3600, content_type=content_type, signed_at=SIGNED_AT) == expected_put
+
+def test_upload_part_matches_boto3():
+    presigner = SigV4Presigner("http://minio:9000", "AKID", "SECRET", "eu-west-1")
+    with mock.patch("botocore.auth.get_current_datetime", return_value=SIGNED_AT.replace(tzinfo=None)):
+        expected = _boto("http://minio:9000").generate_presigned_url(
+            "upload_part", Params={"Bucket": "bkt", "Key": "u/a b.zip", "UploadId": "up/1+x", "PartNumber": 3}, ExpiresIn=3600,
+        )
+    got = presigner.presign("PUT", "bkt", "u/a b.zip", 3600, params={"partNumber": "3", "uploadId": "up/1+x"}, signed_at=SIGNED_AT)
+    # Same signed request; boto3 just orders the query string differently.
+    assert got.split("?")[0] == expected.split("?")[0]
+    assert sorted(got.split("?")[1].split("&")) == sorted(expected.split("?")[1].split("&"))
+
+def test_round_trip_against_moto_server():
+    moto_server = pytest.importorskip("moto.server")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    try:
+        endpoint = f"http://127.0.0.1:{port}"
+        _boto(endpoint).create_bucket(Bucket="bkt", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+        presigner = SigV4Presigner(endpoint, "AKID", "SECRET", "eu-west-1")
+        put_url = presigner.presign("PUT", "bkt", "scans/a b.png", 600, content_type="image/png")
+        assert httpx.put(put_url, content=b"png-bytes", headers={"Content-Type": "image/png"}).status_code == 200
+        got = httpx.get(presigner.presign("GET", "bkt", "scans/a b.png", 600))
+        assert got.status_code == 200
+        assert got.content == b"png-bytes"
+    finally:
+        server.stop()
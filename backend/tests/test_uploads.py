@@ -0,0 +1,22 @@
+import uuid
+from app.core.config import settings
+from app.services.uploads import MIN_PART_BYTES, bucket_for_key, max_part_number, part_plan
+
+def test_part_plan():
+    assert part_plan(1) == (settings.upload_part_bytes, 1)
+    assert part_plan(settings.upload_part_bytes + 1) == (settings.upload_part_bytes, 2)
+    size, count = part_plan(10**12)
+    assert count <= 10000 and size * count >= 10**12
+
+def test_max_part_number_covers_max_upload():
+    assert max_part_number() * MIN_PART_BYTES >= settings.max_upload_bytes
+
+def test_bucket_for_key():
+    user, other = uuid.uuid4(), uuid.uuid4()
+    assert bucket_for_key(user, f"{user}/{uuid.uuid4()}/inputs/abc_scan.zip") == settings.s3_bucket_scans_raw
+    assert bucket_for_key(user, f"{user}/marketplace/model/abc_m.glb") == settings.s3_bucket_marketplace_models
+    assert bucket_for_key(user, f"{user}/marketplace/thumb/abc_t.png") == settings.s3_bucket_marketplace_thumbs
+    assert bucket_for_key(user, f"{other}/marketplace/model/abc_m.glb") is None
+    assert bucket_for_key(user, f"{user}/marketplace/other/abc") is None
+    assert bucket_for_key(user, f"{user}/job/outputs/model.glb") is None
+    assert bucket_for_key(user, f"{user}/marketplace/model/") is None
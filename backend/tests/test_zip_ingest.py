@@ -0,0 +1,84 @@
+import io
+import os
+import zipfile
+import pytest
+from app.workers import zip_ingest
+from app.workers.zip_ingest import RangedReader, extract_images
+
+def _archive() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("capture/IMG_0001.JPG", b"a" * 300_000)
+        zf.writestr("capture/IMG_0002.png", b"b" * 1000)
+        zf.writestr("../../escape.jpg", b"c")
+        zf.writestr("capture/notes.txt", b"not an image")
+        zf.writestr("__MACOSX/capture/._IMG_0001.JPG", b"resource fork")
+        zf.writestr("capture/video.mov", os.urandom(2_000_000))
+        zf.writestr("capture/", b"")
+    return buf.getvalue()
+
+def _reader(data: bytes, block_size: int = 64 * 1024) -> RangedReader:
+    fetched = []
+    def fetch(start, end):
+        fetched.append((start, end))
+        return data[start:end + 1]
+    reader = RangedReader(len(data), fetch, block_size)
+    reader.fetched = fetched
+    return reader
+
+def test_extracts_only_images_flattened(tmp_path):
+    data = _archive()
+    reader = _reader(data)
+    assert extract_images(reader, tmp_path, prefix="0000_") == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "0000_00000_IMG_0001.JPG", "0000_00001_IMG_0002.png", "0000_00002_escape.jpg",
+    ]
+    assert (tmp_path / "0000_00000_IMG_0001.JPG").read_bytes() == b"a" * 300_000
+    # The .mov member is never fetched.
+    assert sum(end - start + 1 for start, end in reader.fetched) < len(data) // 4
+
+def test_limits_checked_before_extracting(tmp_path, monkeypatch):
+    monkeypatch.setattr(zip_ingest.settings, "scan_zip_max_extracted_bytes", 100_000)
+    with pytest.raises(ValueError):
+        extract_images(_reader(_archive()), tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+def test_ranged_reads_against_moto_server(tmp_path):
+    import functools
+    import boto3
+    from moto.server import ThreadedMotoServer
+    from app.services.s3 import S3Client
+
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        client = boto3.client("s3", endpoint_url=f"http://{host}:{port}", aws_access_key_id="AKID",
+                              aws_secret_access_key="SECRET", region_name="us-east-1")
+        client.create_bucket(Bucket="r2v-test-scans")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("scan/0001.jpg", os.urandom(200_000))
+            zf.writestr("scan/raw.bin", os.urandom(5_000_000))
+            zf.writestr("scan/0002.png", os.urandom(1000))
+        data = buf.getvalue()
+        client.put_object(Bucket="r2v-test-scans", Key="u/job/inputs/scan.zip", Body=data)
+
+        s3 = S3Client()
+        s3._client = client
+        size = s3.object_size("r2v-test-scans", "u/job/inputs/scan.zip")
+        get_range = functools.partial(s3.get_range, "r2v-test-scans", "u/job/inputs/scan.zip")
+        fetched = []
+
+        def fetch(start, end):
+            fetched.append((start, end))
+            return get_range(start, end)
+
+        reader = RangedReader(size, fetch, 256 * 1024)
+
+        assert extract_images(reader, tmp_path) == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["00000_0001.jpg", "00001_0002.png"]
+        # The 5 MB member is skipped without being downloaded.
+        assert sum(end - start + 1 for start, end in fetched) < 1_000_000
+    finally:
+        server.stop()